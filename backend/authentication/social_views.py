@@ -14,6 +14,8 @@ from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 import logging
 
+from products.guest_cart import merge_guest_cart
+
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
@@ -75,7 +77,7 @@ def google_login(request):
         # 토큰 생성 또는 가져오기
         token, _ = Token.objects.get_or_create(user=user)
 
-        return Response({
+        response = Response({
             'token': token.key,
             'user': {
                 'id': user.id,
@@ -86,6 +88,10 @@ def google_login(request):
             }
         }, status=status.HTTP_200_OK)
 
+        # 비로그인 장바구니 병합
+        merge_guest_cart(request, user, response)
+        return response
+
     except Exception as e:
         logger.error(f"Google login error: {str(e)}")
         return Response({
@@ -155,7 +161,7 @@ def kakao_login(request):
         # 토큰 생성 또는 가져오기
         token, _ = Token.objects.get_or_create(user=user)
 
-        return Response({
+        response = Response({
             'token': token.key,
             'user': {
                 'id': user.id,
@@ -166,6 +172,10 @@ def kakao_login(request):
             }
         }, status=status.HTTP_200_OK)
 
+        # 비로그인 장바구니 병합
+        merge_guest_cart(request, user, response)
+        return response
+
     except Exception as e:
         logger.error(f"Kakao login error: {str(e)}")
         return Response({
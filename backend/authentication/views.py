@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import login, logout
 from django.utils import timezone
+from products.guest_cart import merge_guest_cart
 from .models import User, UserProfile, UserStyleHistory
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserSerializer,
@@ -27,12 +28,16 @@ class UserRegistrationView(generics.CreateAPIView):
         # Generate authentication token
         token, created = Token.objects.get_or_create(user=user)
         
-        return Response({
+        response = Response({
             'message': 'User registered successfully',
             'user': UserSerializer(user).data,
             'token': token.key
         }, status=status.HTTP_201_CREATED)
 
+        # 비로그인 장바구니 병합
+        merge_guest_cart(request, user, response)
+        return response
+
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
@@ -48,11 +53,15 @@ def user_login(request):
         # Generate or get existing token
         token, created = Token.objects.get_or_create(user=user)
         
-        return Response({
+        response = Response({
             'message': 'Login successful',
             'user': UserSerializer(user).data,
             'token': token.key
         }, status=status.HTTP_200_OK)
+
+        # 비로그인 장바구니 병합
+        merge_guest_cart(request, user, response)
+        return response
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
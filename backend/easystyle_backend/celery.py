@@ -0,0 +1,15 @@
+"""
+Celery app for easystyle_backend project.
+
+재고 확인 작업은 스토어별 큐로 분리되어 느린 스토어가 다른 스토어의 작업을 막지 않는다.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "easystyle_backend.settings")
+
+app = Celery("easystyle_backend")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
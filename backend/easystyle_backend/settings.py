@@ -89,6 +89,10 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # 메모리 DB(shared cache)는 잠금 시 대기하지 않으므로 동시성 테스트를 위해 파일 DB 사용
+        "TEST": {
+            "NAME": BASE_DIR / "test_db.sqlite3",
+        },
     }
 }
 
@@ -107,6 +111,48 @@ DATABASES = {
 #     }
 # }
 
+# Cache
+# 스토어 요청률 제한 등 프로세스 간 공유 상태는 캐시에 저장하므로 운영 환경에서는 Redis 사용
+# (REDIS_URL이 없으면 프로세스별 locmem 캐시로 동작하며, manage.py check --deploy가 경고한다)
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
+# Celery (재고 확인 워커)
+# 스토어별 작업은 고정 개수의 스토어 큐(inventory.store.<store_id % INVENTORY_STORE_QUEUE_COUNT>)로 라우팅되며,
+# 정기 확인은 beat가 주기적으로 실행
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=REDIS_URL or 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='') or None
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    'products.tasks.run_inventory_sweep': {'queue': 'inventory.sweep'},
+}
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BEAT_SCHEDULE = {
+    'inventory-sweep': {
+        'task': 'products.tasks.run_inventory_sweep',
+        'schedule': config('INVENTORY_SWEEP_INTERVAL_SECONDS', default=300, cast=int),
+    },
+    'inventory-rollup': {
+        'task': 'products.tasks.run_inventory_rollup',
+        'schedule': config('INVENTORY_ROLLUP_INTERVAL_SECONDS', default=900, cast=int),
+    },
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -189,4 +235,19 @@ EASYSTYLE_SETTINGS = {
     'ALLOWED_IMAGE_TYPES': ['image/jpeg', 'image/png', 'image/webp'],
     'AI_IMAGE_MAX_WIDTH': 1024,
     'AI_IMAGE_MAX_HEIGHT': 1024,
+    'CART_REVALIDATION_TIME_BUDGET_SECONDS': 8,  # 장바구니 재검증 시 실시간 재고 확인 최대 대기 시간
+    'INVENTORY_CHECK_MIN_INTERVAL_MINUTES': 15,  # 상품별 재고 확인 최소 간격
+    'INVENTORY_CHECK_MAX_INTERVAL_MINUTES': 72 * 60,  # 상품별 재고 확인 최대 간격
+    'INVENTORY_CHECK_STORE_BUDGET': 30,  # 정기 확인 1회당 스토어별 최대 확인 상품 수
+    'INVENTORY_CHECK_FRESHNESS_SECONDS': 60 * 60,  # 이 시간 안에 확인된 결과는 새로 확인하지 않고 반환
+    'INVENTORY_CHECK_LOG_MODE': 'delta',  # delta: 변경/실패만 확인 로그로 남기고 나머지는 일별 집계, full: 모두 기록
+    'INVENTORY_CHECK_LOG_RETENTION_DAYS': 30,  # 확인 로그 보존 기간 (지나면 월별 보관 테이블로 이동)
+    'INVENTORY_CHECK_LOG_ARCHIVE_MONTHS': 6,  # 월별 보관 테이블 보관 기간 (지나면 테이블 삭제)
+    'INVENTORY_CHECK_SUMMARY_RETENTION_DAYS': 90,  # 상품별 일별 집계/스토어별 롤업 보존 기간
+    'INVENTORY_CHANGE_EVENT_RETENTION_DAYS': 30,  # 가격/재고 상태 변경 이벤트 피드 보존 기간
+    'INVENTORY_CHANGE_EVENT_COMMIT_LAG_SECONDS': 5,  # 변경 이벤트 피드는 생성 후 이 시간이 지난 이벤트만 반환
+    'INVENTORY_CIRCUIT_FAILURE_THRESHOLD': 5,  # 스토어 회로를 여는 연속 요청 실패 수
+    'INVENTORY_CIRCUIT_OPEN_SECONDS': 60,  # 회로가 열린 뒤 복구 시험 요청까지 대기 시간
+    'INVENTORY_STORE_QUEUE_COUNT': 8,  # 스토어 확인 작업을 나눠 담는 Celery 큐 수 (store_id % 큐 수)
+    'STORE_RATE_LIMIT_ENABLED': config('STORE_RATE_LIMIT_ENABLED', default=True, cast=bool),  # 호스트별 요청률 제한
 }
@@ -126,14 +126,20 @@ class CartAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__email', 'user__first_name', 'user__last_name')
     list_filter = ('created_at', 'updated_at')
     readonly_fields = ('created_at', 'updated_at')
+    list_select_related = ('user',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_totals()
 
     def total_items_display(self, obj):
         return obj.total_items
     total_items_display.short_description = 'Total Items'
+    total_items_display.admin_order_field = 'annotated_total_items'
 
     def total_price_display(self, obj):
         return format_html('₩{:,}', int(obj.total_price))
     total_price_display.short_description = 'Total Price'
+    total_price_display.admin_order_field = 'annotated_total_price'
 
 
 class CartItemInline(admin.TabularInline):
@@ -141,6 +147,9 @@ class CartItemInline(admin.TabularInline):
     extra = 0
     readonly_fields = ('added_at', 'updated_at', 'subtotal_display')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_subtotal().select_related('product')
+
     def subtotal_display(self, obj):
         if obj.pk:
             return format_html('₩{:,}', int(obj.subtotal))
@@ -154,6 +163,10 @@ class CartItemAdmin(admin.ModelAdmin):
     list_filter = ('added_at', 'updated_at', 'size')
     search_fields = ('cart__user__username', 'product__name', 'product__brand__name')
     readonly_fields = ('added_at', 'updated_at', 'subtotal_display')
+    list_select_related = ('cart__user', 'product')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_subtotal()
 
     def cart_user(self, obj):
         return obj.cart.user.username
@@ -0,0 +1,518 @@
+"""
+상품 분석 데이터 배치 집계 서비스
+"""
+
+import hashlib
+import logging
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, CharField, Count, F, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .hyperloglog import HyperLogLog
+from .models import (
+    Product, ProductAnalytics, UserWishlist, CartItem, StyleRecommendation,
+    ProductCooccurrence, AnalyticsJobCursor, ProductViewSketch
+)
+
+logger = logging.getLogger(__name__)
+
+
+# 연령대 구간 (이름, 최소 나이) - 큰 나이부터 순서대로 평가
+AGE_GROUPS = [
+    ('50s_plus', 50),
+    ('40s', 40),
+    ('30s', 30),
+    ('20s', 20),
+    ('under_20', 0),
+]
+
+# 상호작용 소스별 (모델, 사용자 경로, 가중치)
+INTERACTION_SOURCES = [
+    (UserWishlist, 'user', 1.0),
+    (CartItem, 'cart__user', 2.0),
+    (StyleRecommendation.products.through, 'stylerecommendation__user', 1.0),
+]
+
+
+def _years_ago(today: date, years: int) -> date:
+    """today 기준 years년 전 날짜 (2월 29일 보정)"""
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
+
+
+class ProductAffinityAggregator:
+    """
+    위시리스트/장바구니/스타일 추천 상호작용을 사용자 연령대 및 스타일 카테고리와 결합해
+    ProductAnalytics.age_group_popularity / style_category_fit 을 일괄 계산
+
+    상품 ID 구간 단위로 GROUP BY 쿼리를 실행하므로 메모리 사용량은 청크 크기에만 비례하고,
+    결과는 bulk_update 로 기록한다.
+    """
+
+    def __init__(self, chunk_size: int = 5000, today: Optional[date] = None):
+        self.chunk_size = chunk_size
+        self.today = today or timezone.localdate()
+
+    def run(self) -> Dict:
+        """
+        전체 상품에 대해 집계 실행
+        """
+        stats = {'chunks': 0, 'products_scanned': 0, 'analytics_updated': 0}
+        last_id = 0
+
+        while True:
+            product_ids = list(
+                Product.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:self.chunk_size]
+            )
+            if not product_ids:
+                break
+
+            stats['analytics_updated'] += self.process_range(product_ids[0], product_ids[-1])
+            stats['chunks'] += 1
+            stats['products_scanned'] += len(product_ids)
+            last_id = product_ids[-1]
+
+        logger.info(f'상품 선호도 집계 완료: {stats}')
+        return stats
+
+    def process_range(self, first_id: int, last_id: int) -> int:
+        """
+        상품 ID 구간 [first_id, last_id] 집계 후 저장, 변경된 행 수 반환
+        """
+        age_counts = defaultdict(lambda: defaultdict(float))
+        style_counts = defaultdict(lambda: defaultdict(float))
+        style_totals = defaultdict(float)
+
+        for model, user_path, weight in INTERACTION_SOURCES:
+            interactions = model.objects.filter(
+                product_id__gte=first_id, product_id__lte=last_id
+            ).order_by()
+
+            age_rows = interactions.annotate(
+                age_group=self._user_expression(user_path)
+            ).values('product_id', 'age_group').annotate(n=Count('pk'))
+            for row in age_rows:
+                if row['age_group']:
+                    age_counts[row['product_id']][row['age_group']] += row['n'] * weight
+
+            # 카테고리 목록(JSON) 값 자체로 그룹핑 - 서로 다른 조합 수만큼만 행이 반환됨
+            categories_field = f'{user_path}__profile__style_categories'
+            style_rows = interactions.values('product_id', categories_field).annotate(n=Count('pk'))
+            for row in style_rows:
+                categories = row[categories_field]
+                if not categories or not isinstance(categories, list):
+                    continue
+                style_totals[row['product_id']] += row['n'] * weight
+                for category in set(categories):
+                    style_counts[row['product_id']][str(category)] += row['n'] * weight
+
+        product_ids = set(age_counts) | set(style_counts)
+        return self._save(first_id, last_id, product_ids, age_counts, style_counts, style_totals)
+
+    def _user_expression(self, user_path: str) -> Case:
+        """연령대 Case 표현식을 상호작용 모델의 사용자 경로에 맞게 변환"""
+        return Case(
+            *[
+                When(**{f'{user_path}__date_of_birth__lte': _years_ago(self.today, min_age)}, then=Value(name))
+                for name, min_age in AGE_GROUPS
+            ],
+            default=Value(None),
+            output_field=CharField(),
+        )
+
+    def _save(self, first_id, last_id, product_ids, age_counts, style_counts, style_totals) -> int:
+        """
+        구간 내 ProductAnalytics 행을 생성/갱신
+        """
+        existing = {
+            analytics.product_id: analytics
+            for analytics in ProductAnalytics.objects.filter(
+                product_id__gte=first_id, product_id__lte=last_id
+            ).only('id', 'product_id', 'age_group_popularity', 'style_category_fit')
+        }
+
+        missing = [pid for pid in product_ids if pid not in existing]
+        if missing:
+            ProductAnalytics.objects.bulk_create(
+                [ProductAnalytics(product_id=pid) for pid in missing],
+                ignore_conflicts=True,
+                batch_size=1000,
+            )
+            for analytics in ProductAnalytics.objects.filter(product_id__in=missing).only(
+                'id', 'product_id', 'age_group_popularity', 'style_category_fit'
+            ):
+                existing[analytics.product_id] = analytics
+
+        now = timezone.now()
+        changed: List[ProductAnalytics] = []
+        for product_id, analytics in existing.items():
+            age_group_popularity = self._shares(age_counts.get(product_id, {}))
+            style_category_fit = self._shares(style_counts.get(product_id, {}), style_totals.get(product_id))
+
+            if (analytics.age_group_popularity != age_group_popularity or
+                    analytics.style_category_fit != style_category_fit):
+                analytics.age_group_popularity = age_group_popularity
+                analytics.style_category_fit = style_category_fit
+                analytics.last_updated = now
+                changed.append(analytics)
+
+        if changed:
+            ProductAnalytics.objects.bulk_update(
+                changed,
+                ['age_group_popularity', 'style_category_fit', 'last_updated'],
+                batch_size=1000,
+            )
+        return len(changed)
+
+    @staticmethod
+    def _shares(counts: Dict[str, float], total: Optional[float] = None) -> Dict[str, float]:
+        """가중 카운트를 비율(0~1)로 변환"""
+        total = total if total is not None else sum(counts.values())
+        if not total:
+            return {}
+        return {key: round(value / total, 4) for key, value in sorted(counts.items())}
+
+
+class CooccurrenceMiner:
+    """
+    스타일 추천(StyleRecommendation.products)과 스타일 세트 단위 장바구니(CartItem.style_set_id)에서
+    "함께 스타일링된" 상품 쌍을 증분으로 집계하고, 상품별 상위 k개 파트너를
+    ProductAnalytics.popular_combinations 에 저장
+    """
+
+    # 추천 단위가 아니라 추천-상품 연결(through) 행 단위로 처리해 나중에 추가된 상품도 집계
+    RECOMMENDATION_CURSOR = 'cooccurrence.recommendation_products'
+    CART_ITEM_CURSOR = 'cooccurrence.cart_items'
+
+    def __init__(self, top_k: int = 10, batch_size: int = 2000):
+        self.top_k = top_k
+        self.batch_size = batch_size
+
+    def run(self) -> Dict:
+        """
+        마지막 실행 이후 새로 연결된 추천 상품/장바구니 아이템만 처리
+        """
+        stats = {'recommendation_products': 0, 'cart_items': 0, 'pairs': 0, 'products_refreshed': 0}
+
+        while True:
+            processed, pairs, touched = self._process_recommendations()
+            if not processed:
+                break
+            stats['recommendation_products'] += processed
+            stats['pairs'] += pairs
+            stats['products_refreshed'] += self.refresh_top_partners(touched)
+
+        while True:
+            processed, pairs, touched = self._process_cart_items()
+            if not processed:
+                break
+            stats['cart_items'] += processed
+            stats['pairs'] += pairs
+            stats['products_refreshed'] += self.refresh_top_partners(touched)
+
+        logger.info(f'상품 동시 출현 집계 완료: {stats}')
+        return stats
+
+    def _process_recommendations(self) -> Tuple[int, int, Set[int]]:
+        through = StyleRecommendation.products.through
+
+        with transaction.atomic():
+            cursor = self._get_cursor(self.RECOMMENDATION_CURSOR)
+            new_links = list(
+                through.objects.filter(id__gt=cursor.last_processed_id)
+                .order_by('id').values('id', 'stylerecommendation_id', 'product_id')[:self.batch_size]
+            )
+            if not new_links:
+                return 0, 0, set()
+
+            # 같은 추천에 이미 연결되어 있던 상품까지 함께 조회
+            members = defaultdict(list)
+            for link in through.objects.filter(
+                stylerecommendation_id__in={link['stylerecommendation_id'] for link in new_links},
+                id__lte=new_links[-1]['id'],
+            ).order_by().values('id', 'stylerecommendation_id', 'product_id'):
+                members[link['stylerecommendation_id']].append(link)
+
+            # 새 연결은 같은 추천에서 자신보다 먼저 연결된 상품과만 짝지어 중복 집계를 방지
+            pair_counts = Counter()
+            for link in new_links:
+                for other in members[link['stylerecommendation_id']]:
+                    if other['id'] < link['id']:
+                        pair_counts[tuple(sorted((link['product_id'], other['product_id'])))] += 1
+
+            touched = self._apply_pair_counts(pair_counts)
+            cursor.last_processed_id = new_links[-1]['id']
+            cursor.save()
+
+        return len(new_links), len(pair_counts), touched
+
+    def _process_cart_items(self) -> Tuple[int, int, Set[int]]:
+        with transaction.atomic():
+            cursor = self._get_cursor(self.CART_ITEM_CURSOR)
+            new_items = list(
+                CartItem.objects.filter(id__gt=cursor.last_processed_id)
+                .order_by('id').values('id', 'cart_id', 'style_set_id', 'product_id')[:self.batch_size]
+            )
+            if not new_items:
+                return 0, 0, set()
+
+            new_set_items = [item for item in new_items if item['style_set_id']]
+            set_members = defaultdict(list)
+            if new_set_items:
+                # 같은 세트에 이미 담겨 있던 아이템까지 함께 조회
+                for item in CartItem.objects.filter(
+                    cart_id__in={item['cart_id'] for item in new_set_items},
+                    style_set_id__in={item['style_set_id'] for item in new_set_items},
+                    id__lte=new_items[-1]['id'],
+                ).order_by().values('id', 'cart_id', 'style_set_id', 'product_id'):
+                    set_members[(item['cart_id'], item['style_set_id'])].append(item)
+
+            # 새 아이템은 같은 세트에서 자신보다 먼저 담긴 아이템과만 짝지어 중복 집계를 방지
+            pair_counts = Counter()
+            for item in new_set_items:
+                for other in set_members[(item['cart_id'], item['style_set_id'])]:
+                    if other['id'] < item['id'] and other['product_id'] != item['product_id']:
+                        pair_counts[tuple(sorted((item['product_id'], other['product_id'])))] += 1
+
+            touched = self._apply_pair_counts(pair_counts)
+            cursor.last_processed_id = new_items[-1]['id']
+            cursor.save()
+
+        return len(new_items), len(pair_counts), touched
+
+    def _apply_pair_counts(self, pair_counts: Counter) -> Set[int]:
+        """
+        쌍 카운트를 양방향 행으로 누적
+
+        없는 행은 0으로 먼저 만들고(ignore_conflicts), 증가량이 같은 행끼리 묶어
+        F() 증가 UPDATE로 더하므로 동시에 실행된 집계와도 카운트가 유실되지 않는다.
+        """
+        if not pair_counts:
+            return set()
+
+        increments = Counter()
+        for (a, b), count in pair_counts.items():
+            increments[(a, b)] += count
+            increments[(b, a)] += count
+
+        ProductCooccurrence.objects.bulk_create(
+            [ProductCooccurrence(product_id=a, partner_id=b, count=0) for a, b in increments],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+
+        touched = {a for a, _ in increments}
+        ids_by_increment = defaultdict(list)
+        for row_id, product_id, partner_id in ProductCooccurrence.objects.filter(
+            product_id__in=touched, partner_id__in=touched
+        ).values_list('id', 'product_id', 'partner_id'):
+            count = increments.get((product_id, partner_id))
+            if count:
+                ids_by_increment[count].append(row_id)
+
+        now = timezone.now()
+        for count, row_ids in ids_by_increment.items():
+            for start in range(0, len(row_ids), 1000):
+                ProductCooccurrence.objects.filter(id__in=row_ids[start:start + 1000]).update(
+                    count=F('count') + count, updated_at=now
+                )
+
+        return touched
+
+    def refresh_top_partners(self, product_ids: Iterable[int]) -> int:
+        """
+        상품별 상위 k개 파트너를 윈도우 함수 한 번으로 조회해 popular_combinations 갱신
+        """
+        product_ids = list(product_ids)
+        refreshed = 0
+
+        for start in range(0, len(product_ids), self.batch_size):
+            chunk = product_ids[start:start + self.batch_size]
+
+            top_partners = defaultdict(list)
+            rows = ProductCooccurrence.objects.filter(product_id__in=chunk).annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=[F('product_id')],
+                    order_by=[F('count').desc(), F('partner_id').asc()],
+                )
+            ).filter(rank__lte=self.top_k).values('product_id', 'partner__uuid', 'count', 'rank')
+            for row in sorted(rows, key=lambda r: (r['product_id'], r['rank'])):
+                top_partners[row['product_id']].append({
+                    'product_uuid': str(row['partner__uuid']),
+                    'count': row['count'],
+                })
+
+            ProductAnalytics.objects.bulk_create(
+                [ProductAnalytics(product_id=pid) for pid in chunk],
+                ignore_conflicts=True,
+            )
+            now = timezone.now()
+            analytics_rows = list(
+                ProductAnalytics.objects.filter(product_id__in=chunk).only('id', 'product_id', 'popular_combinations')
+            )
+            for analytics in analytics_rows:
+                analytics.popular_combinations = top_partners.get(analytics.product_id, [])
+                analytics.last_updated = now
+            ProductAnalytics.objects.bulk_update(
+                analytics_rows, ['popular_combinations', 'last_updated'], batch_size=1000
+            )
+            refreshed += len(analytics_rows)
+
+        return refreshed
+
+    @staticmethod
+    def _get_cursor(name: str) -> AnalyticsJobCursor:
+        cursor, _ = AnalyticsJobCursor.objects.select_for_update().get_or_create(name=name)
+        return cursor
+
+
+def viewer_key_for_request(request) -> str:
+    """
+    고유 방문자 식별 키 (로그인 사용자 > 세션 > IP+User-Agent 해시)
+    """
+    if request.user.is_authenticated:
+        return f'u:{request.user.pk}'
+
+    session_key = getattr(getattr(request, 'session', None), 'session_key', None)
+    if session_key:
+        return f's:{session_key}'
+
+    client = f"{request.META.get('REMOTE_ADDR', '')}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return 'a:' + hashlib.sha1(client.encode('utf-8')).hexdigest()
+
+
+def _view_sketch_cache_key(product_id: int, day: date) -> str:
+    return f'hll:views:{product_id}:{day.isoformat()}'
+
+
+def _get_daily_registers(product_id: int, day: date) -> Optional[bytes]:
+    """일간 스케치 레지스터 (캐시 우선, 없으면 DB)"""
+    key = _view_sketch_cache_key(product_id, day)
+    registers = cache.get(key)
+    if registers is None:
+        sketch = ProductViewSketch.objects.filter(product_id=product_id, day=day).only('registers').first()
+        registers = bytes(sketch.registers) if sketch else b''
+        cache.set(key, registers, timeout=60 * 60 * 48)
+    return registers or None
+
+
+def record_product_view(product: Product, viewer_key: str, day: Optional[date] = None) -> bool:
+    """
+    상품 조회를 일간 HyperLogLog 스케치에 반영
+
+    레지스터 값이 실제로 커지는 경우에만 DB에 기록하므로, 같은 방문자의 반복 조회나
+    이미 반영된 레지스터에 대한 조회는 캐시 확인만으로 끝난다.
+    """
+    day = day or timezone.localdate()
+    index, rho = HyperLogLog.position(viewer_key)
+
+    registers = _get_daily_registers(product.id, day)
+    if registers and registers[index] >= rho:
+        return False
+
+    with transaction.atomic():
+        sketch, _ = ProductViewSketch.objects.select_for_update().get_or_create(
+            product=product,
+            day=day,
+            defaults={'registers': HyperLogLog().to_bytes()}
+        )
+        hll = HyperLogLog(bytes(sketch.registers))
+        changed = hll.update_register(index, rho)
+        if changed:
+            sketch.registers = hll.to_bytes()
+            sketch.estimate = hll.estimate()
+            sketch.save(update_fields=['registers', 'estimate', 'updated_at'])
+
+    cache.set(_view_sketch_cache_key(product.id, day), bytes(sketch.registers), timeout=60 * 60 * 48)
+    return changed
+
+
+def get_unique_viewer_estimates(analytics: ProductAnalytics) -> Dict[str, int]:
+    """
+    누적(롤업된 스케치 + 오늘 스케치) 및 오늘 고유 방문자 추정치
+    """
+    today_registers = _get_daily_registers(analytics.product_id, timezone.localdate())
+    today = HyperLogLog(today_registers) if today_registers else None
+
+    if not today:
+        return {'unique_viewers': analytics.unique_viewer_count, 'unique_viewers_today': 0}
+
+    total = HyperLogLog(today.to_bytes())
+    if analytics.unique_viewer_sketch:
+        total.merge(HyperLogLog(bytes(analytics.unique_viewer_sketch)))
+    return {'unique_viewers': total.estimate(), 'unique_viewers_today': today.estimate()}
+
+
+class ViewSketchRollup:
+    """
+    지난 날짜의 일간 스케치를 ProductAnalytics.unique_viewer_sketch 에 병합하고
+    보존 기간이 지난 일간 스케치를 삭제
+    """
+
+    def __init__(self, retention_days: int = 30, batch_size: int = 1000):
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+
+    def run(self, today: Optional[date] = None) -> Dict:
+        today = today or timezone.localdate()
+        stats = {'sketches_merged': 0, 'products_updated': 0, 'sketches_deleted': 0, 'unique_viewers': 0}
+
+        while True:
+            with transaction.atomic():
+                sketches = list(
+                    ProductViewSketch.objects.select_for_update().filter(
+                        rolled_up=False, day__lt=today
+                    ).order_by('product_id', 'day')[:self.batch_size]
+                )
+                if not sketches:
+                    break
+
+                merged = defaultdict(HyperLogLog)
+                for sketch in sketches:
+                    merged[sketch.product_id].merge(HyperLogLog(bytes(sketch.registers)))
+
+                ProductAnalytics.objects.bulk_create(
+                    [ProductAnalytics(product_id=pid) for pid in merged],
+                    ignore_conflicts=True,
+                )
+                now = timezone.now()
+                analytics_rows = list(
+                    ProductAnalytics.objects.filter(product_id__in=list(merged)).only(
+                        'id', 'product_id', 'unique_viewer_sketch', 'unique_viewer_count'
+                    )
+                )
+                for analytics in analytics_rows:
+                    hll = merged[analytics.product_id]
+                    if analytics.unique_viewer_sketch:
+                        hll.merge(HyperLogLog(bytes(analytics.unique_viewer_sketch)))
+                    analytics.unique_viewer_sketch = hll.to_bytes()
+                    analytics.unique_viewer_count = hll.estimate()
+                    analytics.last_updated = now
+                    stats['unique_viewers'] += analytics.unique_viewer_count
+
+                ProductAnalytics.objects.bulk_update(
+                    analytics_rows,
+                    ['unique_viewer_sketch', 'unique_viewer_count', 'last_updated'],
+                    batch_size=self.batch_size,
+                )
+                ProductViewSketch.objects.filter(id__in=[s.id for s in sketches]).update(rolled_up=True)
+
+                stats['sketches_merged'] += len(sketches)
+                stats['products_updated'] += len(analytics_rows)
+
+        deleted, _ = ProductViewSketch.objects.filter(
+            rolled_up=True, day__lt=today - timedelta(days=self.retention_days)
+        ).delete()
+        stats['sketches_deleted'] = deleted
+
+        logger.info(f'고유 방문자 스케치 롤업 완료: {stats}')
+        return stats
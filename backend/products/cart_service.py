@@ -0,0 +1,335 @@
+"""
+장바구니 변경 서비스
+"""
+
+import logging
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from .inventory_service import inventory_checker
+from .models import Cart, CartItem, Product, StyleRecommendation
+
+logger = logging.getLogger(__name__)
+
+# 아이템 하나의 최대 수량 (시리얼라이저의 quantity max_value와 같게 유지)
+MAX_ITEM_QUANTITY = 10
+
+
+class CartOperationError(Exception):
+    """
+    장바구니 변경 요청을 적용할 수 없을 때 발생
+    """
+
+    def __init__(self, message: str, operation_index: int = None):
+        super().__init__(message)
+        self.message = message
+        self.operation_index = operation_index
+
+
+def add_item_to_cart(cart: Cart, product: Product, size: str = '', quantity: int = 1,
+                     style_set_id: str = '', max_attempts: int = 3) -> CartItem:
+    """
+    장바구니에 상품을 원자적으로 추가 (upsert)
+
+    기존 아이템은 F() 증가 UPDATE 한 번으로 수량을 올리고(최대 수량까지), 없으면 INSERT한다.
+    동시 요청이 먼저 INSERT해 unique 제약에 걸리면 증가 UPDATE로 재시도하므로
+    중복 생성이나 수량 유실이 발생하지 않는다.
+    """
+    quantity = min(quantity, MAX_ITEM_QUANTITY)
+    changes = {'quantity': Least(F('quantity') + quantity, MAX_ITEM_QUANTITY), 'updated_at': timezone.now()}
+    if style_set_id:
+        changes['style_set_id'] = style_set_id
+
+    for attempt in range(max_attempts):
+        updated = CartItem.objects.filter(cart=cart, product=product, size=size).update(**changes)
+        if updated:
+            return CartItem.objects.get(cart=cart, product=product, size=size)
+
+        try:
+            with transaction.atomic():
+                return CartItem.objects.create(
+                    cart=cart,
+                    product=product,
+                    size=size,
+                    quantity=quantity,
+                    style_set_id=style_set_id,
+                )
+        except IntegrityError:
+            logger.info(f'장바구니 아이템 동시 생성 감지, 증가로 재시도 ({attempt + 1}/{max_attempts})')
+
+    raise CartOperationError('Could not add item to cart, please retry')
+
+
+def apply_cart_operations(cart: Cart, operations: List[Dict],
+                          products: Optional[Dict[str, Product]] = None, max_attempts: int = 3) -> Dict:
+    """
+    여러 개의 add/update/remove 작업을 하나의 트랜잭션에서 적용
+
+    작업은 메모리에서 순서대로 반영한 뒤 삭제/수정/추가를 각각 한 번의 쿼리로 기록한다.
+    하나라도 실패하면 전체가 롤백된다. products(uuid 문자열 -> Product)를 넘기면 상품 조회를 생략한다.
+    단건 추가(add_item_to_cart)는 장바구니 락을 잡지 않으므로, 그 사이 같은 아이템이 먼저 INSERT되어
+    unique 제약에 걸리면 장바구니를 다시 읽어 처음부터 재시도한다.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return _apply_cart_operations(cart, operations, products)
+        except IntegrityError:
+            logger.info(f'장바구니 아이템 동시 생성 감지, 일괄 변경 재시도 ({attempt + 1}/{max_attempts})')
+
+    raise CartOperationError('Could not update cart, please retry')
+
+
+def _apply_cart_operations(cart: Cart, operations: List[Dict],
+                           products: Optional[Dict[str, Product]]) -> Dict:
+    with transaction.atomic():
+        # 같은 장바구니에 대한 동시 변경 직렬화
+        cart = Cart.objects.select_for_update().get(pk=cart.pk)
+
+        if products is None:
+            product_uuids = {op['product_uuid'] for op in operations if op['op'] == 'add'}
+            products = {
+                str(product.uuid): product
+                for product in Product.objects.filter(uuid__in=product_uuids, is_available=True)
+            }
+
+        items_by_id = {item.id: item for item in CartItem.objects.filter(cart=cart)}
+        items_by_key = {(item.product_id, item.size): item for item in items_by_id.values()}
+        removed_by_key = {}
+        changed, created = set(), []
+
+        for index, op in enumerate(operations):
+            if op['op'] == 'add':
+                product = products.get(str(op['product_uuid']))
+                if not product:
+                    raise CartOperationError('Product not found or not available', index)
+
+                # 이미 담긴 수량과 합쳐도 최대 수량을 넘지 않도록 제한
+                key = (product.id, op.get('size', ''))
+                quantity = min(op.get('quantity', 1), MAX_ITEM_QUANTITY)
+                item = items_by_key.get(key)
+                if item:
+                    item.quantity = min(item.quantity + quantity, MAX_ITEM_QUANTITY)
+                elif key in removed_by_key:
+                    # 같은 배치에서 제거했던 아이템을 다시 추가하면 새로 담은 것으로 취급
+                    item = removed_by_key.pop(key)
+                    item.quantity = quantity
+                    items_by_key[key] = item
+                else:
+                    item = CartItem(
+                        cart=cart,
+                        product=product,
+                        size=key[1],
+                        quantity=quantity,
+                    )
+                    items_by_key[key] = item
+                    created.append(item)
+
+                if op.get('style_set_id'):
+                    item.style_set_id = op['style_set_id']
+                if item.pk:
+                    changed.add(item.pk)
+
+            else:
+                item = items_by_id.get(op['item_id'])
+                if not item or items_by_key.get((item.product_id, item.size)) is not item:
+                    raise CartOperationError('Item not found', index)
+
+                if op['op'] == 'update':
+                    item.quantity = op['quantity']
+                    changed.add(item.pk)
+                else:
+                    key = (item.product_id, item.size)
+                    del items_by_key[key]
+                    removed_by_key[key] = item
+                    changed.discard(item.pk)
+
+        removed_ids = [item.pk for item in removed_by_key.values()]
+        if removed_ids:
+            CartItem.objects.filter(id__in=removed_ids).delete()
+
+        now = timezone.now()
+        updated = [items_by_id[item_id] for item_id in changed]
+        for item in updated:
+            item.updated_at = now
+        if updated:
+            CartItem.objects.bulk_update(updated, ['quantity', 'style_set_id', 'updated_at'])
+
+        if created:
+            CartItem.objects.bulk_create(created)
+
+        cart.save(update_fields=['updated_at'])
+
+    return {
+        'added': len(created),
+        'updated': len(updated),
+        'removed': len(removed_ids),
+    }
+
+
+def get_unavailable_reason(product: Product, size: str = '') -> Optional[str]:
+    """
+    마지막으로 확인된 재고 상태 기준 구매 불가 사유 (구매 가능하면 None)
+    """
+    if not product.is_available:
+        return 'product_unavailable'
+
+    inventory = getattr(product, 'inventory_status', None)
+    if inventory is None:
+        return None
+    if inventory.availability_status == 'unavailable':
+        return 'unavailable'
+    if inventory.stock_status in ('out_of_stock', 'discontinued'):
+        return inventory.stock_status
+    if size and inventory.size_stock and inventory.size_stock.get(size) == 0:
+        return 'size_out_of_stock'
+    return None
+
+
+def add_style_set_to_cart(cart: Cart, entries: List[Tuple[str, str]],
+                          style_set_id: str = '') -> Dict:
+    """
+    스타일 세트(상품 UUID, 사이즈 목록)를 장바구니에 한 번에 추가
+
+    상품과 재고 상태는 한 번의 쿼리로 조회해 일괄 검증하고, 구매 가능한 상품만
+    같은 style_set_id로 apply_cart_operations를 통해 일괄 기록한다.
+    """
+    style_set_id = style_set_id or f'set-{uuid.uuid4().hex[:12]}'
+
+    products = {
+        str(product.uuid): product
+        for product in Product.objects.filter(
+            uuid__in={product_uuid for product_uuid, _ in entries}
+        ).select_related('inventory_status')
+    }
+
+    operations, unavailable = [], []
+    for product_uuid, size in entries:
+        product = products.get(str(product_uuid))
+        reason = get_unavailable_reason(product, size) if product else 'not_found'
+        if reason:
+            unavailable.append({'product_uuid': str(product_uuid), 'size': size, 'reason': reason})
+            continue
+        operations.append({
+            'op': 'add',
+            'product_uuid': str(product_uuid),
+            'size': size,
+            'quantity': 1,
+            'style_set_id': style_set_id,
+        })
+
+    summary = {'added': 0, 'updated': 0, 'removed': 0}
+    if operations:
+        summary = apply_cart_operations(cart, operations, products=products)
+
+    return {
+        'style_set_id': style_set_id,
+        'added_count': summary['added'] + summary['updated'],
+        'unavailable': unavailable,
+    }
+
+
+def get_recommendation_entries(recommendation: StyleRecommendation,
+                               sizes: Optional[Dict[str, str]] = None) -> List[Tuple[str, str]]:
+    """
+    스타일 추천의 상품 목록을 (상품 UUID, 사이즈) 목록으로 변환
+    사이즈를 지정하지 않은 상품은 추천 사이즈 사용
+    """
+    sizes = sizes or {}
+    return [
+        (str(product_uuid), sizes.get(str(product_uuid), recommended_size or ''))
+        for product_uuid, recommended_size in recommendation.products.values_list('uuid', 'recommended_size')
+    ]
+
+
+def revalidate_cart(cart: Cart, time_budget: Optional[float] = None) -> Dict:
+    """
+    결제 전 장바구니 아이템의 구매 가능 여부와 실시간 가격 재검증
+
+    재고 상태는 한 번의 쿼리로 읽고, 최근에 확인되지 않은 상품만 스토어별로 묶어
+    동시에 실시간 확인한다 (다른 요청이 같은 상품을 확인 중이면 그 결과를 함께 쓴다).
+    time_budget(초) 안에 끝나지 않은 상품은 마지막으로 확인된 상태를 'stale'로 표시해 반환한다.
+    """
+    if time_budget is None:
+        time_budget = settings.EASYSTYLE_SETTINGS.get('CART_REVALIDATION_TIME_BUDGET_SECONDS', 8)
+
+    started = time.monotonic()
+    items = list(
+        CartItem.objects.filter(cart=cart).select_related(
+            'product__store__api_config', 'product__inventory_status'
+        )
+    )
+
+    stale_products = {}
+    for item in items:
+        inventory = getattr(item.product, 'inventory_status', None)
+        if inventory is None or not inventory.is_recently_checked:
+            stale_products[item.product_id] = item.product
+
+    refreshed = inventory_checker.check_products_coalesced(
+        list(stale_products.values()), 'user_request', timeout=time_budget
+    ) if stale_products else {}
+
+    results = []
+    total_price_delta = 0
+    for item in items:
+        product = item.product
+        inventory = getattr(product, 'inventory_status', None)
+        shown_price = product.current_price
+        check = refreshed.get(product.id)
+
+        if check and check.get('success'):
+            freshness = 'refreshed'
+            is_purchasable = check.get('is_available', False)
+            stock_status = check.get('stock_status', 'unknown')
+            stock_quantity = check.get('stock_quantity')
+            live_price = check.get('current_price')
+        elif inventory is not None:
+            freshness = 'fresh' if product.id not in stale_products else 'stale'
+            is_purchasable = inventory.is_purchasable
+            stock_status = inventory.stock_status
+            stock_quantity = inventory.stock_quantity
+            live_price = inventory.current_price
+        else:
+            freshness = 'unknown'
+            is_purchasable = product.is_available
+            stock_status = 'unknown'
+            stock_quantity = None
+            live_price = None
+
+        price_delta = float(live_price) - float(shown_price) if live_price is not None else 0.0
+        total_price_delta += price_delta * item.quantity
+
+        results.append({
+            'item_id': item.id,
+            'product_uuid': str(product.uuid),
+            'quantity': item.quantity,
+            'shown_price': float(shown_price),
+            'live_price': float(live_price) if live_price is not None else None,
+            'price_delta': round(price_delta, 2),
+            'price_changed': abs(price_delta) > 0.01,
+            'is_purchasable': is_purchasable,
+            'stock_status': stock_status,
+            'stock_quantity': stock_quantity,
+            'quantity_available': stock_quantity is None or stock_quantity >= item.quantity,
+            'freshness': freshness,
+        })
+
+    return {
+        'items': results,
+        'summary': {
+            'total_items': len(results),
+            'all_purchasable': all(r['is_purchasable'] and r['quantity_available'] for r in results),
+            'price_changed_count': len([r for r in results if r['price_changed']]),
+            'total_price_delta': round(total_price_delta, 2),
+            'checked_count': len([r for r in refreshed.values() if r.get('success')]),
+            'stale_count': len([r for r in results if r['freshness'] in ('stale', 'unknown')]),
+            'elapsed_ms': int((time.monotonic() - started) * 1000),
+        }
+    }
@@ -0,0 +1,28 @@
+"""
+배포 설정 점검 (manage.py check --deploy)
+"""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# 프로세스마다 따로 저장되어 여러 워커 프로세스가 나눠 쓸 수 없는 캐시 백엔드
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_store_rate_limit_cache(app_configs, **kwargs):
+    """
+    호스트별 요청률 제한은 캐시로 워커 프로세스들이 버킷을 나눠 쓰므로 공유 캐시(Redis)가 필요
+    """
+    if not settings.EASYSTYLE_SETTINGS.get('STORE_RATE_LIMIT_ENABLED'):
+        return []
+    if settings.CACHES.get('default', {}).get('BACKEND') not in PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+    return [Warning(
+        'STORE_RATE_LIMIT_ENABLED가 켜져 있지만 기본 캐시가 프로세스별 캐시라 요청률 제한이 워커 프로세스마다 따로 적용됩니다.',
+        hint='REDIS_URL로 공유 캐시를 설정하세요.',
+        id='products.W001',
+    )]
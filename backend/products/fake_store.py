@@ -0,0 +1,311 @@
+"""
+재고 확인 파이프라인 측정용 로컬 가짜 스토어 서버
+
+실제 쇼핑몰에 요청하지 않고 InventoryChecker를 측정할 수 있도록 상품 JSON API, 일괄 조회 API,
+상품 HTML 페이지를 흉내 낸다. 응답 지연, 오류율, 재고 변동률, 호스트별 요청 제한(429),
+ETag/If-None-Match(304)를 설정할 수 있다. 호스트(Host 헤더)별로 요청 제한과 통계를 따로
+집계하므로 127.0.0.x 주소를 스토어마다 다르게 주면 여러 스토어를 한 서버로 흉내 낼 수 있다.
+
+경로
+    /api/products/<external_id>        단일 상품 JSON
+    /api/batch?ids=<id>|<id>|...       일괄 조회 JSON
+    /products/<external_id>            상품 HTML 페이지
+"""
+
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+DEFAULT_JSON_TEMPLATE = '{"stock": $stock, "price": $price, "sizes": {"S": $stock_s, "M": $stock_m}}'
+
+DEFAULT_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="utf-8"><title>$name</title></head>
+<body>
+<div class="product-detail">
+  <h1 class="name">$name</h1>
+  <div class="price-box"><span class="price">$price_text원</span></div>
+  <div class="stock-info">재고 <span class="stock">$stock개</span> $sold_out_text</div>
+  <div class="buy-area"><button class="btn-buy" $disabled>구매하기</button></div>
+</div>
+<footer>$padding</footer>
+</body>
+</html>
+"""
+
+# DEFAULT_HTML_TEMPLATE에 맞는 스크래핑 설정
+DEFAULT_HTML_SELECTORS = {
+    'inventory_selector': '.product-detail .stock-info > span.stock',
+    'price_selector': '.price-box .price',
+    'availability_selector': '.buy-area button.btn-buy',
+    'unavailable_keywords': ['일시품절', 'sold out'],
+}
+
+# 일괄 조회 응답에 맞는 batch_response_mapping
+DEFAULT_BATCH_MAPPING = {
+    'items_path': 'items',
+    'id_field': 'sku',
+    'stock_field': 'stock',
+    'price_field': 'price',
+    'sizes_field': 'sizes',
+    'id_separator': '|',
+}
+
+
+class FakeStoreConfig:
+    """
+    가짜 스토어 동작 설정
+    """
+
+    def __init__(self, latency_ms: float = 50, latency_jitter_ms: float = 20, error_rate: float = 0.0,
+                 change_rate: float = 0.1, sold_out_rate: float = 0.1, rate_limit_per_second: float = 0,
+                 page_padding_kb: int = 0, json_template: Optional[str] = None,
+                 html_template: Optional[str] = None, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        # 요청마다 상품 재고/가격이 바뀔 확률 (나머지는 같은 본문이라 304/동일 해시)
+        self.change_rate = change_rate
+        self.sold_out_rate = sold_out_rate
+        # 호스트별 초당 허용 요청 수 (0이면 제한 없음, 넘으면 429)
+        self.rate_limit_per_second = rate_limit_per_second
+        # HTML 페이지 끝에 붙이는 채움 데이터 크기 (큰 페이지 흉내)
+        self.page_padding_kb = page_padding_kb
+        self.json_template = Template(json_template or DEFAULT_JSON_TEMPLATE)
+        self.html_template = Template(html_template or DEFAULT_HTML_TEMPLATE)
+        self.seed = seed
+
+    @classmethod
+    def from_options(cls, options: Dict) -> 'FakeStoreConfig':
+        """add_fake_store_arguments로 받은 관리 명령 옵션으로 생성"""
+        def read(path):
+            return Path(path).read_text(encoding='utf-8') if path else None
+
+        return cls(
+            latency_ms=options['latency_ms'],
+            latency_jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'],
+            change_rate=options['change_rate'],
+            rate_limit_per_second=options['rate_limit'],
+            page_padding_kb=options['page_padding_kb'],
+            json_template=read(options['json_template']),
+            html_template=read(options['html_template']),
+            seed=options['seed'],
+        )
+
+
+def add_fake_store_arguments(parser):
+    """가짜 스토어 설정 옵션 (run_fake_store, benchmark_inventory 공용)"""
+    parser.add_argument('--latency-ms', type=float, default=50, help='평균 응답 지연(ms)')
+    parser.add_argument('--jitter-ms', type=float, default=20, help='응답 지연 편차(ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503 응답 비율 (0~1)')
+    parser.add_argument('--change-rate', type=float, default=0.1, help='요청마다 재고/가격이 바뀔 확률 (0~1)')
+    parser.add_argument('--rate-limit', type=float, default=0,
+                        help='호스트별 초당 허용 요청 수, 넘으면 429 (0이면 제한 없음)')
+    parser.add_argument('--page-padding-kb', type=int, default=0, help='HTML 페이지 끝에 붙일 채움 데이터 크기(KB)')
+    parser.add_argument('--json-template', help='상품 JSON 템플릿 파일 ($stock, $price, $stock_s, $stock_m)')
+    parser.add_argument('--html-template',
+                        help='상품 HTML 템플릿 파일 ($name, $price_text, $stock, $sold_out_text, $disabled, $padding)')
+    parser.add_argument('--seed', type=int, help='재고 변동 난수 시드')
+
+
+class FakeStoreCatalog:
+    """
+    상품별 재고/가격 상태 (처음 요청 때 external_id로부터 정해지고 change_rate 확률로 바뀜)
+    """
+
+    def __init__(self, config: FakeStoreConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self._items: Dict[str, Dict] = {}
+
+    def get(self, external_id: str) -> Dict:
+        with self._lock:
+            item = self._items.get(external_id)
+            if item is None:
+                digest = int(hashlib.md5(external_id.encode('utf-8')).hexdigest(), 16)
+                item = {
+                    'stock': digest % 30,
+                    'price': 10000 + (digest % 90) * 1000,
+                    'modified_at': time.time(),
+                }
+                self._items[external_id] = item
+            elif self.random.random() < self.config.change_rate:
+                sold_out = self.random.random() < self.config.sold_out_rate
+                item['stock'] = 0 if sold_out else self.random.randint(1, 30)
+                item['price'] = max(1000, item['price'] + self.random.choice([-1000, 0, 1000]))
+                item['modified_at'] = time.time()
+            return dict(item)
+
+
+class _FakeStoreHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 본문을 다 읽기 전에 끊는 클라이언트(스트리밍 조기 종료)는 정상 동작
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeStoreServer:
+    """
+    백그라운드 스레드에서 도는 가짜 스토어 HTTP 서버
+
+        server = FakeStoreServer(FakeStoreConfig(latency_ms=30)).start()
+        ...
+        server.stop()
+    """
+
+    def __init__(self, config: Optional[FakeStoreConfig] = None, host: str = '', port: int = 0):
+        self.config = config or FakeStoreConfig()
+        self.catalog = FakeStoreCatalog(self.config)
+        self._stats_lock = threading.Lock()
+        self._stats = defaultdict(lambda: defaultdict(int))
+        self._rate_windows: Dict[str, list] = defaultdict(list)
+        self.httpd = _FakeStoreHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self) -> 'FakeStoreServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """호스트별 요청/304/429/5xx 수"""
+        with self._stats_lock:
+            return {host: dict(stats) for host, stats in self._stats.items()}
+
+    def _count(self, host: str, key: str):
+        with self._stats_lock:
+            self._stats[host][key] += 1
+
+    def _allow(self, host: str) -> bool:
+        """호스트별 1초 구간 요청 수 제한"""
+        limit = self.config.rate_limit_per_second
+        if not limit:
+            return True
+        now = time.monotonic()
+        with self._stats_lock:
+            window = [t for t in self._rate_windows[host] if now - t < 1.0]
+            allowed = len(window) < limit
+            if allowed:
+                window.append(now)
+            self._rate_windows[host] = window
+        return allowed
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                host = (self.headers.get('Host') or '').lower()
+                server._count(host, 'requests')
+
+                config = server.config
+                delay = config.latency_ms + random.uniform(-1, 1) * config.latency_jitter_ms
+                if delay > 0:
+                    time.sleep(delay / 1000)
+
+                if not server._allow(host):
+                    server._count(host, 'rate_limited')
+                    return self._send(429, b'', 'text/plain', {'Retry-After': '1'})
+                if config.error_rate and random.random() < config.error_rate:
+                    server._count(host, 'errors')
+                    return self._send(503, b'unavailable', 'text/plain')
+
+                url = urlparse(self.path)
+                parts = [unquote(part) for part in url.path.strip('/').split('/')]
+                if parts[:2] == ['api', 'products'] and len(parts) == 3:
+                    item = server.catalog.get(parts[2])
+                    body, content_type = self._render_json(item), 'application/json'
+                elif parts == ['api', 'batch']:
+                    ids = parse_qs(url.query).get('ids', [''])[0].split('|')
+                    body = json.dumps({'items': [
+                        {'sku': external_id, **self._item_fields(server.catalog.get(external_id))}
+                        for external_id in ids if external_id
+                    ]}).encode('utf-8')
+                    item, content_type = None, 'application/json'
+                elif parts[:1] == ['products'] and len(parts) == 2:
+                    item = server.catalog.get(parts[1])
+                    body, content_type = self._render_html(parts[1], item), 'text/html; charset=utf-8'
+                else:
+                    return self._send(404, b'not found', 'text/plain')
+
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+                headers = {'ETag': etag}
+                if item is not None:
+                    headers['Last-Modified'] = formatdate(item['modified_at'], usegmt=True)
+                if self.headers.get('If-None-Match') == etag:
+                    server._count(host, 'not_modified')
+                    return self._send(304, b'', None, headers)
+
+                server._count(host, 'ok')
+                self._send(200, body, content_type, headers)
+
+            @staticmethod
+            def _item_fields(item: Dict) -> Dict:
+                return {'stock': item['stock'], 'price': item['price'],
+                        'sizes': {'S': item['stock'] // 2, 'M': item['stock'] - item['stock'] // 2}}
+
+            def _render_json(self, item: Dict) -> bytes:
+                fields = self._item_fields(item)
+                return server.config.json_template.safe_substitute(
+                    stock=fields['stock'], price=fields['price'],
+                    stock_s=fields['sizes']['S'], stock_m=fields['sizes']['M'],
+                ).encode('utf-8')
+
+            def _render_html(self, external_id: str, item: Dict) -> bytes:
+                padding_kb = server.config.page_padding_kb
+                return server.config.html_template.safe_substitute(
+                    name=f'상품 {external_id}',
+                    price=item['price'],
+                    price_text=f"{item['price']:,}",
+                    stock=item['stock'],
+                    sold_out_text='일시품절' if item['stock'] == 0 else '',
+                    disabled='disabled' if item['stock'] == 0 else '',
+                    padding=('<p>' + 'x' * 1000 + '</p>\n') * padding_kb,
+                ).encode('utf-8')
+
+            def _send(self, status_code: int, body: bytes, content_type: Optional[str],
+                      headers: Optional[Dict] = None):
+                self.send_response(status_code)
+                if content_type:
+                    self.send_header('Content-Type', content_type)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if body:
+                    try:
+                        self.wfile.write(body)
+                    except ConnectionError:
+                        self.close_connection = True
+
+        return Handler
@@ -0,0 +1,175 @@
+"""
+비로그인 사용자용 장바구니 (서명된 쿠키 저장, 로그인 시 병합)
+"""
+
+import json
+import logging
+from decimal import Decimal
+from typing import Dict, List
+
+from django.core import signing
+
+from .cart_service import MAX_ITEM_QUANTITY, apply_cart_operations, get_unavailable_reason
+from .models import Cart, Product
+
+logger = logging.getLogger(__name__)
+
+
+GUEST_CART_COOKIE = 'easystyle_guest_cart'
+GUEST_CART_SALT = 'products.guest_cart'
+GUEST_CART_MAX_AGE = 60 * 60 * 24 * 30  # 30일
+
+
+class GuestCart:
+    """
+    서명된 쿠키에 담기는 장바구니
+    아이템은 [상품 UUID, 사이즈, 수량, 스타일 세트 ID] 목록으로 압축 저장되며 DB에는 쓰지 않는다.
+    """
+
+    MAX_ITEMS = 30
+    MAX_QUANTITY = MAX_ITEM_QUANTITY
+
+    def __init__(self, items: List[List] = None):
+        self.items = items or []
+
+    @classmethod
+    def from_request(cls, request) -> 'GuestCart':
+        try:
+            items = json.loads(request.get_signed_cookie(
+                GUEST_CART_COOKIE, salt=GUEST_CART_SALT, max_age=GUEST_CART_MAX_AGE
+            ))
+        except (KeyError, signing.BadSignature, ValueError):
+            return cls()
+
+        if not isinstance(items, list):
+            return cls()
+        return cls([item for item in items if isinstance(item, list) and len(item) == 4][:cls.MAX_ITEMS])
+
+    def save(self, response):
+        if self.items:
+            response.set_signed_cookie(
+                GUEST_CART_COOKIE,
+                json.dumps(self.items, separators=(',', ':')),
+                salt=GUEST_CART_SALT,
+                max_age=GUEST_CART_MAX_AGE,
+                httponly=True,
+                samesite='Lax',
+            )
+        else:
+            self.clear(response)
+
+    @staticmethod
+    def clear(response):
+        response.delete_cookie(GUEST_CART_COOKIE, samesite='Lax')
+
+    def _find(self, product_uuid: str, size: str):
+        for item in self.items:
+            if item[0] == product_uuid and item[1] == size:
+                return item
+        return None
+
+    def add(self, product_uuid: str, size: str = '', quantity: int = 1, style_set_id: str = '') -> bool:
+        """아이템 추가 (같은 상품/사이즈면 수량 증가), 최대 개수 초과 시 False"""
+        item = self._find(product_uuid, size)
+        if item:
+            item[2] = min(item[2] + quantity, self.MAX_QUANTITY)
+            if style_set_id:
+                item[3] = style_set_id
+            return True
+
+        if len(self.items) >= self.MAX_ITEMS:
+            return False
+        self.items.append([product_uuid, size, min(quantity, self.MAX_QUANTITY), style_set_id])
+        return True
+
+    def update(self, product_uuid: str, size: str, quantity: int) -> bool:
+        item = self._find(product_uuid, size)
+        if not item:
+            return False
+        item[2] = min(quantity, self.MAX_QUANTITY)
+        return True
+
+    def remove(self, product_uuid: str, size: str = '') -> bool:
+        item = self._find(product_uuid, size)
+        if not item:
+            return False
+        self.items.remove(item)
+        return True
+
+    def to_representation(self, context=None) -> Dict:
+        """
+        장바구니 응답과 같은 형태로 변환 (상품 정보는 한 번의 쿼리로 조회)
+        """
+        from .serializers import ProductListSerializer
+
+        products = {
+            str(product.uuid): product
+            for product in Product.objects.filter(
+                uuid__in=[item[0] for item in self.items]
+            ).select_related('brand', 'category', 'store')
+        }
+
+        items, total_items, total_price = [], 0, Decimal('0')
+        for product_uuid, size, quantity, style_set_id in self.items:
+            product = products.get(product_uuid)
+            if not product:
+                continue
+            subtotal = product.current_price * quantity
+            total_items += quantity
+            total_price += subtotal
+            items.append({
+                'product': ProductListSerializer(product, context=context or {}).data,
+                'size': size,
+                'quantity': quantity,
+                'style_set_id': style_set_id,
+                'subtotal': subtotal,
+            })
+
+        return {
+            'items': items,
+            'total_items': total_items,
+            'total_price': total_price,
+            'is_guest': True,
+        }
+
+
+def merge_guest_cart(request, user, response) -> int:
+    """
+    로그인/회원가입 시 쿠키 장바구니를 사용자 장바구니에 한 번의 일괄 upsert로 병합
+    병합 후 쿠키를 삭제하고, 병합된 아이템 수를 반환
+    """
+    guest_cart = GuestCart.from_request(request)
+    if not guest_cart.items:
+        return 0
+
+    try:
+        products = {
+            str(product.uuid): product
+            for product in Product.objects.filter(
+                uuid__in=[item[0] for item in guest_cart.items]
+            ).select_related('inventory_status')
+        }
+        operations = [
+            {
+                'op': 'add',
+                'product_uuid': product_uuid,
+                'size': size,
+                'quantity': quantity,
+                'style_set_id': style_set_id,
+            }
+            for product_uuid, size, quantity, style_set_id in guest_cart.items
+            if product_uuid in products and not get_unavailable_reason(products[product_uuid], size)
+        ]
+
+        merged = 0
+        if operations:
+            cart, created = Cart.objects.get_or_create(user=user)
+            summary = apply_cart_operations(cart, operations, products=products)
+            merged = summary['added'] + summary['updated']
+    except Exception as e:
+        # 장바구니 병합 실패가 로그인 자체를 막지 않도록 함
+        logger.error(f'비로그인 장바구니 병합 실패 - {user}: {str(e)}')
+        return 0
+
+    GuestCart.clear(response)
+    return merged
@@ -0,0 +1,89 @@
+"""
+비로그인 사용자 장바구니 API 뷰 (서명된 쿠키 기반, DB 쓰기 없음)
+"""
+
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .guest_cart import GuestCart
+from .models import Product
+from .serializers import AddToCartSerializer, UpdateCartItemSerializer
+
+
+def _guest_cart_response(request, guest_cart, status_code=status.HTTP_200_OK):
+    response = Response(guest_cart.to_representation({'request': request}), status=status_code)
+    guest_cart.save(response)
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_guest_cart(request):
+    """
+    비로그인 장바구니 조회
+    """
+    return _guest_cart_response(request, GuestCart.from_request(request))
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def add_guest_cart_item(request):
+    """
+    비로그인 장바구니에 상품 추가
+    """
+    serializer = AddToCartSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+
+    if not Product.objects.filter(uuid=data['product_uuid'], is_available=True).exists():
+        return Response({'error': 'Product not found or not available'}, status=status.HTTP_400_BAD_REQUEST)
+
+    guest_cart = GuestCart.from_request(request)
+    if not guest_cart.add(str(data['product_uuid']), data.get('size', ''), data['quantity'], data.get('style_set_id', '')):
+        return Response({'error': f'장바구니에는 최대 {GuestCart.MAX_ITEMS}개의 상품만 담을 수 있습니다.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    return _guest_cart_response(request, guest_cart, status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def update_guest_cart_item(request):
+    """
+    비로그인 장바구니 아이템 수량 변경
+    """
+    serializer = UpdateCartItemSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    guest_cart = GuestCart.from_request(request)
+    if not guest_cart.update(str(request.data.get('product_uuid', '')), request.data.get('size', ''),
+                             serializer.validated_data['quantity']):
+        return Response({'error': 'Item not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    return _guest_cart_response(request, guest_cart)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def remove_guest_cart_item(request):
+    """
+    비로그인 장바구니에서 상품 제거
+    """
+    guest_cart = GuestCart.from_request(request)
+    if not guest_cart.remove(str(request.data.get('product_uuid', '')), request.data.get('size', '')):
+        return Response({'error': 'Item not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    return _guest_cart_response(request, guest_cart)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def clear_guest_cart(request):
+    """
+    비로그인 장바구니 비우기
+    """
+    return _guest_cart_response(request, GuestCart())
@@ -0,0 +1,377 @@
+"""
+스크래핑 스토어용 선택적 HTML 추출 엔진
+
+StoreApiConfig의 셀렉터와 품절 키워드를 한 번만 컴파일해 둔다. 트리를 만들지 않는 스트리밍
+파서(html.parser) 하나가 셀렉터 요소를 찾으면서, 화면에 보이는 텍스트(script/style/template
+내용과 주석 제외)만 품절 키워드 정규식으로 훑는다.
+"""
+
+import codecs
+import re
+import threading
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 닫는 태그가 없는 요소
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+])
+
+_COMPOUND_RE = re.compile(
+    r'(?P<tag>[a-zA-Z][\w-]*|\*)?'
+    r'(?P<rest>(?:#[\w-]+|\.[\w-]+|\[[^\]]+\])*)'
+)
+_PART_RE = re.compile(r'#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+)|\[(?P<attr>[^\]]+)\]')
+_ATTR_RE = re.compile(r'^\s*([\w:-]+)\s*(?:([~^$*|]?=)\s*["\']?(.*?)["\']?\s*)?$')
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+# 내용이 화면에 보이는 텍스트가 아닌 요소 (품절 키워드 검색에서 제외)
+RAW_TEXT_ELEMENTS = frozenset(['script', 'style', 'template'])
+
+# 파서에 한 번에 넣는 크기 (이 단위로 조기 종료 여부 확인)
+PARSE_CHUNK_SIZE = 8 * 1024
+
+# meta charset을 찾을 때 보는 본문 앞부분 크기
+CHARSET_SNIFF_BYTES = 2048
+
+DIGITS_RE = re.compile(r'\d+')
+
+
+class SelectorSyntaxError(ValueError):
+    """
+    지원하지 않는 CSS 셀렉터
+    """
+
+
+class CompoundSelector:
+    """
+    단일 요소 조건 (tag#id.class[attr=value])
+    """
+
+    def __init__(self, text: str):
+        match = _COMPOUND_RE.fullmatch(text)
+        if not match or not text:
+            raise SelectorSyntaxError(f'지원하지 않는 셀렉터: {text}')
+
+        tag = match.group('tag')
+        self.tag = tag.lower() if tag and tag != '*' else None
+        self.element_id = None
+        self.classes = []
+        self.attributes = []
+
+        for part in _PART_RE.finditer(match.group('rest')):
+            if part.group('id'):
+                self.element_id = part.group('id')
+            elif part.group('cls'):
+                self.classes.append(part.group('cls'))
+            else:
+                attr = _ATTR_RE.match(part.group('attr'))
+                if not attr:
+                    raise SelectorSyntaxError(f'지원하지 않는 속성 셀렉터: [{part.group("attr")}]')
+                self.attributes.append((attr.group(1).lower(), attr.group(2), attr.group(3)))
+
+    def matches(self, element: Tuple[str, Dict[str, str], frozenset]) -> bool:
+        tag, attrs, classes = element
+        if self.tag and self.tag != tag:
+            return False
+        if self.element_id and attrs.get('id') != self.element_id:
+            return False
+        if self.classes and not classes.issuperset(self.classes):
+            return False
+
+        for name, operator, expected in self.attributes:
+            if name not in attrs:
+                return False
+            value = attrs[name] or ''
+            if operator == '=' and value != expected:
+                return False
+            if operator == '~=' and expected not in value.split():
+                return False
+            if operator == '^=' and not value.startswith(expected):
+                return False
+            if operator == '$=' and not value.endswith(expected):
+                return False
+            if operator == '*=' and expected not in value:
+                return False
+            if operator == '|=' and value != expected and not value.startswith(f'{expected}-'):
+                return False
+        return True
+
+
+class Selector:
+    """
+    자손(공백)/자식(>) 결합자와 쉼표 목록을 지원하는 CSS 셀렉터 부분집합
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.alternatives = [self._compile_chain(part) for part in text.split(',') if part.strip()]
+        if not self.alternatives:
+            raise SelectorSyntaxError(f'빈 셀렉터: {text!r}')
+
+    @staticmethod
+    def _compile_chain(text: str) -> List[Tuple[Optional[str], CompoundSelector]]:
+        tokens = text.replace('>', ' > ').split()
+        chain, combinator = [], None
+        for token in tokens:
+            if token == '>':
+                combinator = '>'
+                continue
+            chain.append((combinator if chain else None, CompoundSelector(token)))
+            combinator = ' '
+        if combinator == '>':
+            raise SelectorSyntaxError(f'잘못된 결합자: {text}')
+        return chain
+
+    def matches(self, stack: List[Tuple[str, Dict[str, str], frozenset]]) -> bool:
+        """
+        stack의 마지막 요소가 셀렉터와 일치하는지 (조상 요소들과 함께 검사)
+        """
+        return any(self._match_chain(chain, len(chain) - 1, stack, len(stack) - 1) for chain in self.alternatives)
+
+    def _match_chain(self, chain, chain_index: int, stack, stack_index: int) -> bool:
+        combinator, compound = chain[chain_index]
+        if stack_index < 0 or not compound.matches(stack[stack_index]):
+            return False
+        if chain_index == 0:
+            return True
+
+        # 현재 조건의 결합자가 앞 조건과의 관계를 결정
+        if combinator == '>':
+            return self._match_chain(chain, chain_index - 1, stack, stack_index - 1)
+        return any(
+            self._match_chain(chain, chain_index - 1, stack, ancestor)
+            for ancestor in range(stack_index - 1, -1, -1)
+        )
+
+
+class CompiledExtractor:
+    """
+    스토어 설정 하나에 대해 컴파일된 셀렉터/키워드 묶음
+    """
+
+    FIELDS = ('inventory', 'price', 'availability')
+
+    def __init__(self, inventory_selector: str = '', price_selector: str = '',
+                 availability_selector: str = '', unavailable_keywords: Optional[List[str]] = None):
+        self.selectors = {}
+        for field, text in zip(self.FIELDS, (inventory_selector, price_selector, availability_selector)):
+            if text and text.strip():
+                self.selectors[field] = Selector(text.strip())
+
+        # 품절 키워드는 하나의 정규식으로 묶어 텍스트를 한 번만 훑는다
+        keywords = sorted({k.lower() for k in (unavailable_keywords or []) if k}, key=len, reverse=True)
+        self.keyword_pattern = re.compile('|'.join(re.escape(k) for k in keywords)) if keywords else None
+        self.keyword_max_length = max((len(k) for k in keywords), default=0)
+
+    @classmethod
+    def from_config(cls, store_config) -> 'CompiledExtractor':
+        return cls(
+            inventory_selector=store_config.inventory_selector,
+            price_selector=store_config.price_selector,
+            availability_selector=store_config.availability_selector,
+            unavailable_keywords=store_config.unavailable_keywords,
+        )
+
+    def keyword_scanner(self) -> 'KeywordScanner':
+        return KeywordScanner(self.keyword_pattern, self.keyword_max_length)
+
+    def parser(self) -> '_ExtractionParser':
+        """점진적으로 feed할 수 있는 셀렉터 파서 생성"""
+        return _ExtractionParser(self)
+
+    def extract(self, html: str) -> Dict:
+        """
+        페이지에서 품절 키워드와 셀렉터별 첫 요소 추출
+        모든 셀렉터의 요소를 찾고 품절 키워드도 찾았으면(또는 키워드 설정이 없으면) 나머지는 파싱하지 않는다.
+        """
+        parser = self.parser()
+        for start in range(0, len(html), PARSE_CHUNK_SIZE):
+            parser.feed(html[start:start + PARSE_CHUNK_SIZE])
+            if parser.done and (parser.keyword or self.keyword_pattern is None):
+                break
+        elements = parser.finish()
+        return {'keyword': parser.keyword, 'elements': elements}
+
+    def extract_stream(self, chunks: Iterable[bytes], content_type: str = '') -> Dict:
+        """
+        응답 본문 청크를 받는 대로 디코딩/검색/파싱하고, 결과가 정해지면 나머지는 읽지 않음
+
+        extract()와 같은 기준으로, 모든 셀렉터의 요소를 찾고 품절 키워드도 찾았으면(또는 키워드 설정이 없으면)
+        나머지는 읽지 않고 멈춘다(complete=False). 품절 키워드가 셀렉터 요소보다 뒤에 나올 수 있으므로
+        키워드를 찾지 못한 페이지는 끝(또는 최대 크기)까지 읽는다.
+        """
+        parser = self.parser()
+        decoder, head = None, b''
+
+        for chunk in chunks:
+            if decoder is None:
+                # meta charset을 찾을 수 있도록 앞부분을 모은 뒤 디코더 결정
+                head += chunk
+                if len(head) < CHARSET_SNIFF_BYTES and 'charset=' not in (content_type or ''):
+                    continue
+                decoder = _incremental_decoder(detect_charset(head, content_type))
+                chunk, head = head, b''
+
+            parser.feed(decoder.decode(chunk))
+            if parser.done and (parser.keyword or self.keyword_pattern is None):
+                elements = parser.finish()
+                return {'keyword': parser.keyword, 'elements': elements, 'complete': False}
+
+        if decoder is None:
+            decoder = _incremental_decoder(detect_charset(head, content_type))
+        parser.feed(decoder.decode(head, final=True))
+        elements = parser.finish()
+        return {'keyword': parser.keyword, 'elements': elements, 'complete': True}
+
+
+class KeywordScanner:
+    """
+    파서가 넘겨주는 텍스트 조각에서 품절 키워드를 단일 정규식으로 검색
+    (조각 경계에 걸친 키워드도 찾도록 앞 조각의 끝부분을 이어 붙임)
+    """
+
+    def __init__(self, pattern: Optional[re.Pattern], max_length: int):
+        self.pattern = pattern
+        self.max_length = max_length
+        self.keyword = None
+        self._tail = ''
+
+    def feed(self, data: str) -> Optional[str]:
+        if self.pattern is None or self.keyword:
+            return self.keyword
+
+        text = self._tail + data.lower()
+        match = self.pattern.search(text)
+        if match:
+            self.keyword = match.group(0)
+        self._tail = text[-(self.max_length - 1):] if self.max_length > 1 else ''
+        return self.keyword
+
+
+class _ExtractionParser(HTMLParser):
+    """
+    트리를 만들지 않고 열린 요소 스택만 유지하며 셀렉터별 첫 일치 요소의 텍스트/속성을 수집하고,
+    보이는 텍스트는 품절 키워드 검색기로 넘김 (주석은 handle_comment로 와서 자연히 제외)
+    """
+
+    def __init__(self, extractor: CompiledExtractor):
+        super().__init__(convert_charrefs=True)
+        self.extractor = extractor
+        self.scanner = extractor.keyword_scanner()
+        self.stack = []
+        self.found = {}
+        self.capturing = {}
+        self.raw_text_depth = 0
+
+    @property
+    def keyword(self) -> Optional[str]:
+        return self.scanner.keyword
+
+    @property
+    def done(self) -> bool:
+        """모든 셀렉터의 요소를 찾아 더 읽을 필요가 없는지"""
+        return not self.capturing and len(self.found) == len(self.extractor.selectors)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        element = (tag, attrs, frozenset((attrs.get('class') or '').split()))
+        self.stack.append(element)
+        if tag in RAW_TEXT_ELEMENTS:
+            self.raw_text_depth += 1
+
+        for field, selector in self.extractor.selectors.items():
+            if field not in self.found and selector.matches(self.stack):
+                self.found[field] = {'attrs': attrs, 'classes': element[2], 'text': []}
+                self.capturing[field] = len(self.stack)
+
+        if tag in VOID_ELEMENTS:
+            self._close_to(len(self.stack) - 1)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self._close_to(len(self.stack) - 1)
+
+    def handle_endtag(self, tag):
+        # 짝이 맞지 않는 닫는 태그는 가장 가까운 같은 태그까지 닫고, 없으면 무시
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                self._close_to(index)
+                return
+
+    def _close_to(self, depth: int):
+        self.raw_text_depth -= sum(1 for element in self.stack[depth:] if element[0] in RAW_TEXT_ELEMENTS)
+        del self.stack[depth:]
+        for field in [f for f, d in self.capturing.items() if d > depth]:
+            del self.capturing[field]
+
+    def handle_data(self, data):
+        for field in self.capturing:
+            self.found[field]['text'].append(data)
+        if not self.raw_text_depth:
+            self.scanner.feed(data)
+
+    def finish(self) -> Dict:
+        """셀렉터별 첫 일치 요소 {필드: {text, attrs, classes}}"""
+        # 버퍼에 남은 텍스트까지 처리 (셀렉터 요소나 품절 키워드를 아직 찾는 중일 때만)
+        if not self.done or (self.scanner.pattern is not None and not self.keyword):
+            self.close()
+        return {
+            field: {
+                'text': ''.join(element['text']).strip(),
+                'attrs': element['attrs'],
+                'classes': element['classes'],
+            }
+            for field, element in self.found.items()
+        }
+
+
+_extractor_cache = {}
+_extractor_cache_lock = threading.Lock()
+
+
+def get_extractor(store_config) -> CompiledExtractor:
+    """
+    스토어 설정별 컴파일된 추출기 (설정이 수정되면 다시 컴파일)
+    """
+    key = (store_config.pk, store_config.updated_at)
+    extractor = _extractor_cache.get(key)
+    if extractor is None:
+        extractor = CompiledExtractor.from_config(store_config)
+        with _extractor_cache_lock:
+            for stale_key in [k for k in _extractor_cache if k[0] == store_config.pk]:
+                del _extractor_cache[stale_key]
+            _extractor_cache[key] = extractor
+    return extractor
+
+
+def detect_charset(head: bytes, content_type: str = '') -> str:
+    """
+    본문 문자셋 (Content-Type 헤더 > meta charset > UTF-8 순)
+    """
+    if 'charset=' in (content_type or ''):
+        charset = content_type.split('charset=')[-1].split(';')[0].strip().strip('"\'')
+        if charset:
+            return charset
+    match = _META_CHARSET_RE.search(head[:CHARSET_SNIFF_BYTES])
+    return match.group(1).decode('ascii') if match else 'utf-8'
+
+
+def _incremental_decoder(charset: str):
+    try:
+        return codecs.getincrementaldecoder(charset)(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+def decode_html(content: bytes, content_type: str = '') -> str:
+    """
+    응답 본문 디코딩 (Content-Type 헤더 > meta charset > UTF-8 순)
+    """
+    charset = detect_charset(content, content_type)
+    try:
+        return content.decode(charset, errors='replace')
+    except LookupError:
+        return content.decode('utf-8', errors='replace')
@@ -0,0 +1,195 @@
+"""
+스타일링 상품 재고 확인 백그라운드 작업
+
+작업 상태와 진행 이벤트는 캐시에 저장된다. 요청은 작업 ID를 바로 받고, 상품별 확인 결과와
+대체 상품은 끝나는 대로 이벤트로 쌓여 폴링(after=<seq>) 또는 SSE로 전달된다.
+
+캐시 키 (결과 하나마다 이벤트 키 하나와 작은 진행 상황 키만 다시 쓴다)
+- inventory:job:<id>            작업 상태 (상태가 바뀔 때만 갱신)
+- inventory:job:<id>:progress   이벤트 수와 완료된 상품 수
+- inventory:job:<id>:event:<seq> 이벤트 하나
+"""
+
+import json
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .inventory_service import InventoryCheckBatch, inventory_scheduler
+
+JOB_KEY_PREFIX = 'inventory:job'
+JOB_TTL = 60 * 60
+
+# SSE 연결을 유지하는 최대 시간 (끊기면 Last-Event-ID로 이어받음)
+STREAM_MAX_SECONDS = 120
+STREAM_POLL_INTERVAL = 0.5
+STREAM_KEEPALIVE_SECONDS = 15
+
+
+def _job_key(job_id: str) -> str:
+    return f'{JOB_KEY_PREFIX}:{job_id}'
+
+
+def _progress_key(job_id: str) -> str:
+    return f'{_job_key(job_id)}:progress'
+
+
+def _event_key(job_id: str, seq: int) -> str:
+    return f'{_job_key(job_id)}:event:{seq}'
+
+
+def create_styling_job(user_id: int, product_ids: List[int]) -> Dict:
+    """
+    대기 상태의 작업 생성
+    """
+    job = {
+        'job_id': uuid.uuid4().hex,
+        'user_id': user_id,
+        'product_ids': product_ids,
+        'status': 'pending',
+        'total': len(product_ids),
+        'summary': None,
+        'error': '',
+        'created_at': timezone.now().isoformat(),
+        'finished_at': None,
+    }
+    cache.set_many({
+        _job_key(job['job_id']): job,
+        _progress_key(job['job_id']): {'event_count': 0, 'completed': 0},
+    }, timeout=JOB_TTL)
+    return {**job, 'completed': 0, 'events': []}
+
+
+def get_job(job_id: str, user_id: Optional[int] = None, after: int = 0) -> Optional[Dict]:
+    """
+    작업 조회 (user_id를 넘기면 해당 사용자의 작업만, 이벤트는 after 이후만)
+
+    작업 상태 -> 진행 상황 -> 이벤트 순으로 읽고 쓰기는 그 반대 순서라,
+    끝난 작업으로 읽히면 마지막 이벤트까지 모두 포함된다.
+    """
+    job = cache.get(_job_key(job_id))
+    if job is None or (user_id is not None and job['user_id'] != user_id):
+        return None
+
+    progress = cache.get(_progress_key(job_id)) or {'event_count': 0, 'completed': 0}
+    keys = [_event_key(job_id, seq) for seq in range(after + 1, progress['event_count'] + 1)]
+    events = cache.get_many(keys) if keys else {}
+    return {**job, 'completed': progress['completed'], 'events': [events[key] for key in keys if key in events]}
+
+
+def fail_job(job_id: str, error: str):
+    job = cache.get(_job_key(job_id))
+    if job is not None:
+        job.update(status='failed', error=error, finished_at=timezone.now().isoformat())
+        cache.set(_job_key(job_id), job, timeout=JOB_TTL)
+
+
+class StylingJobRunner:
+    """
+    작업 하나를 실행하며 결과가 나올 때마다 캐시에 이벤트를 추가
+
+    확인 결과 콜백은 스토어별 워커 스레드에서 호출되므로 상태 갱신은 락으로 직렬화한다.
+    이벤트 -> 진행 상황 -> 작업 상태 순으로 써서 읽는 쪽이 없는 이벤트를 가리키지 않게 한다.
+    """
+
+    def __init__(self, job: Dict):
+        self.job = {key: value for key, value in job.items() if key not in ('completed', 'events')}
+        self.event_count = len(job.get('events', []))
+        self.completed = job.get('completed', 0)
+        self._lock = threading.Lock()
+
+    def _publish(self, event_type: str, data: Dict, count_completed: bool = False, **changes):
+        job_id = self.job['job_id']
+        with self._lock:
+            self.event_count += 1
+            cache.set(_event_key(job_id, self.event_count),
+                      {'seq': self.event_count, 'type': event_type, 'data': data}, timeout=JOB_TTL)
+            if count_completed:
+                self.completed += 1
+            cache.set(_progress_key(job_id), {'event_count': self.event_count, 'completed': self.completed},
+                      timeout=JOB_TTL)
+            if changes:
+                self.job.update(changes)
+                cache.set(_job_key(job_id), self.job, timeout=JOB_TTL)
+
+    def on_result(self, result: Dict):
+        self._publish('result', InventoryCheckBatch.json_payload(result), count_completed=True)
+
+    def on_alternatives(self, product_id: int, alternatives: List[Dict]):
+        self._publish('alternatives', {'product_id': product_id, 'alternatives': alternatives})
+
+    def run(self) -> Dict:
+        self._publish('status', {'status': 'running'}, status='running')
+        try:
+            summary = inventory_scheduler.check_styling_products(
+                self.job['product_ids'], on_result=self.on_result, on_alternatives=self.on_alternatives
+            )
+        except Exception as e:
+            self._publish('failed', {'error': str(e)}, status='failed', error=str(e),
+                          finished_at=timezone.now().isoformat())
+            raise
+
+        summary = {key: value for key, value in summary.items() if key not in ('results', 'alternatives')}
+        self._publish('done', summary, status='completed', summary=summary,
+                      finished_at=timezone.now().isoformat())
+        return summary
+
+
+def run_styling_job(job_id: str) -> Optional[Dict]:
+    job = get_job(job_id)
+    if job is None or job['status'] != 'pending':
+        return None
+    return StylingJobRunner(job).run()
+
+
+def job_snapshot(job: Dict, after: int = 0) -> Dict:
+    """
+    폴링 응답: 진행 상황과 after 이후의 이벤트
+    """
+    return {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'total': job['total'],
+        'completed': job['completed'],
+        'summary': job['summary'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'finished_at': job['finished_at'],
+        'events': [event for event in job['events'] if event['seq'] > after],
+    }
+
+
+def stream_job_events(job_id: str, user_id: int, after: int = 0) -> Iterator[str]:
+    """
+    SSE 형식으로 새 이벤트를 전달하고, 작업이 끝나거나 최대 연결 시간이 지나면 종료
+    """
+    deadline = time.monotonic() + STREAM_MAX_SECONDS
+    last_sent = time.monotonic()
+    yield 'retry: 1000\n\n'
+
+    while True:
+        job = get_job(job_id, user_id, after)
+        if job is None:
+            yield 'event: failed\ndata: {"error": "job not found"}\n\n'
+            return
+
+        for event in job['events']:
+            if event['seq'] > after:
+                data = json.dumps(event['data'], cls=DjangoJSONEncoder, ensure_ascii=False)
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {data}\n\n"
+                after = event['seq']
+                last_sent = time.monotonic()
+
+        if job['status'] in ('completed', 'failed') or time.monotonic() >= deadline:
+            return
+
+        # 프록시가 유휴 연결을 끊지 않도록 주기적으로 주석 한 줄
+        if time.monotonic() - last_sent >= STREAM_KEEPALIVE_SECONDS:
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+        time.sleep(STREAM_POLL_INTERVAL)
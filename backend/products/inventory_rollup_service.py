@@ -0,0 +1,223 @@
+"""
+재고 확인 로그 롤업과 보존 기간 관리
+
+- 상품별 일별 집계(InventoryCheckDailySummary)를 스토어별 일별 롤업으로 합산
+- 보존 기간이 지난 확인 로그는 월별 보관 테이블(easystyle_inventory_check_logs_archive_YYYYMM)로
+  옮긴 뒤 원본 테이블에서 삭제하고, 보관 기간이 지난 보관 테이블은 통째로 삭제
+- 보존 기간이 지난 일별 집계/롤업, 변경 이벤트 삭제
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from .inventory_service import InventoryScheduler
+from .models import InventoryChangeEvent, InventoryCheckDailySummary, InventoryCheckLog, InventoryCheckStoreRollup
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_TABLE_PREFIX = f'{InventoryCheckLog._meta.db_table}_archive_'
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def archive_table_name(month: date) -> str:
+    return f'{ARCHIVE_TABLE_PREFIX}{month:%Y%m}'
+
+
+class InventoryCheckRollup:
+    """
+    스토어별 일별 롤업 갱신 + 확인 로그 보관/삭제 (정기 작업으로 실행, 여러 번 실행해도 같은 결과)
+    """
+
+    def __init__(self, rollup_days: int = 2, log_retention_days: Optional[int] = None,
+                 archive_months: Optional[int] = None, summary_retention_days: Optional[int] = None,
+                 event_retention_days: Optional[int] = None):
+        easystyle_settings = settings.EASYSTYLE_SETTINGS
+        self.rollup_days = max(rollup_days, 1)
+        # 확인 간격 계산이 최근 변경 로그를 읽으므로 그보다 짧게 보존하지 않음
+        self.log_retention_days = max(
+            log_retention_days or easystyle_settings.get('INVENTORY_CHECK_LOG_RETENTION_DAYS', 30),
+            InventoryScheduler.change_window_days,
+        )
+        self.archive_months = archive_months if archive_months is not None else \
+            easystyle_settings.get('INVENTORY_CHECK_LOG_ARCHIVE_MONTHS', 6)
+        self.summary_retention_days = summary_retention_days or \
+            easystyle_settings.get('INVENTORY_CHECK_SUMMARY_RETENTION_DAYS', 90)
+        self.event_retention_days = event_retention_days or \
+            easystyle_settings.get('INVENTORY_CHANGE_EVENT_RETENTION_DAYS', 30)
+
+    def run(self, today: Optional[date] = None) -> Dict:
+        today = today or timezone.localdate()
+        stats = {'rollups_updated': self.refresh_store_rollups(today - timedelta(days=self.rollup_days - 1), today)}
+        stats.update(self.archive_logs(today))
+        stats['archive_tables_dropped'] = self.drop_expired_archives(today)
+
+        summary_cutoff = today - timedelta(days=self.summary_retention_days)
+        stats['summaries_deleted'], _ = InventoryCheckDailySummary.objects.filter(date__lt=summary_cutoff).delete()
+        stats['rollups_deleted'], _ = InventoryCheckStoreRollup.objects.filter(date__lt=summary_cutoff).delete()
+        stats['events_deleted'], _ = InventoryChangeEvent.objects.filter(
+            created_at__lt=timezone.now() - timedelta(days=self.event_retention_days)
+        ).delete()
+
+        logger.info(f'재고 확인 롤업 완료: {stats}')
+        return stats
+
+    def refresh_store_rollups(self, first_day: date, last_day: date) -> int:
+        """
+        기간 안의 상품별 일별 집계를 스토어/날짜별로 합산해 롤업 행을 다시 계산
+        """
+        summaries = InventoryCheckDailySummary.objects.filter(date__gte=first_day, date__lte=last_day)
+        totals = summaries.values('product__store_id', 'date').annotate(
+            products=Count('id'), checks=Sum('check_count'), successes=Sum('success_count'),
+            failures=Sum('failure_count'), response_time=Sum('total_response_time_ms'),
+            max_response_time=Max('max_response_time_ms'),
+        ).order_by()
+
+        histograms = defaultdict(list)
+        for store_id, day, histogram in summaries.values_list(
+            'product__store_id', 'date', 'response_time_histogram'
+        ).iterator():
+            histograms[store_id, day].append(histogram)
+
+        rollups = []
+        for row in totals:
+            histogram = InventoryCheckDailySummary.merge_histograms(*histograms[row['product__store_id'], row['date']])
+            rollups.append(InventoryCheckStoreRollup(
+                store_id=row['product__store_id'],
+                date=row['date'],
+                product_count=row['products'],
+                check_count=row['checks'],
+                success_count=row['successes'],
+                failure_count=row['failures'],
+                average_response_time_ms=row['response_time'] / row['checks'] if row['checks'] else 0.0,
+                p95_response_time_ms=InventoryCheckDailySummary.histogram_percentile(histogram, 95),
+                max_response_time_ms=row['max_response_time'] or 0,
+                response_time_histogram=histogram,
+                updated_at=timezone.now(),
+            ))
+
+        InventoryCheckStoreRollup.objects.bulk_create(
+            rollups,
+            update_conflicts=True,
+            unique_fields=['store', 'date'],
+            update_fields=[
+                'product_count', 'check_count', 'success_count', 'failure_count', 'average_response_time_ms',
+                'p95_response_time_ms', 'max_response_time_ms', 'response_time_histogram', 'updated_at',
+            ],
+        )
+        return len(rollups)
+
+    def archive_logs(self, today: date) -> Dict:
+        """
+        보존 기간이 지난 확인 로그를 월별 보관 테이블로 옮기고 원본에서 삭제 (월 단위 트랜잭션)
+        """
+        cutoff = timezone.make_aware(datetime.combine(today - timedelta(days=self.log_retention_days),
+                                                      datetime.min.time()))
+        expired = InventoryCheckLog.objects.filter(checked_at__lt=cutoff).order_by()
+        stats = {'logs_archived': 0, 'archive_tables': []}
+
+        oldest = expired.aggregate(oldest=Min('checked_at'))['oldest']
+        if oldest is None:
+            return stats
+
+        month = _month_start(timezone.localdate(oldest))
+        while timezone.make_aware(datetime.combine(month, datetime.min.time())) < cutoff:
+            next_month = _add_months(month, 1)
+            month_logs = expired.filter(
+                checked_at__gte=timezone.make_aware(datetime.combine(month, datetime.min.time())),
+                checked_at__lt=timezone.make_aware(datetime.combine(next_month, datetime.min.time())),
+            )
+            with transaction.atomic():
+                archived = self._copy_to_archive(month_logs, archive_table_name(month))
+                if archived:
+                    month_logs.delete()
+                    stats['logs_archived'] += archived
+                    stats['archive_tables'].append(archive_table_name(month))
+            month = next_month
+
+        return stats
+
+    @staticmethod
+    def _copy_to_archive(logs, table: str) -> int:
+        """
+        보관 테이블이 없으면 로그 테이블과 같은 컬럼으로 만들고 INSERT ... SELECT로 복사
+        """
+        quote = connection.ops.quote_name
+        fields = InventoryCheckLog._meta.concrete_fields
+        columns = ', '.join(quote(field.column) for field in fields)
+        select_sql, params = logs.values_list(*[field.attname for field in fields]).query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {quote(table)} AS '
+                f'SELECT * FROM {quote(InventoryCheckLog._meta.db_table)} WHERE 1 = 0'
+            )
+            cursor.execute(f'INSERT INTO {quote(table)} ({columns}) {select_sql}', params)
+            return cursor.rowcount
+
+    def drop_expired_archives(self, today: date) -> List[str]:
+        """
+        보관 기간(개월)이 지난 월별 보관 테이블 삭제
+        """
+        oldest_kept = archive_table_name(_add_months(_month_start(today), -self.archive_months))
+        dropped = [
+            table for table in connection.introspection.table_names()
+            if table.startswith(ARCHIVE_TABLE_PREFIX) and table < oldest_kept
+        ]
+        with connection.cursor() as cursor:
+            for table in dropped:
+                cursor.execute(f'DROP TABLE {connection.ops.quote_name(table)}')
+        return dropped
+
+
+def get_check_activity(days: int = 1, today: Optional[date] = None) -> Dict:
+    """
+    최근(오늘 포함 days+1일) 재고 확인 수/성공률/응답 시간 합계
+
+    롤업이 끝난 지난 날짜는 스토어별 롤업을 읽고, 오늘과 아직 롤업되지 않은 날짜는
+    상품별 일별 집계를 바로 합산한다 (롤업 작업 전에도 최근 확인이 빠지지 않도록).
+    """
+    today = today or timezone.localdate()
+    from_date = today - timedelta(days=days)
+    rollups = list(InventoryCheckStoreRollup.objects.filter(date__gte=from_date, date__lt=today).values_list(
+        'date', 'check_count', 'success_count', 'failure_count', 'average_response_time_ms', 'response_time_histogram'
+    ))
+    rolled_up_dates = {row[0] for row in rollups}
+
+    live = InventoryCheckDailySummary.objects.filter(date__gte=from_date, date__lte=today).exclude(
+        date__in=rolled_up_dates
+    )
+    live_totals = live.aggregate(
+        checks=Sum('check_count'), successes=Sum('success_count'), failures=Sum('failure_count'),
+        response_time=Sum('total_response_time_ms'),
+    )
+
+    total = sum(row[1] for row in rollups) + (live_totals['checks'] or 0)
+    successes = sum(row[2] for row in rollups) + (live_totals['successes'] or 0)
+    response_time = sum(row[1] * row[4] for row in rollups) + (live_totals['response_time'] or 0)
+    histogram = InventoryCheckDailySummary.merge_histograms(
+        *[row[5] for row in rollups],
+        *live.values_list('response_time_histogram', flat=True).iterator(),
+    )
+    return {
+        'from_date': from_date,
+        'total_checks': total,
+        'successful_checks': successes,
+        'failed_checks': sum(row[3] for row in rollups) + (live_totals['failures'] or 0),
+        'average_response_time_ms': response_time / total if total else 0,
+        'p95_response_time_ms': InventoryCheckDailySummary.histogram_percentile(histogram, 95),
+    }
@@ -3,37 +3,535 @@
 """
 
 import requests
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models import F, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
 from django.utils import timezone
 from django.conf import settings
-from datetime import timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+import hashlib
 import json
 import logging
-from typing import Dict, List, Optional, Tuple
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
 import time
 
-from .models import Product, Store
-from .models import InventoryStatus, InventoryCheckLog, StoreApiConfig, PurchaseabilityScore
+from .html_extraction import DIGITS_RE, PARSE_CHUNK_SIZE, get_extractor
+from .models import Product, Store, UserWishlist, CartItem, StyleRecommendation
+from .store_http import BoundedDownload, CircuitOpenError, StoreHttpClient
+from .models import InventoryStatus, InventoryCheckLog, InventoryCheckDailySummary, StoreApiConfig, PurchaseabilityScore
+from .models import InventoryChangeEvent
 
 logger = logging.getLogger(__name__)
 
 
+class InventoryCheckBatch:
+    """
+    여러 상품의 재고 확인 결과를 모아 짧은 트랜잭션 한 번으로 저장
+
+    재고 상태/구매 가능성 점수는 bulk_update(없던 행은 bulk_create), 확인 로그는 bulk_create,
+    스토어 상태는 스토어별로 결과를 합산해 한 번만 갱신한다. 네트워크 요청 중에는
+    DB 쓰기를 하지 않으므로 쓰기 잠금은 flush() 동안만 잡힌다.
+
+    확인 로그는 상태/가격이 바뀌었거나 실패한 확인만 전체 행으로 남기고, 변경 없는 성공은
+    상품별 일별 집계(InventoryCheckDailySummary)의 카운터로만 누적한다
+    (INVENTORY_CHECK_LOG_MODE='full'이면 모든 확인을 전체 행으로 기록). 구매 가능 여부가 바뀌거나
+    성공한 확인에서 가격/재고 상태가 바뀌면 같은 트랜잭션에서 변경 이벤트(InventoryChangeEvent)도 추가한다.
+    """
+
+    STATUS_FIELDS = [
+        'stock_status', 'stock_quantity', 'size_stock', 'availability_status', 'is_purchasable',
+        'current_price', 'price_changed', 'price_change_percentage', 'last_checked_at',
+        'last_available_at', 'consecutive_unavailable_count', 'last_error_message',
+        'check_failed_count', 'http_etag', 'http_last_modified', 'content_hash', 'next_check_at', 'updated_at',
+    ]
+    NOT_MODIFIED_FIELDS = ['last_checked_at', 'http_etag', 'http_last_modified', 'content_hash', 'next_check_at']
+    SUMMARY_FIELDS = [
+        'check_count', 'success_count', 'failure_count', 'unchanged_count', 'not_modified_count',
+        'total_response_time_ms', 'max_response_time_ms', 'response_time_histogram', 'last_checked_at',
+    ]
+    # 로그 전용 컬럼에 이미 저장되거나 확인 과정에서만 쓰는 결과 키 (api_response_data에서 제외)
+    LOG_PAYLOAD_EXCLUDED_KEYS = {
+        'product_id', 'product_uuid', 'success', 'stock_status', 'current_price', 'error_message',
+        'response_time_ms', 'not_modified', 'circuit_open', 'last_checked',
+    }
+    SCORE_FIELDS = [
+        'availability_score', 'reliability_score', 'overall_score',
+        'recommendation_priority', 'last_calculated_at',
+    ]
+
+    # 성공만 있는 배치는 마지막 성공 시각이 이보다 오래됐을 때만 스토어 상태 갱신
+    store_success_refresh_interval = timedelta(hours=1)
+
+    def __init__(self, check_type: str = 'scheduled'):
+        self.check_type = check_type
+        self.statuses: Dict[int, InventoryStatus] = {}
+        self.scores: Dict[int, PurchaseabilityScore] = {}
+        self.changed_ids = set()
+        self.not_modified_ids = set()
+        self.logs: List[InventoryCheckLog] = []
+        self.events: List[InventoryChangeEvent] = []
+        self.summaries: Dict[int, Dict] = defaultdict(self._empty_counters)
+        self.log_mode = settings.EASYSTYLE_SETTINGS.get('INVENTORY_CHECK_LOG_MODE', 'delta')
+        self.store_outcomes = defaultdict(list)
+        self.store_configs: Dict[int, StoreApiConfig] = {}
+
+    def prepare(self, products: List[Product]):
+        """재고 상태와 점수를 각각 한 번의 쿼리로 미리 읽어 둠 (없으면 저장 전 객체 생성)"""
+        product_ids = [product.id for product in products]
+        statuses = InventoryStatus.objects.in_bulk(product_ids, field_name='product_id')
+        scores = PurchaseabilityScore.objects.in_bulk(product_ids, field_name='product_id')
+
+        for product in products:
+            status = statuses.get(product.id) or InventoryStatus(
+                product=product, stock_status='unknown', availability_status='checking'
+            )
+            score = scores.get(product.id) or PurchaseabilityScore(product=product, overall_score=50)
+            # 점수 계산이 메모리의 재고 상태를 보도록 관계 캐시 연결
+            status.product = product
+            score.product = product
+            product.inventory_status = status
+            self.statuses[product.id] = status
+            self.scores[product.id] = score
+
+    def status_for(self, product: Product) -> InventoryStatus:
+        if product.id not in self.statuses:
+            self.prepare([product])
+        return self.statuses[product.id]
+
+    @staticmethod
+    def snapshot(status: InventoryStatus) -> Dict:
+        """로그용 변경 전 상태"""
+        return {
+            'stock_status': status.stock_status if status.pk else None,
+            'is_purchasable': status.is_purchasable if status.pk else None,
+            'current_price': status.current_price,
+        }
+
+    def record(self, product: Product, status: str, result: Dict, previous: Dict):
+        """확인 결과 기록: 점수 재계산 + 일별 집계, 상태/가격이 바뀌었거나 실패했으면 로그 생성"""
+        self.changed_ids.add(product.id)
+        self.not_modified_ids.discard(product.id)
+        self.scores[product.id].update_scores(commit=False)
+
+        previous_status = previous['stock_status']
+        new_status = result.get('stock_status', 'unknown')
+        stock_status_changed = previous_status != new_status if previous_status else False
+        purchasable = self.statuses[product.id].is_purchasable
+        purchasable_changed = previous['is_purchasable'] is not None and previous['is_purchasable'] != purchasable
+        availability_changed = stock_status_changed or purchasable_changed
+        price_before, price_after = previous['current_price'], result.get('current_price')
+        price_changed = price_before is not None and price_after is not None and price_before != price_after
+
+        # 구매 가능 여부는 확인 실패가 쌓여 꺼질 때도 바뀌므로 성공/실패와 관계없이 기록
+        if purchasable_changed:
+            self.events.append(InventoryChangeEvent(
+                product=product, event_type='availability',
+                old_value='available' if previous['is_purchasable'] else 'unavailable',
+                new_value='available' if purchasable else 'unavailable',
+            ))
+        if status == 'success':
+            if stock_status_changed:
+                self.events.append(InventoryChangeEvent(
+                    product=product, event_type='stock_status', old_value=previous_status, new_value=new_status
+                ))
+            if price_changed:
+                self.events.append(InventoryChangeEvent(
+                    product=product, event_type='price',
+                    old_value=f'{Decimal(str(price_before)):.2f}', new_value=f'{Decimal(str(price_after)):.2f}'
+                ))
+
+        # 첫 확인은 이후 변경을 비교할 기준이 되도록 전체 행으로 남김
+        unchanged = status == 'success' and bool(previous_status) and not availability_changed and not price_changed
+        self._count(product.id, result.get('response_time_ms', 0), success=status == 'success', unchanged=unchanged)
+        if unchanged and self.log_mode == 'delta':
+            return
+
+        self.logs.append(InventoryCheckLog(
+            product=product,
+            check_type=self.check_type,
+            status=status,
+            previous_stock_status=previous_status or '',
+            new_stock_status=new_status,
+            response_time_ms=result.get('response_time_ms', 0),
+            api_response_data=self._log_payload(result),
+            error_message=result.get('error_message', ''),
+            price_before=price_before,
+            price_after=price_after,
+            availability_changed=availability_changed
+        ))
+
+    def record_not_modified(self, product: Product, response_time_ms: int = 0):
+        if product.id not in self.changed_ids:
+            self.not_modified_ids.add(product.id)
+            self._count(product.id, response_time_ms, success=True, unchanged=True, not_modified=True)
+
+    @staticmethod
+    def _empty_counters() -> Dict:
+        return {
+            'check_count': 0, 'success_count': 0, 'failure_count': 0, 'unchanged_count': 0,
+            'not_modified_count': 0, 'total_response_time_ms': 0, 'max_response_time_ms': 0,
+            'response_time_histogram': InventoryCheckDailySummary.merge_histograms(),
+        }
+
+    def _count(self, product_id: int, response_time_ms: int, success: bool,
+               unchanged: bool = False, not_modified: bool = False):
+        counters = self.summaries[product_id]
+        response_time_ms = response_time_ms or 0
+        counters['check_count'] += 1
+        counters['success_count' if success else 'failure_count'] += 1
+        counters['unchanged_count'] += unchanged
+        counters['not_modified_count'] += not_modified
+        counters['total_response_time_ms'] += response_time_ms
+        counters['max_response_time_ms'] = max(counters['max_response_time_ms'], response_time_ms)
+        counters['response_time_histogram'][InventoryCheckDailySummary.bucket_index(response_time_ms)] += 1
+
+    def record_store_outcome(self, store_config: StoreApiConfig, success: bool):
+        self.store_configs[store_config.pk] = store_config
+        self.store_outcomes[store_config.pk].append(success)
+
+    @classmethod
+    def _log_payload(cls, result: Dict) -> Dict:
+        """
+        로그 컬럼과 겹치는 키와 빈 값(None/False/빈 문자열·dict·list)을 빼고 JSON으로 저장할 수 있게 변환
+        """
+        return cls.json_payload({
+            key: value for key, value in result.items()
+            if key not in cls.LOG_PAYLOAD_EXCLUDED_KEYS and not (
+                value is None or value is False or (isinstance(value, (str, dict, list)) and not value)
+            )
+        })
+
+    @staticmethod
+    def json_payload(result: Dict) -> Dict:
+        """확인 결과를 JSONField/캐시 이벤트에 저장할 수 있도록 datetime/Decimal 변환"""
+        return {
+            key: value.isoformat() if isinstance(value, datetime) else
+            float(value) if isinstance(value, Decimal) else value
+            for key, value in result.items()
+        }
+
+    def flush(self):
+        """모아 둔 결과를 한 번의 트랜잭션으로 저장"""
+        now = timezone.now()
+        changed = [self.statuses[product_id] for product_id in self.changed_ids]
+        not_modified = [self.statuses[product_id] for product_id in self.not_modified_ids]
+        for status in changed + not_modified:
+            status.last_checked_at = now
+            status.updated_at = now
+            status.next_check_at = now + timedelta(minutes=status.check_interval_minutes)
+        scores = [self.scores[product_id] for product_id in self.changed_ids]
+        for score in scores:
+            score.last_calculated_at = now
+
+        new_statuses = [status for status in changed if status.pk is None]
+        existing = [status for status in changed if status.pk is not None]
+        new_scores = [score for score in scores if score.pk is None]
+        existing_scores = [score for score in scores if score.pk is not None]
+
+        try:
+            with transaction.atomic():
+                if self.summaries:
+                    self._save_summaries(now)
+
+                if new_statuses:
+                    self._create_or_update(InventoryStatus, new_statuses, self.STATUS_FIELDS)
+                if existing:
+                    InventoryStatus.objects.bulk_update(existing, self.STATUS_FIELDS)
+                saved_not_modified = [status for status in not_modified if status.pk is not None]
+                if saved_not_modified:
+                    InventoryStatus.objects.bulk_update(saved_not_modified, self.NOT_MODIFIED_FIELDS)
+
+                if new_scores:
+                    self._create_or_update(PurchaseabilityScore, new_scores, self.SCORE_FIELDS)
+                if existing_scores:
+                    PurchaseabilityScore.objects.bulk_update(existing_scores, self.SCORE_FIELDS)
+
+                if self.logs:
+                    InventoryCheckLog.objects.bulk_create(self.logs)
+                if self.events:
+                    InventoryChangeEvent.objects.bulk_create(self.events)
+
+                for config_id, outcomes in self.store_outcomes.items():
+                    self._update_store_health(self.store_configs[config_id], outcomes, now)
+        except Exception:
+            # 롤백된 행의 pk가 객체에 남지 않도록 되돌림
+            for obj in new_statuses + new_scores:
+                obj.pk = None
+                obj._state.adding = True
+            raise
+
+        self.changed_ids.clear()
+        self.not_modified_ids.clear()
+        self.logs = []
+        self.events = []
+        self.summaries.clear()
+        self.store_outcomes.clear()
+
+    @staticmethod
+    def _create_or_update(model, objects: List, fields: List[str]):
+        """
+        상품별 행 생성 (동시에 다른 확인이나 스케줄러가 먼저 만든 행이 있으면 이번 결과로 갱신)
+
+        이후 같은 객체를 다시 저장할 수 있도록 pk를 채워 둔다 (INSERT ... RETURNING을 지원하지 않는 DB는 다시 조회).
+        """
+        model.objects.bulk_create(objects, update_conflicts=True, unique_fields=['product'], update_fields=fields)
+        missing = [obj for obj in objects if obj.pk is None]
+        if missing:
+            ids = dict(model.objects.filter(
+                product_id__in=[obj.product_id for obj in missing]
+            ).values_list('product_id', 'id'))
+            for obj in missing:
+                obj.pk = ids[obj.product_id]
+
+    def _save_summaries(self, now):
+        """
+        오늘 날짜의 상품별 집계 행에 카운터 누적 (없는 행은 먼저 만들고 잠근 뒤 합산)
+        """
+        day = timezone.localdate(now)
+        product_ids = list(self.summaries)
+        InventoryCheckDailySummary.objects.bulk_create(
+            [InventoryCheckDailySummary(product_id=product_id, date=day) for product_id in product_ids],
+            ignore_conflicts=True,
+        )
+
+        rows = list(InventoryCheckDailySummary.objects.select_for_update().filter(
+            date=day, product_id__in=product_ids
+        ))
+        for row in rows:
+            counters = self.summaries[row.product_id]
+            for field in ('check_count', 'success_count', 'failure_count', 'unchanged_count',
+                          'not_modified_count', 'total_response_time_ms'):
+                setattr(row, field, getattr(row, field) + counters[field])
+            row.max_response_time_ms = max(row.max_response_time_ms, counters['max_response_time_ms'])
+            row.response_time_histogram = InventoryCheckDailySummary.merge_histograms(
+                row.response_time_histogram, counters['response_time_histogram']
+            )
+            row.last_checked_at = now
+        InventoryCheckDailySummary.objects.bulk_update(rows, self.SUMMARY_FIELDS)
+
+    def _update_store_health(self, store_config: StoreApiConfig, outcomes: List[bool], now):
+        """
+        스토어별 성공/실패 결과를 합산해 한 번만 갱신 (mark_success/mark_failure를 순서대로 적용한 것과 같은 결과)
+        """
+        if all(outcomes) and not store_config.consecutive_failures and store_config.last_successful_check and \
+                now - store_config.last_successful_check < self.store_success_refresh_interval:
+            return
+
+        succeeded = [index for index, success in enumerate(outcomes) if success]
+        if succeeded:
+            trailing_failures = len(outcomes) - succeeded[-1] - 1
+            changes = {
+                'last_successful_check': now,
+                'consecutive_failures': trailing_failures,
+            }
+            store_config.last_successful_check = now
+            store_config.consecutive_failures = trailing_failures
+        else:
+            changes = {'consecutive_failures': F('consecutive_failures') + len(outcomes)}
+            store_config.consecutive_failures += len(outcomes)
+
+        # 연속 실패 시 비활성화
+        if store_config.consecutive_failures >= 10:
+            changes['is_active'] = False
+            store_config.is_active = False
+
+        StoreApiConfig.objects.filter(pk=store_config.pk).update(**changes)
+
+
+class InventoryCheckCoalescer:
+    """
+    같은 상품의 동시 재고 확인을 하나로 합치는 single-flight (락과 결과를 캐시에 저장)
+
+    유효 시간(INVENTORY_CHECK_FRESHNESS_SECONDS) 안의 성공한 결과는 캐시나 저장된 재고 상태에서
+    바로 돌려준다. 나머지 상품은 캐시 락(cache.add)을 먼저 잡은 요청만 실제로 확인하고,
+    락을 잡지 못한 요청은 그 확인이 끝나 결과가 캐시에 올라올 때까지 기다렸다가 같은 결과를 쓴다.
+    같은 캐시(Redis 등)를 쓰면 스레드뿐 아니라 프로세스 사이에서도 합쳐진다.
+    """
+
+    lock_prefix = 'inventory:inflight'
+    result_prefix = 'inventory:result'
+    poll_interval = 0.05
+
+    def __init__(self, checker: 'InventoryChecker', cache_backend=None):
+        self.checker = checker
+        self.cache = cache_backend or cache
+
+    @property
+    def freshness_seconds(self) -> int:
+        return settings.EASYSTYLE_SETTINGS.get('INVENTORY_CHECK_FRESHNESS_SECONDS', 60 * 60)
+
+    def _lock_key(self, product_id: int) -> str:
+        return f'{self.lock_prefix}:{product_id}'
+
+    def _result_key(self, product_id: int) -> str:
+        return f'{self.result_prefix}:{product_id}'
+
+    @staticmethod
+    def _lock_timeout(product: Product) -> int:
+        """확인하던 프로세스가 죽어도 락이 남지 않도록 요청 제한 시간보다 조금 길게"""
+        store_config = getattr(product.store, 'api_config', None)
+        return (store_config.timeout_seconds if store_config else 30) + 5
+
+    def check(self, products: List[Product], check_type: str = 'user_request',
+              timeout: Optional[float] = None,
+              on_result: Optional[Callable[[Dict], None]] = None) -> Dict[int, Dict]:
+        """
+        on_result를 넘기면 상품별 결과가 정해지는 대로 호출 (워커 스레드에서 호출될 수 있음)
+        """
+        started = time.monotonic()
+        results = self._serve_fresh(products)
+        if on_result:
+            for result in results.values():
+                on_result(result)
+
+        leaders, followers = [], []
+        for product in products:
+            if product.id in results:
+                continue
+            if self.cache.add(self._lock_key(product.id), 1, timeout=self._lock_timeout(product)):
+                leaders.append(product)
+            else:
+                followers.append(product)
+
+        if leaders:
+            # 확인이 끝나는 대로 결과를 공유하고 락 해제 (제한 시간이 지나 늦게 끝난 확인도 워커 스레드에서 공유)
+            checked, state_lock, returned = {}, threading.Lock(), threading.Event()
+
+            def publish(result: Dict):
+                product_id = result['product_id']
+                if not result.get('circuit_open'):
+                    self.cache.set(self._result_key(product_id), result, timeout=self.freshness_seconds)
+                self.cache.delete(self._lock_key(product_id))
+                with state_lock:
+                    if returned.is_set():
+                        return
+                    checked[product_id] = result
+                if on_result:
+                    on_result(result)
+
+            def release(cancelled: List[Product]):
+                # 시작하지 못한 확인의 락은 바로 풀어 기다리는 요청이 다시 시도할 수 있게 함
+                self.cache.delete_many([self._lock_key(product.id) for product in cancelled])
+
+            try:
+                self.checker.check_products_by_store(leaders, check_type, timeout=timeout, on_result=publish,
+                                                     on_cancelled=release)
+            except Exception:
+                self.cache.delete_many([self._lock_key(product.id) for product in leaders])
+                raise
+
+            with state_lock:
+                returned.set()
+                results.update(checked)
+            for product in leaders:
+                if product.id not in results:
+                    results[product.id] = self._last_known(product, '제한 시간 안에 재고 확인을 마치지 못함')
+                    if on_result:
+                        on_result(results[product.id])
+
+        for product in followers:
+            results[product.id] = self._wait_for_result(product, started, timeout)
+            if on_result:
+                on_result(results[product.id])
+
+        return results
+
+    def _serve_fresh(self, products: List[Product]) -> Dict[int, Dict]:
+        """
+        유효 시간 안의 성공한 결과 (캐시된 최근 확인 결과 > 저장된 재고 상태 순)
+        """
+        cached = self.cache.get_many([self._result_key(product.id) for product in products])
+        statuses = InventoryStatus.objects.in_bulk(
+            [product.id for product in products if self._result_key(product.id) not in cached],
+            field_name='product_id'
+        )
+
+        fresh = {}
+        for product in products:
+            result = cached.get(self._result_key(product.id))
+            if result and result.get('success'):
+                fresh[product.id] = {**result, 'coalesced': True}
+                continue
+
+            inventory_status = statuses.get(product.id)
+            if inventory_status is not None and inventory_status.has_fresh_result:
+                result = self.checker.empty_result(product)
+                result.update(
+                    self.checker.status_result(inventory_status),
+                    success=True,
+                    last_checked=inventory_status.last_checked_at,
+                    coalesced=True,
+                )
+                fresh[product.id] = result
+        return fresh
+
+    def _wait_for_result(self, product: Product, started: float, timeout: Optional[float]) -> Dict:
+        """
+        다른 요청이 진행 중인 확인이 끝나기를 기다려 그 결과를 사용
+        기다리는 시간 안에 결과가 없으면 저장된 마지막 상태를 반환
+        """
+        deadline = started + (timeout if timeout is not None else self._lock_timeout(product))
+        while time.monotonic() < deadline:
+            if self.cache.get(self._lock_key(product.id)) is None:
+                break
+            time.sleep(self.poll_interval)
+
+        result = self.cache.get(self._result_key(product.id))
+        if result is not None:
+            return {**result, 'coalesced': True}
+        return self._last_known(product, '진행 중인 재고 확인 결과를 기다리지 못함')
+
+    def _last_known(self, product: Product, error_message: str) -> Dict:
+        """새 결과가 없을 때 저장된 마지막 상태로 만든 결과"""
+        inventory_status = InventoryStatus.objects.filter(product_id=product.id).first()
+        result = self.checker.empty_result(product)
+        result['error_message'] = error_message
+        if inventory_status is not None:
+            result.update(
+                self.checker.status_result(inventory_status),
+                last_checked=inventory_status.last_checked_at,
+                stale=True,
+            )
+        return result
+
+
 class InventoryChecker:
     """
     실시간 재고 확인 및 구매 가능 여부 검증 클래스
     """
 
+    # 동시에 확인할 최대 스토어 수
+    max_workers = 10
+
+    # 스토어별 확인 결과를 모아 한 번에 저장하는 단위
+    persist_batch_size = 20
+
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # 호스트별 커넥션 풀과 요청률 제한을 워커 스레드들이 공유
+        self.http = StoreHttpClient()
+        self.coalescer = InventoryCheckCoalescer(self)
 
     def check_product_availability(self, product: Product, check_type: str = 'manual') -> Dict:
         """
         단일 상품의 재고 및 구매 가능 여부 확인
         """
-        start_time = time.time()
-        result = {
+        batch = InventoryCheckBatch(check_type)
+        batch.prepare([product])
+        result = self._check_product(product, batch)
+        batch.flush()
+        return result
+
+    @staticmethod
+    def empty_result(product: Product) -> Dict:
+        """확인 결과 기본 형태"""
+        return {
             'product_id': product.id,
             'product_uuid': str(product.uuid),
             'success': False,
@@ -45,54 +543,97 @@ class InventoryChecker:
             'price_changed': False,
             'error_message': '',
             'response_time_ms': 0,
+            'not_modified': False,
+            'circuit_open': False,
             'last_checked': timezone.now(),
         }
 
-        try:
-            # 재고 상태 객체 가져오기 또는 생성
-            inventory_status, created = InventoryStatus.objects.get_or_create(
-                product=product,
-                defaults={
-                    'stock_status': 'unknown',
-                    'availability_status': 'checking'
-                }
-            )
+    @staticmethod
+    def status_result(inventory_status: InventoryStatus) -> Dict:
+        """저장된 재고 상태를 확인 결과 필드로 변환"""
+        return {
+            'is_available': inventory_status.is_purchasable if inventory_status.pk else False,
+            'stock_status': inventory_status.stock_status,
+            'stock_quantity': inventory_status.stock_quantity,
+            'size_stock': inventory_status.size_stock or {},
+            'current_price': float(inventory_status.current_price) if inventory_status.current_price is not None else None,
+        }
+
+    def check_products_coalesced(self, products: List[Product], check_type: str = 'user_request',
+                                 timeout: Optional[float] = None,
+                                 on_result: Optional[Callable[[Dict], None]] = None) -> Dict[int, Dict]:
+        """
+        사용자 요청용 재고 확인: 유효 시간 내 결과는 그대로 반환하고, 같은 상품의 동시 확인은 하나로 합침
+        """
+        return self.coalescer.check(products, check_type, timeout, on_result)
 
+    def _check_product(self, product: Product, batch: 'InventoryCheckBatch',
+                       prefetched: Optional[Dict] = None) -> Dict:
+        """
+        상품 하나를 확인하고 변경 사항은 batch에만 반영 (저장은 batch.flush()에서 일괄 처리)
+        prefetched가 있으면 일괄 조회 API로 미리 받아 둔 응답을 사용
+        """
+        start_time = time.time()
+        result = self.empty_result(product)
+
+        inventory_status = batch.status_for(product)
+        previous = batch.snapshot(inventory_status)
+        store_config = None
+
+        try:
             # 스토어 API 설정 확인
             store_config = getattr(product.store, 'api_config', None)
             if not store_config or not store_config.is_active:
                 result['error_message'] = f'스토어 {product.store.name}의 API 설정이 없거나 비활성화됨'
-                inventory_status.mark_check_failed(result['error_message'])
-                self._log_check(product, check_type, 'failed', result, inventory_status)
+                inventory_status.mark_check_failed(result['error_message'], commit=False)
+                batch.record(product, 'failed', result, previous)
                 return result
 
             # 재고 확인 실행
-            if store_config.api_type == 'rest_api':
-                result = self._check_via_api(product, store_config, result)
+            if prefetched is not None:
+                result = self._check_via_batch_item(store_config, result, inventory_status, prefetched)
+            elif store_config.api_type == 'rest_api':
+                result = self._check_via_api(product, store_config, result, inventory_status)
             elif store_config.api_type == 'scraping':
-                result = self._check_via_scraping(product, store_config, result)
+                result = self._check_via_scraping(product, store_config, result, inventory_status)
             else:
                 result['error_message'] = f'지원되지 않는 API 타입: {store_config.api_type}'
 
-            # 응답 시간 계산
-            result['response_time_ms'] = int((time.time() - start_time) * 1000)
+            # 스토어 회로가 열려 있으면 요청 없이 마지막으로 확인된 상태 반환 (실패로 기록하지 않음)
+            if result['circuit_open']:
+                return self._serve_last_known(inventory_status, result)
+
+            # 응답 시간 계산 (일괄 조회는 해당 요청의 응답 시간)
+            if prefetched is not None:
+                result['response_time_ms'] = prefetched['response_time_ms']
+            else:
+                result['response_time_ms'] = int((time.time() - start_time) * 1000)
+            validators = result.pop('validators', None)
+
+            # 변경 없음(304 또는 동일 본문): 파싱/상태 변경 없이 확인 시각만 갱신
+            if result['not_modified']:
+                return self._mark_not_modified(product, inventory_status, store_config, result, validators, batch,
+                                               store_outcome=prefetched is None)
 
             # 결과에 따라 재고 상태 업데이트
             if result['success']:
                 if result['is_available']:
                     inventory_status.mark_as_available(
                         stock_quantity=result['stock_quantity'],
-                        size_stock=result['size_stock']
+                        size_stock=result['size_stock'],
+                        commit=False
                     )
                 else:
-                    inventory_status.mark_as_unavailable(result['error_message'])
+                    inventory_status.mark_as_unavailable(result['error_message'], commit=False)
 
-                store_config.mark_success()
                 result['stock_status'] = inventory_status.stock_status
 
             else:
-                inventory_status.mark_check_failed(result['error_message'])
-                store_config.mark_failure()
+                inventory_status.mark_check_failed(result['error_message'], commit=False)
+
+            # 일괄 조회는 요청마다 _fetch_batch에서 한 번만 기록 (상품별 항목 누락은 스토어 실패가 아님)
+            if prefetched is None:
+                batch.record_store_outcome(store_config, result['success'])
 
             # 가격 변동 확인
             if result['current_price'] and inventory_status.current_price:
@@ -108,29 +649,30 @@ class InventoryChecker:
             if result['current_price']:
                 inventory_status.current_price = result['current_price']
 
-            inventory_status.save()
-
-            # 구매 가능성 점수 업데이트
-            self._update_purchaseability_score(product)
+            # 다음 확인 때 사용할 조건부 요청 검증자 (실패 시 초기화해 다음에는 전체 확인)
+            validators = validators if result['success'] and validators else {
+                'http_etag': '', 'http_last_modified': '', 'content_hash': ''
+            }
+            for field, value in validators.items():
+                setattr(inventory_status, field, value)
 
-            # 로그 기록
-            self._log_check(product, check_type, 'success' if result['success'] else 'failed', result, inventory_status)
+            # 구매 가능성 점수 갱신 및 로그 기록 (저장은 일괄 처리)
+            batch.record(product, 'success' if result['success'] else 'failed', result, previous)
 
         except Exception as e:
             logger.error(f'재고 확인 중 오류 발생 - {product.name}: {str(e)}')
             result['error_message'] = str(e)
             result['response_time_ms'] = int((time.time() - start_time) * 1000)
 
-            # 오류 로그 기록
-            inventory_status = InventoryStatus.objects.filter(product=product).first()
-            if inventory_status:
-                inventory_status.mark_check_failed(str(e))
-
-            self._log_check(product, check_type, 'failed', result, inventory_status)
+            inventory_status.mark_check_failed(str(e), commit=False)
+            if store_config is not None and prefetched is None:
+                batch.record_store_outcome(store_config, False)
+            batch.record(product, 'failed', result, previous)
 
         return result
 
-    def _check_via_api(self, product: Product, store_config: StoreApiConfig, result: Dict) -> Dict:
+    def _check_via_api(self, product: Product, store_config: StoreApiConfig, result: Dict,
+                       inventory_status: Optional[InventoryStatus] = None) -> Dict:
         """
         REST API를 통한 재고 확인
         """
@@ -144,23 +686,19 @@ class InventoryChecker:
             else:
                 url = product.product_url
 
-            # 요청 헤더 설정
-            headers = store_config.request_headers.copy() if store_config.request_headers else {}
-            headers.update(self.session.headers)
-
-            # API 요청
-            response = self.session.get(
-                url,
-                headers=headers,
-                timeout=store_config.timeout_seconds
-            )
+            # API 요청 (호스트별 요청률 제한 준수, 변경 없으면 파싱 생략)
+            response = self._conditional_get(url, store_config, inventory_status, result)
+            if response is None:
+                return result
 
-            response.raise_for_status()
             data = response.json()
 
             # 응답 데이터 파싱 (스토어별 커스터마이징 필요)
             result = self._parse_api_response(data, store_config, result)
 
+        except CircuitOpenError as e:
+            result['circuit_open'] = True
+            result['error_message'] = str(e)
         except requests.exceptions.RequestException as e:
             result['error_message'] = f'API 요청 실패: {str(e)}'
         except json.JSONDecodeError as e:
@@ -170,7 +708,102 @@ class InventoryChecker:
 
         return result
 
-    def _check_via_scraping(self, product: Product, store_config: StoreApiConfig, result: Dict) -> Dict:
+    def _fetch_batch(self, products: List[Product], store_config: StoreApiConfig,
+                     batch: 'InventoryCheckBatch') -> Dict[int, Dict]:
+        """
+        일괄 조회 API 한 번으로 여러 상품의 재고 응답 조회 (상품 ID -> {item, error, response_time_ms})
+        스토어 상태에는 요청 한 번당 결과 하나만 기록 (회로가 열려 요청하지 않았으면 기록하지 않음)
+        """
+        mapping = store_config.batch_response_mapping or {}
+        separator = mapping.get('id_separator', ',')
+        url = store_config.batch_check_url.format(
+            product_ids=separator.join(quote(str(product.external_id), safe='') for product in products)
+        )
+
+        start_time = time.time()
+        items, error, circuit_open = {}, '', False
+        try:
+            headers = store_config.request_headers.copy() if store_config.request_headers else {}
+            response = self.http.get(url, store_config, headers=headers, timeout=store_config.timeout_seconds)
+            response.raise_for_status()
+            items = self._map_batch_response(response.json(), mapping)
+        except CircuitOpenError as e:
+            error, circuit_open = str(e), True
+        except requests.exceptions.RequestException as e:
+            error = f'일괄 API 요청 실패: {str(e)}'
+        except ValueError as e:
+            error = f'일괄 API 응답 파싱 실패: {str(e)}'
+        response_time_ms = int((time.time() - start_time) * 1000)
+        if not circuit_open:
+            batch.record_store_outcome(store_config, not error)
+
+        return {
+            product.id: {
+                'item': items.get(str(product.external_id)),
+                'error': error,
+                'circuit_open': circuit_open,
+                'response_time_ms': response_time_ms,
+            }
+            for product in products
+        }
+
+    @staticmethod
+    def _map_batch_response(data, mapping: Dict) -> Dict[str, Dict]:
+        """
+        batch_response_mapping에 따라 일괄 응답을 external_id별 표준 응답(stock/price/sizes)으로 변환
+
+        mapping 예: {"items_path": "data.items", "id_field": "sku",
+                     "stock_field": "qty", "price_field": "sale_price", "sizes_field": "options"}
+        items_path가 가리키는 값이 dict면 키를 external_id로 사용한다.
+        """
+        items = data
+        for key in filter(None, mapping.get('items_path', '').split('.')):
+            items = items.get(key, {}) if isinstance(items, dict) else {}
+
+        if isinstance(items, dict):
+            pairs = items.items()
+        else:
+            id_field = mapping.get('id_field', 'id')
+            pairs = ((item.get(id_field), item) for item in items if isinstance(item, dict))
+
+        fields = {
+            'stock': mapping.get('stock_field', 'stock'),
+            'price': mapping.get('price_field', 'price'),
+            'sizes': mapping.get('sizes_field', 'sizes'),
+        }
+        return {
+            str(external_id): {key: item[field] for key, field in fields.items() if field in item}
+            for external_id, item in pairs
+            if external_id is not None and isinstance(item, dict)
+        }
+
+    def _check_via_batch_item(self, store_config: StoreApiConfig, result: Dict,
+                              inventory_status: Optional[InventoryStatus], prefetched: Dict) -> Dict:
+        """
+        일괄 조회 응답 중 한 상품의 항목으로 재고 확인 (항목 해시가 같으면 파싱 생략)
+        """
+        if prefetched['error']:
+            result['error_message'] = prefetched['error']
+            result['circuit_open'] = prefetched['circuit_open']
+            return result
+
+        item = prefetched['item']
+        if item is None:
+            result['error_message'] = '일괄 API 응답에 상품 정보 없음'
+            return result
+
+        content_hash = hashlib.sha256(
+            json.dumps(item, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+        result['validators'] = {'http_etag': '', 'http_last_modified': '', 'content_hash': content_hash}
+        if inventory_status and inventory_status.content_hash == content_hash:
+            result['not_modified'] = True
+            return result
+
+        return self._parse_api_response(item, store_config, result)
+
+    def _check_via_scraping(self, product: Product, store_config: StoreApiConfig, result: Dict,
+                            inventory_status: Optional[InventoryStatus] = None) -> Dict:
         """
         웹 스크래핑을 통한 재고 확인
         """
@@ -178,21 +811,39 @@ class InventoryChecker:
             # 상품 페이지 URL
             url = product.product_url
 
-            # 요청 헤더 설정
-            headers = store_config.request_headers.copy() if store_config.request_headers else {}
-            headers.update(self.session.headers)
+            # 페이지 요청 (호스트별 요청률 제한 준수, 304면 본문을 받지 않음)
+            response = self._conditional_get(url, store_config, inventory_status, result, stream=True)
+            if response is None:
+                return result
 
-            # 페이지 요청
-            time.sleep(store_config.request_delay_seconds)  # 요청 간격 준수
-            response = self.session.get(url, headers=headers, timeout=store_config.timeout_seconds)
-            response.raise_for_status()
+            # 본문을 스토어별 최대 크기까지 스트리밍으로 받으며 추출하고, 결과가 정해지면 다운로드 중단
+            download = BoundedDownload(response, store_config.max_page_kb * 1024, PARSE_CHUNK_SIZE)
+            try:
+                extraction = get_extractor(store_config).extract_stream(
+                    download, response.headers.get('Content-Type', '')
+                )
+            finally:
+                response.close()
 
-            # HTML 파싱
-            soup = BeautifulSoup(response.content, 'html.parser')
+            result['downloaded_bytes'] = download.bytes_read
+            result['stopped_early'] = not extraction['complete'] and not download.truncated
+
+            # 읽은 부분이 이전과 같으면 추출 결과도 같으므로 변경 없음으로 처리
+            result['validators']['content_hash'] = download.hexdigest()
+            if inventory_status and inventory_status.content_hash == result['validators']['content_hash']:
+                result['not_modified'] = True
+                return result
+
+            if download.truncated and not extraction['keyword'] and not extraction['elements']:
+                result['error_message'] = f'페이지가 최대 크기({store_config.max_page_kb}KB)를 넘었지만 재고 정보를 찾지 못함'
+                return result
 
             # 재고 정보 추출
-            result = self._extract_inventory_from_html(soup, store_config, result)
+            result = self._extract_inventory_from_html(extraction, store_config, result)
 
+        except CircuitOpenError as e:
+            result['circuit_open'] = True
+            result['error_message'] = str(e)
         except requests.exceptions.RequestException as e:
             result['error_message'] = f'스크래핑 요청 실패: {str(e)}'
         except Exception as e:
@@ -200,6 +851,71 @@ class InventoryChecker:
 
         return result
 
+    def _conditional_get(self, url: str, store_config: StoreApiConfig,
+                         inventory_status: Optional[InventoryStatus], result: Dict, stream: bool = False):
+        """
+        저장된 검증자(ETag, Last-Modified, 본문 해시)로 조건부 요청
+
+        304 응답이거나 본문 해시가 이전과 같으면 result['not_modified']를 표시하고 None 반환.
+        새 본문이면 다음 확인에 쓸 검증자를 result['validators']에 담아 응답을 반환한다.
+        stream=True면 본문을 읽지 않은 응답을 반환하고, 본문 해시 비교는 호출하는 쪽에서 한다.
+        """
+        headers = store_config.request_headers.copy() if store_config.request_headers else {}
+        if inventory_status and inventory_status.http_etag:
+            headers['If-None-Match'] = inventory_status.http_etag
+        if inventory_status and inventory_status.http_last_modified:
+            headers['If-Modified-Since'] = inventory_status.http_last_modified
+
+        response = self.http.get(
+            url, store_config, headers=headers, timeout=store_config.timeout_seconds, stream=stream
+        )
+        if response.status_code == 304 and inventory_status and inventory_status.content_hash:
+            response.close()
+            result['not_modified'] = True
+            return None
+
+        if response.status_code >= 400:
+            response.close()
+        response.raise_for_status()
+        validators = {
+            'http_etag': response.headers.get('ETag', '')[:255],
+            'http_last_modified': response.headers.get('Last-Modified', '')[:64],
+            'content_hash': '',
+        }
+        result['validators'] = validators
+        if stream:
+            return response
+
+        validators['content_hash'] = hashlib.sha256(response.content).hexdigest()
+
+        if inventory_status and inventory_status.content_hash == validators['content_hash']:
+            result['not_modified'] = True
+            return None
+
+        return response
+
+    def _mark_not_modified(self, product: Product, inventory_status: InventoryStatus,
+                           store_config: StoreApiConfig, result: Dict, validators: Optional[Dict],
+                           batch: 'InventoryCheckBatch', store_outcome: bool = True) -> Dict:
+        """
+        변경 없는 확인 결과 처리: 마지막 상태를 결과로 돌려주고 확인 시각(과 바뀐 검증자)만 저장
+        """
+        for field, value in (validators or {}).items():
+            setattr(inventory_status, field, value)
+        batch.record_not_modified(product, result['response_time_ms'])
+        if store_outcome:
+            batch.record_store_outcome(store_config, True)
+
+        result.update(self.status_result(inventory_status), success=True)
+        return result
+
+    def _serve_last_known(self, inventory_status: InventoryStatus, result: Dict) -> Dict:
+        """
+        회로가 열린 스토어의 상품: 저장된 마지막 상태를 결과로 돌려줌 (DB 기록 없음)
+        """
+        result.update(self.status_result(inventory_status), last_checked=inventory_status.last_checked_at, stale=True)
+        return result
+
     def _parse_api_response(self, data: Dict, store_config: StoreApiConfig, result: Dict) -> Dict:
         """
         API 응답 데이터 파싱 (스토어별 커스터마이징)
@@ -227,51 +943,42 @@ class InventoryChecker:
 
         return result
 
-    def _extract_inventory_from_html(self, soup, store_config: StoreApiConfig, result: Dict) -> Dict:
+    def _extract_inventory_from_html(self, extraction: Dict, store_config: StoreApiConfig, result: Dict) -> Dict:
         """
-        HTML에서 재고 정보 추출
+        추출 엔진 결과(품절 키워드, 셀렉터별 첫 요소)에서 재고 정보 추출
         """
         try:
+            elements = extraction['elements']
+
+            # 가격 정보 추출 (품절 페이지도 가격은 갱신)
+            if 'price' in elements:
+                # 가격에서 숫자만 추출
+                price_number = DIGITS_RE.search(elements['price']['text'].replace(',', ''))
+                if price_number:
+                    result['current_price'] = float(price_number.group())
+
             # 구매 불가 키워드 확인
-            page_text = soup.get_text().lower()
-            for keyword in store_config.unavailable_keywords:
-                if keyword.lower() in page_text:
-                    result['success'] = True
-                    result['is_available'] = False
-                    result['stock_status'] = 'out_of_stock'
-                    result['error_message'] = f'품절 키워드 발견: {keyword}'
-                    return result
+            if extraction['keyword']:
+                result['success'] = True
+                result['is_available'] = False
+                result['stock_status'] = 'out_of_stock'
+                result['error_message'] = f'품절 키워드 발견: {extraction["keyword"]}'
+                return result
 
             # 재고 정보 셀렉터로 추출
-            if store_config.inventory_selector:
-                inventory_elements = soup.select(store_config.inventory_selector)
-                if inventory_elements:
-                    inventory_text = inventory_elements[0].get_text().strip()
-
-                    # 재고 수량 추출 (숫자 패턴)
-                    numbers = re.findall(r'\d+', inventory_text)
-                    if numbers:
-                        result['stock_quantity'] = int(numbers[0])
-                        result['is_available'] = result['stock_quantity'] > 0
-
-            # 가격 정보 추출
-            if store_config.price_selector:
-                price_elements = soup.select(store_config.price_selector)
-                if price_elements:
-                    price_text = price_elements[0].get_text().strip()
-                    # 가격에서 숫자만 추출
-                    price_numbers = re.findall(r'[\d,]+', price_text.replace(',', ''))
-                    if price_numbers:
-                        result['current_price'] = float(price_numbers[0])
+            if 'inventory' in elements:
+                # 재고 수량 추출 (숫자 패턴)
+                number = DIGITS_RE.search(elements['inventory']['text'])
+                if number:
+                    result['stock_quantity'] = int(number.group())
+                    result['is_available'] = result['stock_quantity'] > 0
 
             # 구매 가능 여부 확인
-            if store_config.availability_selector:
-                availability_elements = soup.select(store_config.availability_selector)
-                if availability_elements:
-                    # 구매 버튼이 존재하고 비활성화되지 않았으면 구매 가능
-                    button = availability_elements[0]
-                    is_disabled = button.get('disabled') or 'disabled' in button.get('class', [])
-                    result['is_available'] = not is_disabled
+            if 'availability' in elements:
+                # 구매 버튼이 존재하고 비활성화되지 않았으면 구매 가능
+                button = elements['availability']
+                is_disabled = 'disabled' in button['attrs'] or 'disabled' in button['classes']
+                result['is_available'] = not is_disabled
 
             # 기본값: 페이지가 정상적으로 로드되면 일단 성공으로 간주
             result['success'] = True
@@ -285,64 +992,125 @@ class InventoryChecker:
 
         return result
 
-    def _update_purchaseability_score(self, product: Product):
+    def check_multiple_products(self, products: List[Product], check_type: str = 'scheduled') -> List[Dict]:
         """
-        구매 가능성 점수 업데이트
+        여러 상품의 재고를 동시에 확인 (스토어별 병렬, 요청 간격은 스토어 단위로 준수)
+        결과는 입력한 상품 순서대로 반환하고, 확인하지 못한 상품은 실패 결과로 채운다.
         """
-        try:
-            score, created = PurchaseabilityScore.objects.get_or_create(
-                product=product,
-                defaults={'overall_score': 50}
-            )
-            score.update_scores()
-        except Exception as e:
-            logger.error(f'구매 가능성 점수 업데이트 실패 - {product.name}: {str(e)}')
+        results = self.check_products_by_store(products, check_type)
 
-    def _log_check(self, product: Product, check_type: str, status: str, result: Dict, inventory_status: InventoryStatus):
+        ordered = []
+        for product in products:
+            result = results.get(product.id)
+            if result is None:
+                # 스토어 묶음 확인이 중간에 실패해 결과가 없는 상품
+                result = self.empty_result(product)
+                result['error_message'] = '재고 확인을 마치지 못함'
+            ordered.append(result)
+        return ordered
+
+    def check_products_by_store(self, products: List[Product], check_type: str = 'scheduled',
+                                timeout: Optional[float] = None,
+                                on_result: Optional[Callable[[Dict], None]] = None,
+                                on_cancelled: Optional[Callable[[List[Product]], None]] = None) -> Dict[int, Dict]:
         """
-        재고 확인 로그 기록
+        상품을 스토어별로 묶어 스토어 단위로 동시에 재고 확인 (같은 스토어 안에서는 순차)
+        on_result는 확인 결과가 저장될 때마다(persist_batch_size개 묶음 단위) 워커 스레드에서 호출된다.
+
+        timeout(초)이 지나면 그때까지 끝난 결과만 반환한다. 아직 시작하지 않은 스토어 확인은 취소하고
+        그 상품 목록을 on_cancelled로 알린다. 이미 진행 중인 스토어 확인은 중단할 수 없으므로 백그라운드에서
+        끝까지 진행해 결과를 저장하고(늦은 저장), 그 결과도 on_result로 전달된다. 늦은 저장은 반환 이후에
+        일어나므로 호출한 쪽은 반환값에 없는 상품을 '확인 중'으로 다뤄야 한다.
+        """
+        groups = defaultdict(list)
+        for product in products:
+            groups[product.store_id].append(product)
+
+        results = {}
+        if not groups:
+            return results
+
+        executor = ThreadPoolExecutor(max_workers=min(len(groups), self.max_workers))
+        futures = {
+            executor.submit(self._check_store_group, group, check_type, results, on_result): group
+            for group in groups.values()
+        }
+        wait(futures, timeout=timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        cancelled = [product for future, group in futures.items() if future.cancelled() for product in group]
+        if cancelled and on_cancelled:
+            on_cancelled(cancelled)
+
+        return dict(results)
+
+    def _check_store_group(self, products: List[Product], check_type: str, results: Dict[int, Dict],
+                           on_result: Optional[Callable[[Dict], None]] = None):
+        """
+        한 스토어의 상품들을 순차 확인하며 끝나는 대로 results에 기록 (워커 스레드에서 실행)
         """
         try:
-            previous_status = None
-            if inventory_status:
-                previous_status = inventory_status.stock_status
-
-            InventoryCheckLog.objects.create(
-                product=product,
-                check_type=check_type,
-                status=status,
-                previous_stock_status=previous_status,
-                new_stock_status=result.get('stock_status', 'unknown'),
-                response_time_ms=result.get('response_time_ms', 0),
-                api_response_data=result,
-                error_message=result.get('error_message', ''),
-                price_before=inventory_status.current_price if inventory_status else None,
-                price_after=result.get('current_price'),
-                availability_changed=previous_status != result.get('stock_status') if previous_status else False
-            )
+            self.check_store_products(products, check_type, results, on_result)
         except Exception as e:
-            logger.error(f'재고 확인 로그 기록 실패: {str(e)}')
-
-    def check_multiple_products(self, products: List[Product], check_type: str = 'scheduled') -> List[Dict]:
+            logger.error(f'재고 확인 결과 저장 실패: {str(e)}')
+        finally:
+            # 워커 스레드의 DB 연결 정리
+            connection.close()
+
+    def check_store_products(self, products: List[Product], check_type: str = 'scheduled',
+                             results: Optional[Dict[int, Dict]] = None,
+                             on_result: Optional[Callable[[Dict], None]] = None) -> Dict[int, Dict]:
         """
-        여러 상품의 재고를 동시에 확인
+        같은 스토어 상품들을 순차 확인 (Celery 스토어 큐 작업과 스토어별 스레드가 공용으로 사용)
+        DB 저장은 persist_batch_size개씩 모아 짧은 트랜잭션 한 번으로 처리하고, on_result는 묶음을 저장한 뒤 호출한다.
+        저장에 실패하면 그 묶음의 결과를 실패로 바꿔 알리고 예외를 다시 발생시킨다.
         """
-        results = []
-        for product in products:
-            try:
-                result = self.check_product_availability(product, check_type)
-                results.append(result)
+        results = {} if results is None else results
+        if not products:
+            return results
+
+        store_config = getattr(products[0].store, 'api_config', None)
+        batch_size = store_config.batch_max_size if store_config and store_config.supports_batch_check else 0
+        chunk_size = max(self.persist_batch_size, batch_size)
+
+        for start in range(0, len(products), chunk_size):
+            chunk = products[start:start + chunk_size]
+            batch = InventoryCheckBatch(check_type)
+            batch.prepare(chunk)
+
+            # 일괄 조회 API를 지원하면 external_id 묶음별로 한 번씩 요청
+            prefetched = {}
+            if batch_size:
+                batchable = [product for product in chunk if product.external_id]
+                for batch_start in range(0, len(batchable), batch_size):
+                    prefetched.update(
+                        self._fetch_batch(batchable[batch_start:batch_start + batch_size], store_config, batch)
+                    )
 
-                # 요청 간격 준수
-                time.sleep(1)
+            for product in chunk:
+                try:
+                    results[product.id] = self._check_product(product, batch, prefetched.get(product.id))
+                except Exception as e:
+                    logger.error(f'상품 {product.name} 재고 확인 실패: {str(e)}')
+                    results[product.id] = {
+                        'product_id': product.id,
+                        'success': False,
+                        'error_message': str(e)
+                    }
 
+            try:
+                batch.flush()
             except Exception as e:
-                logger.error(f'상품 {product.name} 재고 확인 실패: {str(e)}')
-                results.append({
-                    'product_id': product.id,
-                    'success': False,
-                    'error_message': str(e)
-                })
+                # 저장하지 못한 확인 결과는 성공으로 돌려주지 않음
+                for product in chunk:
+                    results[product.id] = self.empty_result(product)
+                    results[product.id]['error_message'] = f'재고 확인 결과 저장 실패: {str(e)}'
+                raise
+            finally:
+                # 저장이 끝난 결과(저장에 실패했으면 실패 결과)만 알림
+                if on_result:
+                    for product in chunk:
+                        on_result(results[product.id])
 
         return results
 
@@ -356,7 +1124,7 @@ class InventoryChecker:
         products = Product.objects.filter(
             is_available=True,
             store__is_active=True
-        ).select_related('store').exclude(
+        ).select_related('store__api_config').exclude(
             inventory_status__last_checked_at__gte=cutoff_time
         )[:limit]
 
@@ -370,7 +1138,7 @@ class InventoryChecker:
         products = Product.objects.filter(
             is_available=True,
             store__is_active=True
-        ).select_related('store').annotate(
+        ).select_related('store__api_config').annotate(
             wishlist_count=models.Count('wishlisted_by'),
             recent_recommendations=models.Count(
                 'recommended_in',
@@ -386,46 +1154,193 @@ class InventoryChecker:
 class InventoryScheduler:
     """
     재고 확인 스케줄링 및 자동화 관리
+
+    상품별 다음 확인 시각(InventoryStatus.next_check_at, 인덱스)을 변동성/수요/스토어 상태로 조정하고,
+    실행할 때마다 확인 시각이 지난 상품을 스토어별 요청 예산만큼 꺼내 확인한다.
     """
 
+    # 변동률 계산에 사용할 확인 로그 기간
+    change_window_days = 14
+
+    # 하루 1회 변동하는 상품의 확인 간격을 1/(1+가중치)로 줄임
+    volatility_weight = 4.0
+
+    # 확인 시각을 선점해 두는 시간 (동시에 실행된 스케줄러가 같은 상품을 다시 꺼내지 않도록)
+    claim_lease = timedelta(minutes=10)
+
     def __init__(self):
         self.checker = InventoryChecker()
+        easystyle_settings = settings.EASYSTYLE_SETTINGS
+        self.min_interval = easystyle_settings.get('INVENTORY_CHECK_MIN_INTERVAL_MINUTES', 15)
+        self.max_interval = easystyle_settings.get('INVENTORY_CHECK_MAX_INTERVAL_MINUTES', 72 * 60)
+        self.store_budget = easystyle_settings.get('INVENTORY_CHECK_STORE_BUDGET', 30)
 
-    def run_scheduled_check(self):
+    def run_scheduled_check(self) -> Dict:
         """
-        정기 재고 확인 실행
+        정기 재고 확인 실행: 확인 시각이 지난 상품을 스토어별 예산만큼 확인
         """
         logger.info('정기 재고 확인 시작')
 
-        # 우선순위 상품 먼저 확인
-        high_priority_products = self.checker.get_high_priority_products(20)
-        if high_priority_products:
-            logger.info(f'우선순위 상품 {len(high_priority_products)}개 확인 시작')
-            self.checker.check_multiple_products(high_priority_products, 'scheduled')
-
-        # 일반 상품 확인
-        regular_products = self.checker.get_products_needing_check(30)
-        if regular_products:
-            logger.info(f'일반 상품 {len(regular_products)}개 확인 시작')
-            self.checker.check_multiple_products(regular_products, 'scheduled')
+        products = self.collect_due_products()
+        if products:
+            logger.info(f'확인 대상 상품 {len(products)}개 확인 시작')
+            results = self.checker.check_products_by_store(products, 'scheduled')
+        else:
+            results = {}
 
         logger.info('정기 재고 확인 완료')
+        return {
+            'due_count': len(products),
+            'checked_count': len(results),
+            'success_count': len([r for r in results.values() if r.get('success')]),
+            'store_count': len({product.store_id for product in products}),
+        }
 
-    def check_styling_products(self, product_ids: List[int]) -> Dict:
+    def get_due_products(self, now=None) -> List[Product]:
+        """
+        확인 시각이 지났거나 아직 확인한 적 없는 상품을 스토어별 예산(store_budget)까지 조회
+        """
+        now = now or timezone.now()
+        due = Product.objects.filter(
+            is_available=True,
+            store__is_active=True,
+            store__api_config__is_active=True,
+        ).filter(
+            models.Q(inventory_status__isnull=True) |
+            models.Q(inventory_status__next_check_at__isnull=True) |
+            models.Q(inventory_status__next_check_at__lte=now)
+        ).annotate(
+            due_at=Coalesce('inventory_status__next_check_at', Value(datetime.min.replace(tzinfo=dt_timezone.utc))),
+            store_rank=Window(
+                expression=RowNumber(),
+                partition_by=[F('store_id')],
+                order_by=[F('due_at').asc(), F('id').asc()],
+            ),
+        ).filter(
+            store_rank__lte=self.store_budget
+        ).select_related('store__api_config').order_by('due_at')
+
+        return list(due)
+
+    def pop_due_products(self, now=None) -> List[Product]:
+        """
+        확인할 상품을 꺼내고 다음 확인 시각을 잠시 뒤로 미뤄 선점
+        """
+        now = now or timezone.now()
+        products = self.get_due_products(now)
+        if products:
+            InventoryStatus.objects.filter(
+                product_id__in=[product.id for product in products]
+            ).update(next_check_at=now + self.claim_lease)
+        return products
+
+    def collect_due_products(self, now=None) -> List[Product]:
+        """
+        이번 실행에서 확인할 상품을 꺼내고 확인 간격을 재계산 (확인은 호출하는 쪽에서 실행)
+        """
+        products = self.pop_due_products(now)
+        if products:
+            self.refresh_check_intervals([product.id for product in products])
+        return products
+
+    def refresh_check_intervals(self, product_ids: List[int]) -> Dict[int, int]:
+        """
+        확인 로그의 변동률, 수요(위시리스트/장바구니/최근 추천), 스토어 상태로 상품별 확인 간격(분) 재계산
+        """
+        since = timezone.now() - timedelta(days=self.change_window_days)
+
+        change_counts = dict(
+            InventoryCheckLog.objects.filter(
+                product_id__in=product_ids,
+                checked_at__gte=since,
+                status='success',
+            ).filter(
+                models.Q(availability_changed=True) |
+                models.Q(price_before__isnull=False, price_after__isnull=False) & ~models.Q(price_before=F('price_after'))
+            ).values('product_id').annotate(changes=models.Count('id')).values_list('product_id', 'changes')
+        )
+
+        demand = defaultdict(float)
+        for model, weight, extra_filter in (
+            (UserWishlist, 1.0, {}),
+            (CartItem, 2.0, {}),
+            (StyleRecommendation.products.through, 1.0, {'stylerecommendation__created_at__gte': since}),
+        ):
+            for product_id, count in model.objects.filter(
+                product_id__in=product_ids, **extra_filter
+            ).values('product_id').annotate(count=models.Count('id')).values_list('product_id', 'count'):
+                demand[product_id] += weight * count
+
+        store_failures = dict(
+            Product.objects.filter(id__in=product_ids).values_list('id', 'store__api_config__consecutive_failures')
+        )
+
+        intervals = {
+            product_id: self.compute_check_interval(
+                change_counts.get(product_id, 0) / self.change_window_days,
+                demand[product_id],
+                store_failures.get(product_id) or 0,
+            )
+            for product_id in product_ids
+        }
+
+        statuses = list(InventoryStatus.objects.filter(product_id__in=product_ids).only('id', 'product_id'))
+        for status in statuses:
+            status.check_interval_minutes = intervals[status.product_id]
+        if statuses:
+            InventoryStatus.objects.bulk_update(statuses, ['check_interval_minutes'])
+
+        # 처음 확인하는 상품은 계산한 간격으로 재고 상태 행을 미리 생성
+        # (확인 전이라 last_checked_at은 비워 두고, 다른 스케줄러가 다시 꺼내지 않도록 선점 시각 설정)
+        existing_ids = {status.product_id for status in statuses}
+        claimed_until = timezone.now() + self.claim_lease
+        InventoryStatus.objects.bulk_create([
+            InventoryStatus(
+                product_id=product_id,
+                stock_status='unknown',
+                availability_status='checking',
+                check_interval_minutes=interval,
+                next_check_at=claimed_until,
+            )
+            for product_id, interval in intervals.items()
+            if product_id not in existing_ids
+        ], ignore_conflicts=True)
+
+        return intervals
+
+    def compute_check_interval(self, changes_per_day: float, demand: float, store_failures: int) -> int:
+        """
+        다음 확인까지의 간격(분)
+        자주 바뀌고 수요가 많을수록 짧게, 스토어가 연속 실패 중이면 길게 (min~max 범위)
+        """
+        interval = self.max_interval
+        interval /= 1 + changes_per_day * self.volatility_weight
+        interval /= 1 + math.log1p(demand)
+        interval *= 1 + min(store_failures, 5)
+        return int(min(max(interval, self.min_interval), self.max_interval))
+
+    def check_styling_products(self, product_ids: List[int],
+                               on_result: Optional[Callable[[Dict], None]] = None,
+                               on_alternatives: Optional[Callable[[int, List[Dict]], None]] = None) -> Dict:
         """
         스타일링에 사용될 상품들의 재고 확인
+        on_result/on_alternatives를 넘기면 상품별 확인 결과와 대체 상품이 나오는 대로 호출 (작업 진행 전달용)
         """
-        products = Product.objects.filter(id__in=product_ids)
-        results = self.checker.check_multiple_products(list(products), 'style_recommendation')
+        products = list(Product.objects.filter(id__in=product_ids).select_related('store__api_config', 'category'))
+        checked = self.checker.check_products_coalesced(products, 'style_recommendation', on_result=on_result)
+        results = [checked[product.id] for product in products if product.id in checked]
 
         # 구매 불가능한 상품들에 대한 대체 상품 제안
+        products_by_id = {product.id: product for product in products}
         unavailable_products = [r for r in results if not r.get('is_available', False)]
         alternatives = {}
 
         for unavailable in unavailable_products:
-            product = Product.objects.get(id=unavailable['product_id'])
+            product = products_by_id[unavailable['product_id']]
             alternative_products = self.find_alternative_products(product)
             alternatives[unavailable['product_id']] = alternative_products
+            if on_alternatives:
+                on_alternatives(unavailable['product_id'], alternative_products)
 
         return {
             'results': results,
@@ -471,6 +1386,48 @@ class InventoryScheduler:
         return alternatives
 
 
+def read_change_events(since: int = 0, limit: int = 100, event_types: Optional[List[str]] = None,
+                       commit_lag_seconds: Optional[float] = None) -> Dict:
+    """
+    since 이후의 변경 이벤트를 id 순서로 최대 limit개 읽음
+
+    소비자는 반환된 next_since를 다음 호출의 since로 저장한다. since가 oldest_id보다 작으면
+    보존 기간이 지나 삭제된 이벤트가 있으므로 전체 재동기화가 필요하다.
+
+    id는 INSERT 시점에 정해지고 커밋 순서와 다를 수 있다 (PostgreSQL처럼 쓰기가 동시에 진행되는 DB).
+    작은 id가 늦게 커밋되면 커서가 그 이벤트를 건너뛰므로 생성된 지 commit_lag_seconds가 지나지 않은
+    이벤트는 돌려주지 않는다 (쓰기가 직렬화되는 SQLite에서도 같은 규칙 적용). 재고 확인 결과 저장
+    트랜잭션은 이 시간 안에 끝나야 한다.
+    """
+    if commit_lag_seconds is None:
+        commit_lag_seconds = settings.EASYSTYLE_SETTINGS.get('INVENTORY_CHANGE_EVENT_COMMIT_LAG_SECONDS', 5)
+    events = InventoryChangeEvent.objects.filter(
+        id__gt=since, created_at__lte=timezone.now() - timedelta(seconds=commit_lag_seconds)
+    )
+    if event_types:
+        events = events.filter(event_type__in=event_types)
+    rows = list(events.order_by('id').values(
+        'id', 'product_id', 'product__uuid', 'event_type', 'old_value', 'new_value', 'created_at'
+    )[:limit + 1])
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'events': [{
+            'id': row['id'],
+            'product_id': row['product_id'],
+            'product_uuid': str(row['product__uuid']),
+            'type': row['event_type'],
+            'old': row['old_value'],
+            'new': row['new_value'],
+            'created_at': row['created_at'],
+        } for row in rows],
+        'next_since': rows[-1]['id'] if rows else since,
+        'has_more': has_more,
+        'oldest_id': InventoryChangeEvent.objects.order_by('id').values_list('id', flat=True).first(),
+    }
+
+
 # 전역 인스턴스
 inventory_checker = InventoryChecker()
 inventory_scheduler = InventoryScheduler()
\ No newline at end of file
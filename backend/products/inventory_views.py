@@ -4,17 +4,21 @@
 
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
 from django.db.models import Count, Q, Avg
 from datetime import timedelta
 import logging
 
 from .models import Product, Store
-from .models import InventoryStatus, InventoryCheckLog, PurchaseabilityScore
-from .inventory_service import inventory_checker, inventory_scheduler
+from .models import InventoryStatus, PurchaseabilityScore, StoreApiConfig
+from .inventory_service import inventory_checker, inventory_scheduler, read_change_events
+from .inventory_rollup_service import get_check_activity
+from .inventory_jobs import create_styling_job, fail_job, get_job, job_snapshot, stream_job_events
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +32,8 @@ def check_product_inventory(request, product_uuid):
     try:
         product = get_object_or_404(Product, uuid=product_uuid)
 
-        # 재고 확인 실행
-        result = inventory_checker.check_product_availability(product, 'user_request')
+        # 재고 확인 실행 (최근 결과가 있거나 같은 상품을 확인 중이면 그 결과 사용)
+        result = inventory_checker.check_products_coalesced([product], 'user_request')[product.id]
 
         return Response({
             'success': True,
@@ -44,7 +48,7 @@ def check_product_inventory(request, product_uuid):
                 'size_stock': result['size_stock'],
                 'current_price': result['current_price'],
                 'price_changed': result['price_changed'],
-                'last_checked': result['last_checked'].isoformat(),
+                'last_checked': result['last_checked'].isoformat() if result['last_checked'] else None,
                 'response_time_ms': result['response_time_ms'],
                 'product_url': product.product_url
             }
@@ -94,8 +98,9 @@ def check_multiple_products_inventory(request):
                 'error': '확인할 상품이 없습니다.'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # 재고 확인 실행
-        results = inventory_checker.check_multiple_products(list(products), 'user_request')
+        # 재고 확인 실행 (최근 결과가 있거나 같은 상품을 확인 중이면 그 결과 사용)
+        checked = inventory_checker.check_products_coalesced(list(products), 'user_request')
+        results = [checked[product.id] for product in products if product.id in checked]
 
         # 결과 포맷팅
         formatted_results = []
@@ -149,6 +154,7 @@ def check_multiple_products_inventory(request):
 def check_styling_products_inventory(request):
     """
     스타일링에 사용될 상품들의 재고 확인 + 대체 상품 제안
+    mode=job이면 작업 ID를 바로 반환하고 백그라운드에서 확인 (진행 상황은 작업 조회/스트림 API로 전달)
     """
     try:
         product_uuids = request.data.get('product_uuids', [])
@@ -169,6 +175,9 @@ def check_styling_products_inventory(request):
                 'error': '확인할 상품이 없습니다.'
             }, status=status.HTTP_404_NOT_FOUND)
 
+        if request.data.get('mode') == 'job':
+            return _start_styling_job(request, product_ids)
+
         # 스타일링 상품들의 재고 확인 실행
         result = inventory_scheduler.check_styling_products(product_ids)
 
@@ -185,6 +194,80 @@ def check_styling_products_inventory(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _start_styling_job(request, product_ids):
+    from .tasks import run_styling_inventory_job
+
+    job = create_styling_job(request.user.id, product_ids)
+    try:
+        run_styling_inventory_job.delay(job['job_id'])
+    except Exception as e:
+        logger.error(f'스타일링 재고 확인 작업 등록 실패: {str(e)}')
+        fail_job(job['job_id'], '작업을 등록하지 못했습니다.')
+        return Response({
+            'success': False,
+            'error': '재고 확인 작업을 시작하지 못했습니다.'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    return Response({
+        'success': True,
+        'data': {
+            'job_id': job['job_id'],
+            'total': job['total'],
+            'status_url': reverse('products:inventory-job', args=[job['job_id']]),
+            'stream_url': reverse('products:inventory-job-stream', args=[job['job_id']]),
+        }
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_inventory_job(request, job_id):
+    """
+    재고 확인 작업 진행 상황 조회 (after=<seq> 이후 이벤트만)
+    """
+    try:
+        after = int(request.query_params.get('after', 0))
+    except ValueError:
+        after = 0
+
+    job = get_job(job_id, request.user.id, after)
+    if job is None:
+        return Response({
+            'success': False,
+            'error': '작업을 찾을 수 없습니다.'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'success': True,
+        'data': job_snapshot(job, after)
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def stream_inventory_job(request, job_id):
+    """
+    재고 확인 작업 진행 상황 Server-Sent Events 스트림 (Last-Event-ID 이후부터)
+    """
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.query_params.get('after', 0))
+    except ValueError:
+        after = 0
+
+    if get_job(job_id, request.user.id, after) is None:
+        return Response({
+            'success': False,
+            'error': '작업을 찾을 수 없습니다.'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    response = StreamingHttpResponse(
+        stream_job_events(job_id, request.user.id, after), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_product_inventory_status(request, product_uuid):
@@ -223,7 +306,7 @@ def get_product_inventory_status(request, product_uuid):
                 'size_stock': inventory_status.size_stock,
                 'current_price': float(inventory_status.current_price) if inventory_status.current_price else None,
                 'price_changed': inventory_status.price_changed,
-                'last_checked': inventory_status.last_checked_at.isoformat(),
+                'last_checked': inventory_status.last_checked_at.isoformat() if inventory_status.last_checked_at else None,
                 'last_available': inventory_status.last_available_at.isoformat() if inventory_status.last_available_at else None,
                 'is_recently_checked': inventory_status.is_recently_checked,
                 'needs_urgent_check': inventory_status.needs_urgent_check,
@@ -345,15 +428,8 @@ def get_inventory_statistics(request):
             )
         ).values('name', 'product_count', 'available_count')
 
-        # 최근 24시간 재고 확인 로그
-        recent_checks = InventoryCheckLog.objects.filter(
-            checked_at__gte=timezone.now() - timedelta(hours=24)
-        ).aggregate(
-            total_checks=Count('id'),
-            successful_checks=Count('id', filter=Q(status='success')),
-            failed_checks=Count('id', filter=Q(status='failed')),
-            avg_response_time=Avg('response_time_ms')
-        )
+        # 최근 재고 확인 활동 (원본 로그 대신 일별 집계라 정확히 24시간이 아닌 from_date(어제)~오늘 합계)
+        recent_checks = get_check_activity(days=1)
 
         return Response({
             'success': True,
@@ -381,7 +457,9 @@ def get_inventory_statistics(request):
                     'success_rate_24h': round(
                         (recent_checks['successful_checks'] or 0) / max(recent_checks['total_checks'] or 1, 1) * 100, 1
                     ),
-                    'average_response_time_ms': round(recent_checks['avg_response_time'] or 0, 1)
+                    'average_response_time_ms': round(recent_checks['average_response_time_ms'], 1),
+                    'p95_response_time_ms': recent_checks['p95_response_time_ms'],
+                    'from_date': recent_checks['from_date'],
                 }
             }
         }, status=status.HTTP_200_OK)
@@ -394,6 +472,43 @@ def get_inventory_statistics(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_inventory_http_metrics(request):
+    """
+    스토어 호스트별 요청 대기 시간 및 커넥션 풀 포화 지표 (현재 프로세스 기준)와 스토어별 회로 상태
+    """
+    breaker = inventory_checker.http.breaker
+    store_ids = StoreApiConfig.objects.values_list('store_id', flat=True)
+    return Response({
+        'success': True,
+        'data': inventory_checker.http.get_metrics(),
+        'circuits': {store_id: breaker.get_state(store_id) for store_id in store_ids},
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_inventory_changes(request):
+    """
+    가격/재고 상태 변경 이벤트 피드 (since=<마지막으로 읽은 id>, limit, type=price,availability,stock_status)
+    """
+    try:
+        since = max(int(request.GET.get('since', 0)), 0)
+        limit = min(max(int(request.GET.get('limit', 100)), 1), 1000)  # 1-1000 사이로 제한
+    except ValueError:
+        return Response({
+            'success': False,
+            'error': 'since와 limit은 정수여야 합니다.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    event_types = [t for t in request.GET.get('type', '').split(',') if t]
+    return Response({
+        'success': True,
+        'data': read_change_events(since, limit, event_types),
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_alternative_products(request, product_uuid):
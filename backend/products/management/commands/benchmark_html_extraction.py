@@ -0,0 +1,116 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.html_extraction import PARSE_CHUNK_SIZE, CompiledExtractor, decode_html
+
+DEFAULT_PAGES_DIR = Path(__file__).resolve().parents[2] / 'fixtures' / 'store_pages'
+
+
+class Command(BaseCommand):
+    help = ('샘플 스토어 상품 페이지(products/fixtures/store_pages)나 --pages-dir의 페이지로 '
+            'HTML 추출 엔진의 페이지당 파싱 시간을 측정합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages-dir', default=str(DEFAULT_PAGES_DIR),
+                            help='HTML 페이지와 pages.json(페이지별 셀렉터/키워드 설정)이 있는 디렉터리')
+        parser.add_argument('--iterations', type=int, default=50, help='페이지별 반복 횟수')
+
+    def handle(self, *args, **options):
+        pages_dir = Path(options['pages_dir'])
+        manifest_path = pages_dir / 'pages.json'
+        if not manifest_path.exists():
+            raise CommandError(f'{manifest_path} 파일이 없습니다.')
+
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        iterations = max(options['iterations'], 1)
+
+        try:
+            from bs4 import BeautifulSoup
+        except ImportError:
+            BeautifulSoup = None
+            self.stdout.write('BeautifulSoup 미설치: 기존 방식(전체 트리 파싱) 비교는 생략합니다.')
+
+        for filename, config in manifest.items():
+            content = (pages_dir / filename).read_bytes()
+
+            compile_started = time.perf_counter()
+            extractor = CompiledExtractor(**config)
+            compile_ms = (time.perf_counter() - compile_started) * 1000
+
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                extraction = extractor.extract(decode_html(content))
+                timings.append((time.perf_counter() - started) * 1000)
+
+            # 스트리밍 추출: 결과가 정해지면 남은 청크는 읽지 않음
+            stream_timings, consumed = [], 0
+            for _ in range(iterations):
+                chunks = self._chunks(content)
+                started = time.perf_counter()
+                extractor.extract_stream(chunks)
+                stream_timings.append((time.perf_counter() - started) * 1000)
+                consumed = chunks.consumed
+
+            found = {field: element['text'] or '(속성만)' for field, element in extraction['elements'].items()}
+            self.stdout.write(
+                f"{filename} ({len(content) / 1024:.1f}KB): "
+                f"평균 {statistics.mean(timings):.2f}ms, p50 {statistics.median(timings):.2f}ms, "
+                f"p95 {self._percentile(timings, 95):.2f}ms, 컴파일 {compile_ms:.2f}ms "
+                f"| 키워드={extraction['keyword']} 요소={found}"
+            )
+            self.stdout.write(
+                f"  스트리밍: 평균 {statistics.mean(stream_timings):.2f}ms, "
+                f"읽은 크기 {consumed / 1024:.1f}KB / {len(content) / 1024:.1f}KB"
+            )
+
+            if BeautifulSoup is not None:
+                baseline = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    self._extract_with_soup(BeautifulSoup, content, config)
+                    baseline.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(
+                    f"  BeautifulSoup 기준: 평균 {statistics.mean(baseline):.2f}ms "
+                    f"({statistics.mean(baseline) / max(statistics.mean(timings), 0.001):.1f}배)"
+                )
+
+    @staticmethod
+    def _chunks(content):
+        return _ChunkReader(content, PARSE_CHUNK_SIZE)
+
+    @staticmethod
+    def _percentile(values, percentile):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+    @staticmethod
+    def _extract_with_soup(BeautifulSoup, content, config):
+        """기존 방식: 전체 트리 + 전체 텍스트 소문자 검색 + 셀렉터별 select"""
+        soup = BeautifulSoup(content, 'html.parser')
+        page_text = soup.get_text().lower()
+        for keyword in config.get('unavailable_keywords', []):
+            if keyword.lower() in page_text:
+                return
+        for field in ('inventory_selector', 'price_selector', 'availability_selector'):
+            if config.get(field):
+                soup.select(config[field])
+
+
+class _ChunkReader:
+    """응답 본문 스트리밍을 흉내 내며 실제로 소비된 바이트 수를 기록"""
+
+    def __init__(self, content, chunk_size):
+        self.content = content
+        self.chunk_size = chunk_size
+        self.consumed = 0
+
+    def __iter__(self):
+        for start in range(0, len(self.content), self.chunk_size):
+            chunk = self.content[start:start + self.chunk_size]
+            self.consumed += len(chunk)
+            yield chunk
@@ -0,0 +1,221 @@
+import resource
+import statistics
+import threading
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from products.fake_store import (
+    DEFAULT_BATCH_MAPPING, DEFAULT_HTML_SELECTORS, FakeStoreConfig, FakeStoreServer, add_fake_store_arguments,
+)
+from products.inventory_service import InventoryChecker, InventoryScheduler
+from products.models import (
+    Brand, InventoryCheckDailySummary, InventoryCheckLog, InventoryStatus, Product, ProductCategory, Store,
+    StoreApiConfig,
+)
+
+STORE_TYPES = ('json', 'html', 'batch')
+
+
+class WriteCounter:
+    """
+    모든 DB 연결(워커 스레드 연결 포함)의 쓰기 쿼리 수 집계 (connection.execute_wrappers)
+    """
+
+    WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:7].upper().startswith(self.WRITE_PREFIXES):
+            with self._lock:
+                self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+class TimedInventoryChecker(InventoryChecker):
+    """
+    상품별 확인 시간을 기록하는 InventoryChecker
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.latencies_ms = []
+        self.circuit_open = 0
+        self.downloads = []
+        self.stopped_early = 0
+        self._timing_lock = threading.Lock()
+
+    def _check_product(self, product, batch, prefetched=None):
+        started = time.perf_counter()
+        result = super()._check_product(product, batch, prefetched)
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._timing_lock:
+            self.latencies_ms.append(elapsed)
+            self.circuit_open += bool(result.get('circuit_open'))
+            if 'downloaded_bytes' in result:
+                self.downloads.append(result['downloaded_bytes'])
+                self.stopped_early += bool(result.get('stopped_early'))
+        return result
+
+
+class Command(BaseCommand):
+    help = ('로컬 가짜 스토어에 N개 상품/M개 스토어를 만들어 check_multiple_products와 정기 확인(스케줄러)의 '
+            '처리량, 확인 지연 p50/p95/p99, 확인당 DB 쓰기 수, 최대 메모리를 측정합니다. '
+            '측정은 별도의 테스트 DB에서 실행됩니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200, help='상품 수')
+        parser.add_argument('--stores', type=int, default=5, help='스토어 수 (스토어마다 127.0.0.x 호스트 사용)')
+        parser.add_argument('--store-types', default=','.join(STORE_TYPES),
+                            help='스토어 유형을 순서대로 배정 (json: 단일 API, html: 스크래핑, batch: 일괄 API)')
+        parser.add_argument('--rounds', type=int, default=2,
+                            help='check_multiple_products 반복 횟수 (2회차부터 조건부 요청/변경 없음 경로 측정)')
+        parser.add_argument('--skip-scheduler', action='store_true', help='스케줄러 측정 생략')
+        parser.add_argument('--no-tracemalloc', action='store_true',
+                            help='tracemalloc 없이 측정 (처리량은 정확해지지만 구간별 최대 메모리는 보고하지 않음)')
+        add_fake_store_arguments(parser)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        server = FakeStoreServer(FakeStoreConfig.from_options(options)).start()
+        counter = WriteCounter()
+        counter.install(connection=connection)
+        connection_created.connect(counter.install)
+
+        try:
+            products = self._seed(options, server.port)
+            self.stdout.write(
+                f"상품 {len(products)}개 / 스토어 {options['stores']}개 ({options['store_types']}), "
+                f"응답 지연 {options['latency_ms']}±{options['jitter_ms']}ms, 오류율 {options['error_rate']}, "
+                f"변동률 {options['change_rate']}, 요청 제한 {options['rate_limit'] or '없음'}"
+            )
+
+            for round_number in range(1, max(options['rounds'], 1) + 1):
+                checker = TimedInventoryChecker()
+                self._measure(
+                    f'check_multiple_products #{round_number}', counter, options,
+                    lambda: checker.check_multiple_products(products, 'scheduled'), checker,
+                )
+
+            if not options['skip_scheduler']:
+                InventoryStatus.objects.update(next_check_at=timezone.now() - timedelta(minutes=1))
+                scheduler = InventoryScheduler()
+                scheduler.checker = TimedInventoryChecker()
+                self._measure('scheduler', counter, options, lambda: self._drain(scheduler), scheduler.checker)
+
+            for host, stats in sorted(server.get_stats().items()):
+                self.stdout.write(f'  스토어 {host}: {stats}')
+            self.stdout.write(
+                f'확인 로그 {InventoryCheckLog.objects.count()}행 (변경/실패만), '
+                f'일별 집계 {InventoryCheckDailySummary.objects.count()}행'
+            )
+            self.stdout.write(f'최대 RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f}MB')
+        finally:
+            connection_created.disconnect(counter.install)
+            server.stop()
+            cache.clear()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _seed(self, options, port):
+        brand = Brand.objects.create(name='Benchmark Brand')
+        category = ProductCategory.objects.create(name='벤치마크', name_en='Benchmark')
+        store_types = [t.strip() for t in options['store_types'].split(',') if t.strip() in STORE_TYPES] or ['json']
+
+        stores = []
+        for index in range(max(options['stores'], 1)):
+            store_type = store_types[index % len(store_types)]
+            base_url = f'http://127.0.0.{index + 1}:{port}'
+            store = Store.objects.create(name=f'Fake Store {index + 1} ({store_type})', website=base_url)
+            config = {
+                'store': store,
+                'api_type': 'scraping' if store_type == 'html' else 'rest_api',
+                'request_delay_seconds': 0,
+                'timeout_seconds': 10,
+            }
+            if store_type == 'json':
+                config['inventory_check_url'] = f'{base_url}/api/products/{{product_id}}'
+            elif store_type == 'html':
+                config.update(DEFAULT_HTML_SELECTORS)
+            else:
+                config['batch_check_url'] = f'{base_url}/api/batch?ids={{product_ids}}'
+                config['batch_response_mapping'] = DEFAULT_BATCH_MAPPING
+            StoreApiConfig.objects.create(**config)
+            stores.append((store, base_url))
+
+        Product.objects.bulk_create([
+            Product(
+                name=f'Benchmark Product {index}',
+                brand=brand,
+                category=category,
+                store=stores[index % len(stores)][0],
+                external_id=f'bench-{index}',
+                original_price=30000,
+                main_image=f'{stores[index % len(stores)][1]}/images/{index}.jpg',
+                product_url=f'{stores[index % len(stores)][1]}/products/bench-{index}',
+            )
+            for index in range(options['products'])
+        ])
+        return list(Product.objects.select_related('store__api_config').order_by('id'))
+
+    @staticmethod
+    def _drain(scheduler):
+        """확인 대상이 없어질 때까지 정기 확인 반복"""
+        checked = 0
+        while True:
+            summary = scheduler.run_scheduled_check()
+            checked += summary['checked_count']
+            if not summary['due_count']:
+                return checked
+
+    def _measure(self, label, counter, options, run, checker):
+        cache.clear()
+        use_tracemalloc = not options['no_tracemalloc']
+        if use_tracemalloc:
+            tracemalloc.start()
+        writes_before = counter.count
+
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+
+        peak_mb = None
+        if use_tracemalloc:
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+
+        latencies = sorted(checker.latencies_ms)
+        checks = len(latencies)
+        writes = counter.count - writes_before
+        self.stdout.write(self.style.SUCCESS(
+            f"[{label}] {checks}건 {elapsed:.2f}초 → {checks / elapsed if elapsed else 0:.1f} products/sec, "
+            f"지연 p50 {self._percentile(latencies, 50):.1f}ms / p95 {self._percentile(latencies, 95):.1f}ms / "
+            f"p99 {self._percentile(latencies, 99):.1f}ms (평균 {statistics.mean(latencies) if latencies else 0:.1f}ms), "
+            f"DB 쓰기 {writes}회 (확인당 {writes / checks if checks else 0:.2f}), "
+            f"회로 차단 {checker.circuit_open}건"
+            + (f", 최대 메모리 {peak_mb:.1f}MB" if peak_mb is not None else '')
+        ))
+        if checker.downloads:
+            self.stdout.write(
+                f"  스크래핑 {len(checker.downloads)}건: 평균 다운로드 {statistics.mean(checker.downloads) / 1024:.1f}KB, "
+                f"최대 {max(checker.downloads) / 1024:.1f}KB, 조기 종료 {checker.stopped_early}건"
+            )
+
+    @staticmethod
+    def _percentile(values, percentile):
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(len(values) * percentile / 100))]
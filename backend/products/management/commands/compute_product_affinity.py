@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from products.analytics_service import ProductAffinityAggregator
+
+
+class Command(BaseCommand):
+    help = '상품별 연령대 인기도(age_group_popularity)와 스타일 카테고리 적합도(style_category_fit)를 일괄 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='한 번에 집계할 상품 수')
+
+    def handle(self, *args, **options):
+        stats = ProductAffinityAggregator(chunk_size=options['chunk_size']).run()
+        self.stdout.write(self.style.SUCCESS(
+            f"집계 완료: 상품 {stats['products_scanned']}개, 청크 {stats['chunks']}개, "
+            f"갱신 {stats['analytics_updated']}건"
+        ))
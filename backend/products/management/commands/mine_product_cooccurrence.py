@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from products.analytics_service import CooccurrenceMiner
+
+
+class Command(BaseCommand):
+    help = '스타일 추천과 장바구니 스타일 세트에서 "함께 스타일링된" 상품 쌍을 증분 집계합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=10, help='상품별로 유지할 파트너 수')
+        parser.add_argument('--batch-size', type=int, default=2000, help='한 트랜잭션에서 처리할 레코드 수')
+
+    def handle(self, *args, **options):
+        stats = CooccurrenceMiner(top_k=options['top_k'], batch_size=options['batch_size']).run()
+        self.stdout.write(self.style.SUCCESS(
+            f"집계 완료: 추천 상품 {stats['recommendation_products']}건, 장바구니 아이템 {stats['cart_items']}건, "
+            f"상품 쌍 {stats['pairs']}개, 갱신된 상품 {stats['products_refreshed']}개"
+        ))
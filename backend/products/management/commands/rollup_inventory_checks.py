@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from products.inventory_rollup_service import InventoryCheckRollup
+
+
+class Command(BaseCommand):
+    help = ('상품별 일별 재고 확인 집계를 스토어별 롤업으로 합산하고, 보존 기간이 지난 확인 로그를 '
+            '월별 보관 테이블로 옮깁니다. 옵션을 생략하면 EASYSTYLE_SETTINGS 값을 사용합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rollup-days', type=int, default=2, help='다시 계산할 최근 일수 (오늘 포함)')
+        parser.add_argument('--log-retention-days', type=int, help='확인 로그 보존 기간(일)')
+        parser.add_argument('--archive-months', type=int, help='월별 보관 테이블 보관 기간(개월)')
+        parser.add_argument('--summary-retention-days', type=int, help='일별 집계/롤업 보존 기간(일)')
+        parser.add_argument('--event-retention-days', type=int, help='변경 이벤트 보존 기간(일)')
+
+    def handle(self, *args, **options):
+        stats = InventoryCheckRollup(
+            rollup_days=options['rollup_days'],
+            log_retention_days=options['log_retention_days'],
+            archive_months=options['archive_months'],
+            summary_retention_days=options['summary_retention_days'],
+            event_retention_days=options['event_retention_days'],
+        ).run()
+        self.stdout.write(self.style.SUCCESS(
+            f"롤업 완료: 스토어 롤업 {stats['rollups_updated']}행 갱신, 확인 로그 {stats['logs_archived']}행 보관 "
+            f"({', '.join(stats['archive_tables']) or '없음'}), 보관 테이블 {len(stats['archive_tables_dropped'])}개 삭제, "
+            f"만료 집계 {stats['summaries_deleted']}행 / 롤업 {stats['rollups_deleted']}행 / "
+            f"변경 이벤트 {stats['events_deleted']}건 삭제"
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from products.analytics_service import ViewSketchRollup
+
+
+class Command(BaseCommand):
+    help = '일간 고유 방문자 스케치(HyperLogLog)를 상품 분석 데이터에 병합합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=30, help='일간 스케치 보존 기간(일)')
+
+    def handle(self, *args, **options):
+        stats = ViewSketchRollup(retention_days=options['retention_days']).run()
+        self.stdout.write(self.style.SUCCESS(
+            f"롤업 완료: 스케치 {stats['sketches_merged']}개 병합, 상품 {stats['products_updated']}개 갱신 "
+            f"(고유 방문자 합계 약 {stats['unique_viewers']}명), 만료 스케치 {stats['sketches_deleted']}개 삭제"
+        ))
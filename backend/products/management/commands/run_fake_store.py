@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from products.fake_store import FakeStoreConfig, FakeStoreServer, add_fake_store_arguments
+
+
+class Command(BaseCommand):
+    help = '재고 확인 측정용 로컬 가짜 스토어 서버를 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='', help='바인드 주소 (기본: 모든 주소, 127.0.0.x로 스토어 구분 가능)')
+        parser.add_argument('--port', type=int, default=8765)
+        add_fake_store_arguments(parser)
+
+    def handle(self, *args, **options):
+        server = FakeStoreServer(FakeStoreConfig.from_options(options), host=options['host'], port=options['port'])
+        self.stdout.write(self.style.SUCCESS(
+            f"가짜 스토어 실행: http://{options['host'] or '127.0.0.1'}:{server.port}/ "
+            f"(/api/products/<id>, /api/batch?ids=a|b, /products/<id>)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+            for host, stats in server.get_stats().items():
+                self.stdout.write(f'{host}: {stats}')
+
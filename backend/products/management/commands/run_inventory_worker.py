@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from easystyle_backend.celery import app
+from products.tasks import run_inventory_sweep, store_queue_name, store_queue_names
+
+
+class Command(BaseCommand):
+    help = '스토어 큐를 구독하는 재고 확인 Celery 워커를 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stores', default='',
+                            help='이 스토어 ID들이 배정된 큐만 구독(쉼표 구분), 비우면 스토어 큐 전체')
+        parser.add_argument('--concurrency', type=int, default=4, help='워커 프로세스 수')
+        parser.add_argument('--beat', action='store_true', help='정기 확인(beat) 스케줄러를 함께 실행')
+        parser.add_argument('--no-sweep', action='store_true', help='정기 확인 분배 큐(inventory.sweep)를 구독하지 않음')
+        parser.add_argument('--sweep-once', action='store_true',
+                            help='워커를 띄우지 않고 확인 대상 분배만 한 번 실행')
+        parser.add_argument('--loglevel', default='info')
+
+    def handle(self, *args, **options):
+        if options['sweep_once']:
+            summary = run_inventory_sweep()
+            self.stdout.write(self.style.SUCCESS(
+                f"분배 완료: 상품 {summary['due_count']}개, 스토어 {summary['store_count']}개"
+            ))
+            return
+
+        # 스토어 큐는 개수가 고정되어 있어 워커 실행 후 추가된 스토어도 기존 큐로 들어온다
+        if options['stores']:
+            store_ids = [int(store_id) for store_id in options['stores'].split(',') if store_id.strip()]
+            queues = list(dict.fromkeys(store_queue_name(store_id) for store_id in store_ids))
+        else:
+            queues = store_queue_names()
+        if not options['no_sweep']:
+            queues.append('inventory.sweep')
+        queues.append(app.conf.task_default_queue)
+
+        self.stdout.write(f"구독 큐: {', '.join(queues)}")
+
+        argv = [
+            'worker',
+            '--loglevel', options['loglevel'],
+            '--concurrency', str(options['concurrency']),
+            '--queues', ','.join(queues),
+        ]
+        if options['beat']:
+            argv.append('--beat')
+        app.worker_main(argv)
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_inventorystatus_purchaseabilityscore_storeapiconfig_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsJobCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('last_processed_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'easystyle_analytics_job_cursors',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cooccurrences', to='products.product')),
+            ],
+            options={
+                'db_table': 'easystyle_product_cooccurrences',
+                'indexes': [models.Index(fields=['product', '-count'], name='easystyle_p_product_06e222_idx')],
+                'unique_together': {('product', 'partner')},
+            },
+        ),
+    ]
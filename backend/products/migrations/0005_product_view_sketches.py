@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_cooccurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productanalytics',
+            name='unique_viewer_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='productanalytics',
+            name='unique_viewer_sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ProductViewSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('registers', models.BinaryField()),
+                ('estimate', models.PositiveIntegerField(default=0)),
+                ('rolled_up', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_sketches', to='products.product')),
+            ],
+            options={
+                'db_table': 'easystyle_product_view_sketches',
+                'indexes': [models.Index(fields=['rolled_up', 'day'], name='easystyle_p_rolled__fd59ab_idx')],
+                'unique_together': {('product', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_view_sketches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storeapiconfig',
+            name='connection_pool_size',
+            field=models.PositiveIntegerField(default=10, help_text='호스트별 최대 커넥션 수'),
+        ),
+        migrations.AddField(
+            model_name='storeapiconfig',
+            name='keep_alive_seconds',
+            field=models.PositiveIntegerField(default=60, help_text='유휴 커넥션 유지 시간(초), 0이면 keep-alive 미사용'),
+        ),
+        migrations.AddField(
+            model_name='storeapiconfig',
+            name='rate_limit_burst',
+            field=models.PositiveIntegerField(default=1, help_text='요청 간격 제한 내 최대 연속 요청 수'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_store_api_config_http_pool'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventorystatus',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='마지막으로 파싱한 응답 본문 SHA-256', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='inventorystatus',
+            name='http_etag',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='inventorystatus',
+            name='http_last_modified',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_inventory_status_validators'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storeapiconfig',
+            name='batch_check_url',
+            field=models.CharField(blank=True, help_text='일괄 재고 조회 URL ({product_ids}에 external_id 목록)', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='storeapiconfig',
+            name='batch_max_size',
+            field=models.PositiveIntegerField(default=50, help_text='요청당 최대 상품 수'),
+        ),
+        migrations.AddField(
+            model_name='storeapiconfig',
+            name='batch_response_mapping',
+            field=models.JSONField(blank=True, default=dict, help_text='일괄 응답 필드 매핑 (items_path, id_field, stock_field, price_field, sizes_field, id_separator)'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_store_api_config_batch_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventorystatus',
+            name='check_interval_minutes',
+            field=models.PositiveIntegerField(default=1440, help_text='다음 확인까지 간격(분)'),
+        ),
+        migrations.AddField(
+            model_name='inventorystatus',
+            name='next_check_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
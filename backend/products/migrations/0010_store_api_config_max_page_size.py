@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_inventory_status_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storeapiconfig',
+            name='max_page_kb',
+            field=models.PositiveIntegerField(default=2048, help_text='스크래핑 페이지 최대 다운로드 크기(KB)'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_store_api_config_max_page_size'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryCheckDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('check_count', models.PositiveIntegerField(default=0)),
+                ('success_count', models.PositiveIntegerField(default=0)),
+                ('failure_count', models.PositiveIntegerField(default=0)),
+                ('unchanged_count', models.PositiveIntegerField(default=0, help_text='전체 로그 없이 집계만 된 변경 없는 성공')),
+                ('not_modified_count', models.PositiveIntegerField(default=0, help_text='조건부 요청/동일 본문으로 파싱을 생략한 확인')),
+                ('total_response_time_ms', models.PositiveBigIntegerField(default=0)),
+                ('max_response_time_ms', models.PositiveIntegerField(default=0)),
+                ('response_time_histogram', models.JSONField(blank=True, default=list)),
+                ('last_checked_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_check_summaries', to='products.product')),
+            ],
+            options={
+                'verbose_name': '일별 재고 확인 집계',
+                'verbose_name_plural': '일별 재고 확인 집계들',
+                'db_table': 'easystyle_inventory_check_daily_summaries',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='easystyle_i_date_2d845a_idx')],
+                'unique_together': {('product', 'date')},
+            },
+        ),
+    ]
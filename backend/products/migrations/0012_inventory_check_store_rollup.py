@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_inventory_check_daily_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryCheckStoreRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('check_count', models.PositiveIntegerField(default=0)),
+                ('success_count', models.PositiveIntegerField(default=0)),
+                ('failure_count', models.PositiveIntegerField(default=0)),
+                ('average_response_time_ms', models.FloatField(default=0.0)),
+                ('p95_response_time_ms', models.PositiveIntegerField(default=0)),
+                ('max_response_time_ms', models.PositiveIntegerField(default=0)),
+                ('response_time_histogram', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_check_rollups', to='products.store')),
+            ],
+            options={
+                'verbose_name': '스토어별 재고 확인 롤업',
+                'verbose_name_plural': '스토어별 재고 확인 롤업들',
+                'db_table': 'easystyle_inventory_check_store_rollups',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='easystyle_i_date_e9eec8_idx')],
+                'unique_together': {('store', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_inventory_check_store_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('price', '가격 변경'), ('availability', '구매 가능 여부 변경'), ('stock_status', '재고 상태 변경')], max_length=12)),
+                ('old_value', models.CharField(blank=True, max_length=32)),
+                ('new_value', models.CharField(blank=True, max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_change_events', to='products.product')),
+            ],
+            options={
+                'db_table': 'easystyle_inventory_change_events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['created_at'], name='easystyle_i_created_40b3b0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_inventory_change_event'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventorystatus',
+            name='last_checked_at',
+            field=models.DateTimeField(blank=True, help_text='마지막 확인 시각 (확인 전이면 비어 있음)', null=True),
+        ),
+    ]
@@ -1,4 +1,7 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from authentication.models import User
@@ -242,6 +245,10 @@ class ProductAnalytics(models.Model):
     # 사용자 선호도 분석
     age_group_popularity = models.JSONField(default=dict, blank=True)
     style_category_fit = models.JSONField(default=dict, blank=True)
+
+    # 고유 방문자 수 (일별 HyperLogLog 스케치를 롤업 시 병합)
+    unique_viewer_sketch = models.BinaryField(null=True, blank=True)
+    unique_viewer_count = models.PositiveIntegerField(default=0)
     
     last_updated = models.DateTimeField(auto_now=True)
     
@@ -252,6 +259,114 @@ class ProductAnalytics(models.Model):
         db_table = 'easystyle_product_analytics'
 
 
+class ProductViewSketch(models.Model):
+    """
+    상품별 일간 고유 방문자 HyperLogLog 스케치 (4KB 고정)
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='view_sketches')
+    day = models.DateField()
+    registers = models.BinaryField()
+    estimate = models.PositiveIntegerField(default=0)
+    rolled_up = models.BooleanField(default=False)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product_id} - {self.day} (~{self.estimate})"
+
+    class Meta:
+        db_table = 'easystyle_product_view_sketches'
+        unique_together = ['product', 'day']
+        indexes = [
+            models.Index(fields=['rolled_up', 'day']),
+        ]
+
+
+class ProductCooccurrence(models.Model):
+    """
+    함께 스타일링된 상품 쌍 카운트 (희소 행렬)
+    조회를 위해 (A, B)와 (B, A)를 모두 저장
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='cooccurrences')
+    partner = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product_id} + {self.partner_id} ({self.count})"
+
+    class Meta:
+        db_table = 'easystyle_product_cooccurrences'
+        unique_together = ['product', 'partner']
+        indexes = [
+            models.Index(fields=['product', '-count']),
+        ]
+
+
+class AnalyticsJobCursor(models.Model):
+    """
+    증분 배치 작업의 처리 위치 (마지막으로 처리한 ID)
+    """
+    name = models.CharField(max_length=100, unique=True)
+    last_processed_id = models.BigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_processed_id}"
+
+    class Meta:
+        db_table = 'easystyle_analytics_job_cursors'
+
+
+def unit_price_expression(prefix=''):
+    """상품 현재 판매가 SQL 표현식 (Product.current_price와 동일: 할인가 우선)"""
+    return Coalesce(
+        NullIf(F(f'{prefix}sale_price'), Value(0)),
+        F(f'{prefix}original_price'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2)
+    )
+
+
+class CartQuerySet(models.QuerySet):
+    """
+    장바구니 조회용 QuerySet
+    """
+
+    def with_totals(self):
+        """총 수량과 총 금액을 SQL 집계로 함께 조회"""
+        return self.annotate(
+            annotated_total_items=Coalesce(Sum('items__quantity'), 0),
+            annotated_total_price=Coalesce(
+                Sum(
+                    F('items__quantity') * unit_price_expression('items__product__'),
+                    output_field=models.DecimalField(max_digits=12, decimal_places=2)
+                ),
+                Value(0),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            ),
+        )
+
+    def with_items(self, user=None):
+        """아이템(소계 포함)과 상품 정보를 미리 로드, user가 있으면 위시리스트 여부까지 로드"""
+        lookups = [
+            models.Prefetch(
+                'items',
+                queryset=CartItem.objects.with_subtotal().select_related(
+                    'product__brand', 'product__category', 'product__store'
+                )
+            ),
+        ]
+        if user is not None and user.is_authenticated:
+            lookups.append(models.Prefetch(
+                'items__product__wishlisted_by',
+                queryset=UserWishlist.objects.filter(user=user),
+                to_attr='user_wishlist_entries'
+            ))
+        return self.select_related('user').prefetch_related(*lookups)
+
+
 class Cart(models.Model):
     """
     사용자 장바구니 모델
@@ -260,26 +375,49 @@ class Cart(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CartQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.user.username}'s Cart"
 
     @property
     def total_items(self):
         """장바구니 총 상품 개수"""
+        if hasattr(self, 'annotated_total_items'):
+            return self.annotated_total_items
         return self.items.aggregate(total=models.Sum('quantity'))['total'] or 0
 
     @property
     def total_price(self):
         """장바구니 총 금액"""
-        total = 0
-        for item in self.items.all():
-            total += item.subtotal
-        return total
+        if hasattr(self, 'annotated_total_price'):
+            return self.annotated_total_price
+        return self.items.aggregate(
+            total=Sum(
+                F('quantity') * unit_price_expression('product__'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            )
+        )['total'] or 0
 
     class Meta:
         db_table = 'easystyle_carts'
 
 
+class CartItemQuerySet(models.QuerySet):
+    """
+    장바구니 아이템 조회용 QuerySet
+    """
+
+    def with_subtotal(self):
+        """상품별 소계를 SQL로 계산"""
+        return self.annotate(
+            annotated_subtotal=models.ExpressionWrapper(
+                F('quantity') * unit_price_expression('product__'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            )
+        )
+
+
 class CartItem(models.Model):
     """
     장바구니 상품 모델
@@ -295,12 +433,16 @@ class CartItem(models.Model):
     added_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CartItemQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.product.name} (x{self.quantity}) in {self.cart.user.username}'s cart"
 
     @property
     def subtotal(self):
         """상품별 소계 금액"""
+        if hasattr(self, 'annotated_subtotal'):
+            return self.annotated_subtotal
         return self.product.current_price * self.quantity
 
     class Meta:
@@ -348,7 +490,7 @@ class InventoryStatus(models.Model):
     price_change_percentage = models.FloatField(null=True, blank=True)
 
     # 외부 사이트 연동 정보
-    last_checked_at = models.DateTimeField(auto_now=True)
+    last_checked_at = models.DateTimeField(null=True, blank=True, help_text="마지막 확인 시각 (확인 전이면 비어 있음)")
     last_available_at = models.DateTimeField(null=True, blank=True)
     consecutive_unavailable_count = models.PositiveIntegerField(default=0)
 
@@ -356,6 +498,15 @@ class InventoryStatus(models.Model):
     last_error_message = models.TextField(blank=True)
     check_failed_count = models.PositiveIntegerField(default=0)
 
+    # 조건부 요청 검증자 (변경 없는 상품은 헤더만으로 재확인)
+    http_etag = models.CharField(max_length=255, blank=True)
+    http_last_modified = models.CharField(max_length=64, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, help_text="마지막으로 파싱한 응답 본문 SHA-256")
+
+    # 적응형 확인 스케줄 (변동성/수요/스토어 상태로 간격 조정)
+    check_interval_minutes = models.PositiveIntegerField(default=24 * 60, help_text="다음 확인까지 간격(분)")
+    next_check_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -364,16 +515,28 @@ class InventoryStatus(models.Model):
 
     @property
     def is_recently_checked(self):
-        """최근 1시간 내에 확인되었는지"""
-        return timezone.now() - self.last_checked_at < timedelta(hours=1)
+        """확인 결과 유효 시간(INVENTORY_CHECK_FRESHNESS_SECONDS, 기본 1시간) 내에 확인되었는지"""
+        freshness = settings.EASYSTYLE_SETTINGS.get('INVENTORY_CHECK_FRESHNESS_SECONDS', 60 * 60)
+        return self.last_checked_at is not None and \
+            timezone.now() - self.last_checked_at < timedelta(seconds=freshness)
+
+    @property
+    def has_fresh_result(self):
+        """새로 확인하지 않고 그대로 돌려줘도 되는 상태인지 (유효 시간 내 성공한 확인)"""
+        return (
+            self.pk is not None and
+            self.is_recently_checked and
+            self.check_failed_count == 0 and
+            self.availability_status != 'checking'
+        )
 
     @property
     def needs_urgent_check(self):
-        """긴급 확인이 필요한지 (24시간 이상 미확인)"""
-        return timezone.now() - self.last_checked_at > timedelta(hours=24)
+        """긴급 확인이 필요한지 (한 번도 확인하지 않았거나 24시간 이상 미확인)"""
+        return self.last_checked_at is None or timezone.now() - self.last_checked_at > timedelta(hours=24)
 
-    def mark_as_available(self, stock_quantity=None, size_stock=None):
-        """구매 가능으로 마킹"""
+    def mark_as_available(self, stock_quantity=None, size_stock=None, commit=True):
+        """구매 가능으로 마킹 (commit=False면 저장하지 않음)"""
         self.availability_status = 'available'
         self.is_purchasable = True
         self.last_available_at = timezone.now()
@@ -396,18 +559,24 @@ class InventoryStatus(models.Model):
                 self.stock_status = 'out_of_stock'
                 self.is_purchasable = False
 
-        self.save()
+        if commit:
+            self.last_checked_at = timezone.now()
+            self.save()
 
-    def mark_as_unavailable(self, reason=""):
-        """구매 불가로 마킹"""
+    def mark_as_unavailable(self, reason="", commit=True):
+        """구매 불가로 마킹 (commit=False면 저장하지 않음)"""
         self.availability_status = 'unavailable'
         self.is_purchasable = False
         self.consecutive_unavailable_count += 1
+        # 구매 불가도 확인에는 성공한 결과
+        self.check_failed_count = 0
         self.last_error_message = reason
-        self.save()
+        if commit:
+            self.last_checked_at = timezone.now()
+            self.save()
 
-    def mark_check_failed(self, error_message=""):
-        """확인 실패로 마킹"""
+    def mark_check_failed(self, error_message="", commit=True):
+        """확인 실패로 마킹 (commit=False면 저장하지 않음)"""
         self.check_failed_count += 1
         self.last_error_message = error_message
 
@@ -416,7 +585,9 @@ class InventoryStatus(models.Model):
             self.availability_status = 'checking'
             self.is_purchasable = False
 
-        self.save()
+        if commit:
+            self.last_checked_at = timezone.now()
+            self.save()
 
     class Meta:
         db_table = 'easystyle_inventory_status'
@@ -477,6 +648,148 @@ class InventoryCheckLog(models.Model):
         ]
 
 
+class InventoryCheckDailySummary(models.Model):
+    """
+    상품별 하루 재고 확인 집계
+
+    InventoryCheckLog에는 상태/가격이 바뀌었거나 실패한 확인만 전체 행으로 남기고,
+    변경 없는 성공(304 포함)은 이 행의 카운터로만 누적한다.
+    """
+    # 응답 시간 히스토그램 구간 상한(ms), 마지막 칸은 최대 구간 초과
+    RESPONSE_TIME_BUCKETS_MS = (50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_check_summaries')
+    date = models.DateField()
+
+    check_count = models.PositiveIntegerField(default=0)
+    success_count = models.PositiveIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0)
+    unchanged_count = models.PositiveIntegerField(default=0, help_text="전체 로그 없이 집계만 된 변경 없는 성공")
+    not_modified_count = models.PositiveIntegerField(default=0, help_text="조건부 요청/동일 본문으로 파싱을 생략한 확인")
+
+    total_response_time_ms = models.PositiveBigIntegerField(default=0)
+    max_response_time_ms = models.PositiveIntegerField(default=0)
+    response_time_histogram = models.JSONField(default=list, blank=True)
+
+    last_checked_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.product.name} - {self.date} - {self.check_count}건"
+
+    @property
+    def average_response_time_ms(self):
+        return self.total_response_time_ms / self.check_count if self.check_count else 0
+
+    @property
+    def p95_response_time_ms(self):
+        return self.histogram_percentile(self.response_time_histogram, 95)
+
+    @classmethod
+    def bucket_index(cls, response_time_ms):
+        for index, upper in enumerate(cls.RESPONSE_TIME_BUCKETS_MS):
+            if response_time_ms <= upper:
+                return index
+        return len(cls.RESPONSE_TIME_BUCKETS_MS)
+
+    @classmethod
+    def merge_histograms(cls, *histograms):
+        merged = [0] * (len(cls.RESPONSE_TIME_BUCKETS_MS) + 1)
+        for histogram in histograms:
+            for index, count in enumerate(histogram or []):
+                merged[index] += count
+        return merged
+
+    @classmethod
+    def histogram_percentile(cls, histogram, percentile):
+        """히스토그램의 백분위 응답 시간 (해당 구간의 상한, 최대 구간 초과면 마지막 상한)"""
+        total = sum(histogram or [])
+        if not total:
+            return 0
+        target = total * percentile / 100
+        seen = 0
+        for index, count in enumerate(histogram):
+            seen += count
+            if seen >= target:
+                break
+        return cls.RESPONSE_TIME_BUCKETS_MS[min(index, len(cls.RESPONSE_TIME_BUCKETS_MS) - 1)]
+
+    class Meta:
+        db_table = 'easystyle_inventory_check_daily_summaries'
+        ordering = ['-date']
+        unique_together = ['product', 'date']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+        verbose_name = '일별 재고 확인 집계'
+        verbose_name_plural = '일별 재고 확인 집계들'
+
+
+class InventoryChangeEvent(models.Model):
+    """
+    가격/재고 상태 변경 이벤트 (추가 전용 피드)
+
+    재고 확인 결과를 저장하는 트랜잭션에서 함께 기록된다. 소비자(캐시 무효화, 위시리스트 가격 하락 알림,
+    검색 재색인)는 마지막으로 읽은 id를 커서로 since=<id> 이후만 읽는다. id 순서와 커밋 순서가 다를 수
+    있으므로 읽기는 read_change_events의 커밋 지연 구간을 지난 이벤트만 돌려준다.
+    """
+    EVENT_TYPE_CHOICES = [
+        ('price', '가격 변경'),
+        ('availability', '구매 가능 여부 변경'),
+        ('stock_status', '재고 상태 변경'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='inventory_change_events')
+    event_type = models.CharField(max_length=12, choices=EVENT_TYPE_CHOICES)
+    old_value = models.CharField(max_length=32, blank=True)
+    new_value = models.CharField(max_length=32, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.pk} {self.product_id} {self.event_type}: {self.old_value} -> {self.new_value}"
+
+    class Meta:
+        db_table = 'easystyle_inventory_change_events'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+
+
+class InventoryCheckStoreRollup(models.Model):
+    """
+    스토어별 하루 재고 확인 롤업 (상품별 일별 집계를 롤업 작업이 합산)
+
+    재고 통계 API는 원본 로그 대신 이 행을 읽는다.
+    """
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='inventory_check_rollups')
+    date = models.DateField()
+
+    product_count = models.PositiveIntegerField(default=0)
+    check_count = models.PositiveIntegerField(default=0)
+    success_count = models.PositiveIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0)
+
+    average_response_time_ms = models.FloatField(default=0.0)
+    p95_response_time_ms = models.PositiveIntegerField(default=0)
+    max_response_time_ms = models.PositiveIntegerField(default=0)
+    response_time_histogram = models.JSONField(default=list, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.store.name} - {self.date} - {self.check_count}건"
+
+    class Meta:
+        db_table = 'easystyle_inventory_check_store_rollups'
+        ordering = ['-date']
+        unique_together = ['store', 'date']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+        verbose_name = '스토어별 재고 확인 롤업'
+        verbose_name_plural = '스토어별 재고 확인 롤업들'
+
+
 class StoreApiConfig(models.Model):
     """
     쇼핑몰별 API 설정 및 크롤링 정보
@@ -505,6 +818,15 @@ class StoreApiConfig(models.Model):
     request_delay_seconds = models.PositiveIntegerField(default=1, help_text="요청 간격(초)")
     max_retries = models.PositiveIntegerField(default=3)
     timeout_seconds = models.PositiveIntegerField(default=30)
+    rate_limit_burst = models.PositiveIntegerField(default=1, help_text="요청 간격 제한 내 최대 연속 요청 수")
+    connection_pool_size = models.PositiveIntegerField(default=10, help_text="호스트별 최대 커넥션 수")
+    keep_alive_seconds = models.PositiveIntegerField(default=60, help_text="유휴 커넥션 유지 시간(초), 0이면 keep-alive 미사용")
+    max_page_kb = models.PositiveIntegerField(default=2048, help_text="스크래핑 페이지 최대 다운로드 크기(KB)")
+
+    # 일괄 조회 API 설정 (여러 상품을 한 번에 조회하는 제휴 스토어)
+    batch_check_url = models.CharField(max_length=500, blank=True, help_text="일괄 재고 조회 URL ({product_ids}에 external_id 목록)")
+    batch_max_size = models.PositiveIntegerField(default=50, help_text="요청당 최대 상품 수")
+    batch_response_mapping = models.JSONField(default=dict, blank=True, help_text="일괄 응답 필드 매핑 (items_path, id_field, stock_field, price_field, sizes_field, id_separator)")
 
     # 결과 파싱 설정
     success_indicators = models.JSONField(default=list, blank=True, help_text="성공 판단 키워드")
@@ -522,6 +844,11 @@ class StoreApiConfig(models.Model):
     def __str__(self):
         return f"{self.store.name} API Config - {self.api_type}"
 
+    @property
+    def supports_batch_check(self):
+        """일괄 조회 API 사용 가능 여부"""
+        return self.api_type == 'rest_api' and bool(self.batch_check_url) and self.batch_max_size > 1
+
     @property
     def is_healthy(self):
         """API 상태가 건강한지 확인"""
@@ -604,8 +931,8 @@ class PurchaseabilityScore(models.Model):
             self.reliability_score >= 60
         )
 
-    def update_scores(self):
-        """점수 재계산"""
+    def update_scores(self, commit=True):
+        """점수 재계산 (commit=False면 저장하지 않음)"""
         # 실제 ML 모델이나 복잡한 로직으로 대체 예정
         # 현재는 기본적인 계산
 
@@ -642,7 +969,8 @@ class PurchaseabilityScore(models.Model):
         # 추천 우선순위 계산
         self.recommendation_priority = min(max(self.overall_score, 1), 100)
 
-        self.save()
+        if commit:
+            self.save()
 
     class Meta:
         db_table = 'easystyle_purchaseability_scores'
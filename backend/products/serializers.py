@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from .analytics_service import get_unique_viewer_estimates
+from .cart_service import add_item_to_cart, CartOperationError
 from .models import (
     ProductCategory, Brand, Store, Product,
     UserWishlist, StyleRecommendation, ProductAnalytics,
@@ -87,6 +89,9 @@ class ProductListSerializer(serializers.ModelSerializer):
     def get_is_wishlisted(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            # 장바구니 등에서 미리 로드한 위시리스트 정보가 있으면 재사용
+            if hasattr(obj, 'user_wishlist_entries'):
+                return bool(obj.user_wishlist_entries)
             return obj.wishlisted_by.filter(user=request.user).exists()
         return False
 
@@ -135,6 +140,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
                 'recommendation_count': analytics.recommendation_count,
                 'times_used_in_styling': analytics.times_used_in_styling,
                 'average_style_rating': analytics.average_style_rating,
+                **get_unique_viewer_estimates(analytics),
             }
         except ProductAnalytics.DoesNotExist:
             return None
@@ -249,30 +255,23 @@ class CartItemSerializer(serializers.ModelSerializer):
         product_uuid = validated_data.pop('product_uuid')
         try:
             product = Product.objects.get(uuid=product_uuid, is_available=True)
-            validated_data['product'] = product
 
             # 사용자의 장바구니 가져오기 또는 생성
             cart, created = Cart.objects.get_or_create(user=self.context['request'].user)
-            validated_data['cart'] = cart
-
-            # 같은 상품의 같은 사이즈가 이미 있는지 확인
-            existing_item = CartItem.objects.filter(
-                cart=cart,
-                product=product,
-                size=validated_data.get('size', '')
-            ).first()
-
-            if existing_item:
-                # 기존 아이템의 수량 증가
-                existing_item.quantity += validated_data.get('quantity', 1)
-                existing_item.save()
-                return existing_item
-            else:
-                # 새 아이템 생성
-                return super().create(validated_data)
+
+            # 같은 상품의 같은 사이즈가 이미 있으면 수량을 원자적으로 증가, 없으면 생성
+            return add_item_to_cart(
+                cart,
+                product,
+                size=validated_data.get('size', ''),
+                quantity=validated_data.get('quantity', 1),
+                style_set_id=validated_data.get('style_set_id', ''),
+            )
 
         except Product.DoesNotExist:
             raise serializers.ValidationError('Product not found or not available')
+        except CartOperationError as e:
+            raise serializers.ValidationError(e.message)
 
     def update(self, instance, validated_data):
         # product_uuid가 있으면 제품 변경 (실제로는 거의 사용하지 않을 것)
@@ -319,4 +318,64 @@ class UpdateCartItemSerializer(serializers.Serializer):
     """
     장바구니 아이템 수량 변경용 시리얼라이저
     """
-    quantity = serializers.IntegerField(min_value=1, max_value=10)
\ No newline at end of file
+    quantity = serializers.IntegerField(min_value=1, max_value=10)
+
+
+class CartOperationSerializer(serializers.Serializer):
+    """
+    장바구니 일괄 변경의 개별 작업 시리얼라이저
+    """
+    op = serializers.ChoiceField(choices=['add', 'update', 'remove'])
+    product_uuid = serializers.UUIDField(required=False)
+    size = serializers.CharField(max_length=10, required=False, allow_blank=True, default='')
+    quantity = serializers.IntegerField(min_value=1, max_value=10, required=False)
+    style_set_id = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    item_id = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if attrs['op'] == 'add':
+            if 'product_uuid' not in attrs:
+                raise serializers.ValidationError({'product_uuid': 'add 작업에는 product_uuid가 필요합니다.'})
+            attrs.setdefault('quantity', 1)
+        else:
+            if 'item_id' not in attrs:
+                raise serializers.ValidationError({'item_id': f"{attrs['op']} 작업에는 item_id가 필요합니다."})
+            if attrs['op'] == 'update' and 'quantity' not in attrs:
+                raise serializers.ValidationError({'quantity': 'update 작업에는 quantity가 필요합니다.'})
+        return attrs
+
+
+class CartBatchSerializer(serializers.Serializer):
+    """
+    장바구니 일괄 변경 요청 시리얼라이저
+    """
+    operations = serializers.ListField(
+        child=CartOperationSerializer(),
+        allow_empty=False,
+        max_length=50
+    )
+
+
+class StyleSetItemSerializer(serializers.Serializer):
+    """
+    스타일 세트 상품 항목 시리얼라이저
+    """
+    product_uuid = serializers.UUIDField()
+    size = serializers.CharField(max_length=10, required=False, allow_blank=True, default='')
+
+
+class AddStyleSetSerializer(serializers.Serializer):
+    """
+    스타일 세트 장바구니 추가 요청 시리얼라이저 (추천 ID 또는 상품 목록)
+    """
+    recommendation_id = serializers.IntegerField(required=False)
+    items = StyleSetItemSerializer(many=True, required=False)
+    sizes = serializers.DictField(child=serializers.CharField(max_length=10, allow_blank=True), required=False)
+    style_set_id = serializers.CharField(max_length=100, required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if not attrs.get('recommendation_id') and not attrs.get('items'):
+            raise serializers.ValidationError('recommendation_id 또는 items가 필요합니다.')
+        if attrs.get('items') and len(attrs['items']) > 20:
+            raise serializers.ValidationError('한번에 최대 20개의 상품만 추가할 수 있습니다.')
+        return attrs
@@ -0,0 +1,425 @@
+"""
+스토어 HTTP 요청 공용 클라이언트 (스토어별 회로 차단기 + 호스트별 토큰 버킷 요청 제한 + 커넥션 풀)
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+)
+
+
+class RateLimitTimeout(Exception):
+    """
+    최대 대기 시간 안에 요청 토큰을 얻지 못했을 때 발생
+    """
+
+
+def _release_lock(cache_backend, lock_key: str, token: str):
+    """
+    자기가 잡은 락일 때만 삭제 (만료된 뒤 다른 프로세스가 새로 잡은 락을 지우지 않도록)
+    캐시 API에 비교 후 삭제가 없어 조회와 삭제 사이의 짧은 구간은 남지만 lock_timeout보다 훨씬 짧다.
+    """
+    if cache_backend.get(lock_key) == token:
+        cache_backend.delete(lock_key)
+
+
+class TokenBucketLimiter:
+    """
+    캐시에 상태를 두는 호스트별 토큰 버킷
+
+    버킷 상태(남은 토큰, 갱신 시각)는 캐시에 저장되므로 같은 캐시(Redis/Memcached 등)를
+    쓰는 프로세스들이 호스트별 요청률을 함께 나눠 쓴다. 상태 갱신은 cache.add 기반의
+    짧은 락(요청마다 다른 토큰)으로 직렬화한다. STORE_RATE_LIMIT_ENABLED가 꺼져 있으면 제한하지 않는다.
+    """
+
+    key_prefix = 'ratelimit:host'
+    lock_timeout = 2
+    lock_retry_interval = 0.005
+
+    def __init__(self, cache_backend=None):
+        self.cache = cache_backend or cache
+
+    def acquire(self, host: str, rate: float, capacity: int = 1,
+                max_wait: Optional[float] = None) -> float:
+        """
+        토큰 하나를 얻을 때까지 대기하고 대기한 시간(초)을 반환
+        rate는 초당 토큰 보충 수, rate가 0 이하면 제한하지 않는다.
+        """
+        if rate <= 0 or not settings.EASYSTYLE_SETTINGS.get('STORE_RATE_LIMIT_ENABLED', True):
+            return 0.0
+
+        started = time.monotonic()
+        while True:
+            delay = self._try_acquire(host, rate, max(capacity, 1))
+            if delay <= 0:
+                return time.monotonic() - started
+
+            if max_wait is not None and time.monotonic() - started + delay > max_wait:
+                raise RateLimitTimeout(f'{host} 요청 토큰 대기 시간 초과 ({max_wait}초)')
+            time.sleep(delay)
+
+    def _try_acquire(self, host: str, rate: float, capacity: int) -> float:
+        """
+        토큰을 하나 소비하면 0, 부족하면 다음 토큰까지 남은 시간(초) 반환
+        """
+        state_key = f'{self.key_prefix}:{host}'
+        lock_key = f'{state_key}:lock'
+
+        token = uuid.uuid4().hex
+        if not self.cache.add(lock_key, token, timeout=self.lock_timeout):
+            return self.lock_retry_interval
+
+        try:
+            now = time.time()
+            tokens, updated_at = self.cache.get(state_key) or (capacity, now)
+            tokens = min(capacity, tokens + max(now - updated_at, 0) * rate)
+            ttl = max(60, int(capacity / rate) + 1)
+
+            if tokens >= 1:
+                self.cache.set(state_key, (tokens - 1, now), timeout=ttl)
+                return 0.0
+
+            self.cache.set(state_key, (tokens, now), timeout=ttl)
+            return (1 - tokens) / rate
+        finally:
+            _release_lock(self.cache, lock_key, token)
+
+
+class CircuitOpenError(Exception):
+    """
+    스토어 회로가 열려 있어 요청을 보내지 않고 즉시 실패할 때 발생
+    """
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class StoreCircuitBreaker:
+    """
+    캐시에 상태를 두는 스토어별 회로 차단기 (closed -> open -> half_open -> closed)
+
+    연속 실패가 failure_threshold에 이르면 open이 되어 open_seconds 동안 요청을 보내지 않고
+    즉시 CircuitOpenError를 낸다. 그 뒤 half_open에서는 시험 요청 하나만 보내 성공하면 closed로
+    돌아가고, 실패하면 다시 open이 된다. 상태는 캐시에 저장되므로 같은 캐시를 쓰는 프로세스들이
+    스토어 상태를 함께 본다.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    key_prefix = 'circuit:store'
+    state_ttl = 24 * 60 * 60
+    lock_timeout = 2
+    lock_retry_interval = 0.005
+
+    def __init__(self, cache_backend=None, failure_threshold: Optional[int] = None,
+                 open_seconds: Optional[float] = None):
+        options = getattr(settings, 'EASYSTYLE_SETTINGS', {})
+        self.cache = cache_backend or cache
+        self.failure_threshold = failure_threshold or options.get('INVENTORY_CIRCUIT_FAILURE_THRESHOLD', 5)
+        self.open_seconds = open_seconds or options.get('INVENTORY_CIRCUIT_OPEN_SECONDS', 60)
+
+    def _state_key(self, store_id: int) -> str:
+        return f'{self.key_prefix}:{store_id}'
+
+    def _read(self, store_id: int) -> Dict:
+        return self.cache.get(self._state_key(store_id)) or {'state': self.CLOSED, 'failures': 0, 'opened_at': 0.0}
+
+    def get_state(self, store_id: int) -> Dict:
+        """
+        현재 회로 상태 (open 유지 시간이 지났으면 half_open으로 표시)
+        """
+        state = self._read(store_id)
+        if state['state'] == self.OPEN:
+            retry_after = state['opened_at'] + self.open_seconds - time.time()
+            if retry_after <= 0:
+                return {**state, 'state': self.HALF_OPEN, 'retry_after': 0.0}
+            return {**state, 'retry_after': round(retry_after, 1)}
+        return {**state, 'retry_after': 0.0}
+
+    def before_request(self, store_id: int, trial_timeout: float = 30) -> bool:
+        """
+        요청을 보내도 되는지 확인, half_open의 시험 요청이면 True 반환
+        회로가 열려 있거나 다른 시험 요청이 진행 중이면 CircuitOpenError
+        """
+        state = self.get_state(store_id)
+        if state['state'] == self.CLOSED:
+            return False
+        if state['state'] == self.OPEN:
+            raise CircuitOpenError(
+                f'스토어 {store_id} 회로 열림 ({state["retry_after"]}초 후 재시도)', state['retry_after']
+            )
+
+        # half_open: 동시에 하나의 시험 요청만 허용 (응답 없이 끝나도 timeout 후 다시 시험 가능)
+        if not self.cache.add(f'{self._state_key(store_id)}:trial', 1, timeout=int(trial_timeout) + 1):
+            raise CircuitOpenError(f'스토어 {store_id} 회로 복구 시험 중')
+        return True
+
+    def release_trial(self, store_id: int):
+        """요청을 보내지 못한 시험 요청 권한 반납"""
+        self.cache.delete(f'{self._state_key(store_id)}:trial')
+
+    def record_success(self, store_id: int, trial: bool = False):
+        state = self._read(store_id)
+        if state['state'] == self.CLOSED and not state['failures']:
+            return
+
+        with self._locked(store_id):
+            state = self._read(store_id)
+            # open 중에 늦게 도착한 일반 요청의 성공은 시험 요청 결과를 기다림
+            if state['state'] == self.OPEN and not trial:
+                return
+            if state['state'] == self.OPEN:
+                logger.info(f'스토어 {store_id} 회로 닫힘 (시험 요청 성공)')
+            self.cache.set(self._state_key(store_id), {'state': self.CLOSED, 'failures': 0, 'opened_at': 0.0},
+                           timeout=self.state_ttl)
+        if trial:
+            self.release_trial(store_id)
+
+    def record_failure(self, store_id: int, trial: bool = False):
+        with self._locked(store_id):
+            state = self._read(store_id)
+            failures = state['failures'] + 1
+            if trial or (state['state'] == self.CLOSED and failures >= self.failure_threshold):
+                logger.warning(f'스토어 {store_id} 회로 열림 (연속 실패 {failures}회, {self.open_seconds}초 차단)')
+                state = {'state': self.OPEN, 'failures': failures, 'opened_at': time.time()}
+            else:
+                state = {**state, 'failures': failures}
+            self.cache.set(self._state_key(store_id), state, timeout=self.state_ttl)
+        if trial:
+            self.release_trial(store_id)
+
+    def reset(self, store_id: int):
+        self.cache.delete_many([self._state_key(store_id), f'{self._state_key(store_id)}:trial'])
+
+    @contextmanager
+    def _locked(self, store_id: int):
+        """상태 갱신을 cache.add 기반의 짧은 락으로 직렬화 (락을 못 얻어도 lock_timeout 후 진행)"""
+        lock_key = f'{self._state_key(store_id)}:lock'
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        acquired = self.cache.add(lock_key, token, timeout=self.lock_timeout)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(self.lock_retry_interval)
+            acquired = self.cache.add(lock_key, token, timeout=self.lock_timeout)
+        try:
+            yield
+        finally:
+            if acquired:
+                _release_lock(self.cache, lock_key, token)
+
+
+class BoundedDownload:
+    """
+    스트리밍 응답 본문을 최대 크기까지만 청크 단위로 읽는 이터레이터
+
+    읽은 만큼의 SHA-256과 크기를 함께 계산한다. 소비하는 쪽이 중간에 멈추면 나머지는 받지 않으며,
+    max_bytes를 넘으면 거기서 자르고 truncated를 표시한다. 한 번에 메모리에 있는 본문은
+    청크 하나(chunk_size)뿐이다.
+    """
+
+    def __init__(self, response: requests.Response, max_bytes: int, chunk_size: int = 8 * 1024):
+        self.response = response
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self.truncated = False
+        self._hash = hashlib.sha256()
+
+    def __iter__(self):
+        for chunk in self.response.iter_content(self.chunk_size):
+            remaining = self.max_bytes - self.bytes_read
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+                self.truncated = True
+            if chunk:
+                self.bytes_read += len(chunk)
+                self._hash.update(chunk)
+                yield chunk
+            if self.truncated:
+                return
+
+    def hexdigest(self) -> str:
+        """지금까지 읽은 본문의 SHA-256"""
+        return self._hash.hexdigest()
+
+
+class _HostSession:
+    """
+    호스트 하나의 Session과 풀 설정
+    """
+
+    def __init__(self, pool_size: int, keep_alive_seconds: int):
+        self.pool_size = pool_size
+        self.keep_alive_seconds = keep_alive_seconds
+        self.last_used = time.monotonic()
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = DEFAULT_USER_AGENT
+        if not keep_alive_seconds:
+            self.session.headers['Connection'] = 'close'
+
+        # 풀이 가득 차면 새 연결을 만들지 않고 반납될 때까지 대기
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def matches(self, pool_size: int, keep_alive_seconds: int) -> bool:
+        return self.pool_size == pool_size and self.keep_alive_seconds == keep_alive_seconds
+
+    def is_idle_expired(self) -> bool:
+        return bool(self.keep_alive_seconds) and time.monotonic() - self.last_used > self.keep_alive_seconds
+
+
+class StoreHttpClient:
+    """
+    스토어별 회로 차단기 + 호스트별 커넥션 풀 Session + 토큰 버킷 요청 제한을 묶은 HTTP 클라이언트
+
+    재고 확인 워커 스레드들이 하나의 인스턴스를 공유한다. 풀 크기, keep-alive,
+    요청률은 StoreApiConfig(connection_pool_size, keep_alive_seconds,
+    request_delay_seconds, rate_limit_burst)에서 가져온다.
+    연결 오류/타임아웃/5xx/429 응답은 스토어 회로의 실패로 집계되고, 회로가 열린 스토어로는
+    요청률 대기 없이 즉시 CircuitOpenError를 낸다.
+    대기 시간/풀 포화 지표는 프로세스 단위로 집계된다.
+    """
+
+    def __init__(self, limiter: Optional[TokenBucketLimiter] = None,
+                 breaker: Optional[StoreCircuitBreaker] = None):
+        self.limiter = limiter or TokenBucketLimiter()
+        self.breaker = breaker or StoreCircuitBreaker()
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, _HostSession] = {}
+        self._metrics = defaultdict(lambda: {
+            'requests': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'in_flight': 0,
+            'peak_in_flight': 0,
+            'saturated_requests': 0,
+            'short_circuited': 0,
+            'pool_size': 0,
+        })
+
+    def get(self, url: str, store_config, **kwargs) -> requests.Response:
+        """
+        요청률 제한을 지켜 GET 요청 (스토어 설정의 요청 간격/버스트/풀 설정 적용)
+        스토어 회로가 열려 있으면 요청하지 않고 CircuitOpenError
+        """
+        host = urlparse(url).netloc.lower()
+        store_id = store_config.store_id
+        try:
+            trial = self.breaker.before_request(store_id, kwargs.get('timeout') or 30)
+        except CircuitOpenError:
+            with self._lock:
+                self._metrics[host]['short_circuited'] += 1
+            raise
+
+        delay = store_config.request_delay_seconds
+        try:
+            waited = self.limiter.acquire(
+                host,
+                rate=1.0 / delay if delay else 0,
+                capacity=store_config.rate_limit_burst,
+                max_wait=kwargs.get('timeout'),
+            )
+        except RateLimitTimeout:
+            if trial:
+                self.breaker.release_trial(store_id)
+            raise
+
+        host_session = self._get_session(host, store_config)
+        self._begin_request(host, host_session.pool_size, waited)
+        try:
+            response = host_session.session.get(url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.breaker.record_failure(store_id, trial)
+            raise
+        finally:
+            self._end_request(host, host_session)
+
+        if response.status_code >= 500 or response.status_code == 429:
+            self.breaker.record_failure(store_id, trial)
+        else:
+            self.breaker.record_success(store_id, trial)
+        return response
+
+    def _get_session(self, host: str, store_config) -> _HostSession:
+        pool_size = max(store_config.connection_pool_size, 1)
+        keep_alive_seconds = store_config.keep_alive_seconds
+
+        with self._lock:
+            host_session = self._sessions.get(host)
+            in_flight = self._metrics[host]['in_flight']
+
+            if host_session and in_flight == 0 and (
+                not host_session.matches(pool_size, keep_alive_seconds) or host_session.is_idle_expired()
+            ):
+                # 설정이 바뀌었거나 keep-alive 시간을 넘긴 유휴 연결은 정리 후 재생성
+                host_session.session.close()
+                host_session = None
+
+            if host_session is None:
+                host_session = _HostSession(pool_size, keep_alive_seconds)
+                self._sessions[host] = host_session
+
+            return host_session
+
+    def _begin_request(self, host: str, pool_size: int, waited: float):
+        with self._lock:
+            metrics = self._metrics[host]
+            waited_ms = waited * 1000
+            metrics['requests'] += 1
+            metrics['total_wait_ms'] += waited_ms
+            metrics['max_wait_ms'] = max(metrics['max_wait_ms'], waited_ms)
+            metrics['pool_size'] = pool_size
+            if metrics['in_flight'] >= pool_size:
+                # 풀의 연결이 모두 사용 중이라 반납을 기다려야 하는 요청
+                metrics['saturated_requests'] += 1
+            metrics['in_flight'] += 1
+            metrics['peak_in_flight'] = max(metrics['peak_in_flight'], metrics['in_flight'])
+
+    def _end_request(self, host: str, host_session: _HostSession):
+        with self._lock:
+            self._metrics[host]['in_flight'] -= 1
+            host_session.last_used = time.monotonic()
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """
+        호스트별 요청 대기 시간 및 커넥션 풀 포화 지표
+        """
+        with self._lock:
+            snapshot = {host: dict(metrics) for host, metrics in self._metrics.items()}
+
+        for metrics in snapshot.values():
+            requests_count = max(metrics['requests'], 1)
+            metrics['avg_wait_ms'] = round(metrics['total_wait_ms'] / requests_count, 1)
+            metrics['total_wait_ms'] = round(metrics['total_wait_ms'], 1)
+            metrics['max_wait_ms'] = round(metrics['max_wait_ms'], 1)
+            metrics['saturation_rate'] = round(metrics['saturated_requests'] / requests_count * 100, 1)
+        return snapshot
+
+    def reset_metrics(self):
+        with self._lock:
+            for host in list(self._metrics):
+                if self._metrics[host]['in_flight'] == 0:
+                    del self._metrics[host]
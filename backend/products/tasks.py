@@ -0,0 +1,124 @@
+"""
+재고 확인 Celery 작업
+
+스토어별 확인 작업은 고정된 개수의 스토어 큐(inventory.store.<store_id % INVENTORY_STORE_QUEUE_COUNT>) 중
+하나로 보내므로 느리거나 장애가 난 스토어는 같은 큐를 쓰는 스토어만 지연시킨다. 큐 목록이 스토어 구성과
+무관하게 고정되어 있어 워커를 띄운 뒤 추가된 스토어도 바로 처리되고, 워커를 늘리면 처리량이 수평으로 늘어난다.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, List
+
+from celery import shared_task
+from django.conf import settings
+
+from .inventory_jobs import run_styling_job
+from .inventory_rollup_service import InventoryCheckRollup
+from .inventory_service import inventory_checker, InventoryScheduler
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+
+STORE_QUEUE_PREFIX = 'inventory.store'
+
+# 스토어 작업 하나가 확인하는 최대 상품 수
+STORE_TASK_CHUNK_SIZE = 50
+
+
+def store_queue_count() -> int:
+    return max(settings.EASYSTYLE_SETTINGS.get('INVENTORY_STORE_QUEUE_COUNT', 8), 1)
+
+
+def store_queue_name(store_id: int) -> str:
+    return f'{STORE_QUEUE_PREFIX}.{store_id % store_queue_count()}'
+
+
+def store_queue_names() -> List[str]:
+    """워커가 구독할 스토어 큐 전체 (스토어 수와 무관하게 고정)"""
+    return [f'{STORE_QUEUE_PREFIX}.{index}' for index in range(store_queue_count())]
+
+
+def enqueue_store_checks(products: List[Product], check_type: str = 'scheduled') -> Dict[int, int]:
+    """
+    상품을 스토어별로 묶어 스토어 큐로 작업 전송, 스토어별 전송 상품 수 반환
+    """
+    groups = defaultdict(list)
+    for product in products:
+        groups[product.store_id].append(product.id)
+
+    for store_id, product_ids in groups.items():
+        for start in range(0, len(product_ids), STORE_TASK_CHUNK_SIZE):
+            check_store_batch.apply_async(
+                args=[store_id, product_ids[start:start + STORE_TASK_CHUNK_SIZE], check_type],
+                queue=store_queue_name(store_id),
+            )
+
+    return {store_id: len(product_ids) for store_id, product_ids in groups.items()}
+
+
+@shared_task(ignore_result=True)
+def check_product(product_id: int, check_type: str = 'manual') -> Dict:
+    """
+    상품 하나의 재고 확인
+    """
+    product = Product.objects.select_related('store__api_config').filter(id=product_id).first()
+    if product is None:
+        return {'product_id': product_id, 'success': False, 'error_message': 'Product not found'}
+
+    result = inventory_checker.check_product_availability(product, check_type)
+    return {key: value for key, value in result.items() if key != 'last_checked'}
+
+
+@shared_task(ignore_result=True)
+def check_store_batch(store_id: int, product_ids: List[int], check_type: str = 'scheduled') -> Dict:
+    """
+    한 스토어의 상품 묶음 재고 확인 (스토어 큐에서 실행)
+    """
+    products = list(
+        Product.objects.filter(id__in=product_ids, store_id=store_id).select_related('store__api_config')
+    )
+    results = inventory_checker.check_store_products(products, check_type)
+
+    summary = {
+        'store_id': store_id,
+        'checked_count': len(results),
+        'success_count': len([r for r in results.values() if r.get('success')]),
+        'not_modified_count': len([r for r in results.values() if r.get('not_modified')]),
+        'circuit_open_count': len([r for r in results.values() if r.get('circuit_open')]),
+    }
+    logger.info(f'스토어 {store_id} 재고 확인 완료: {summary}')
+    return summary
+
+
+@shared_task(ignore_result=True)
+def run_inventory_sweep() -> Dict:
+    """
+    정기 확인: 확인 시각이 지난 상품을 스토어별 예산만큼 꺼내 스토어 큐로 분배 (beat로 주기 실행)
+    """
+    products = InventoryScheduler().collect_due_products()
+    dispatched = enqueue_store_checks(products, 'scheduled')
+
+    summary = {
+        'due_count': len(products),
+        'store_count': len(dispatched),
+    }
+    logger.info(f'정기 재고 확인 분배 완료: {summary}')
+    return summary
+
+
+@shared_task(ignore_result=True)
+def run_inventory_rollup() -> Dict:
+    """
+    스토어별 일별 롤업 갱신 + 보존 기간이 지난 확인 로그 보관/삭제 (beat로 주기 실행)
+    """
+    return InventoryCheckRollup().run()
+
+
+@shared_task(ignore_result=True)
+def run_styling_inventory_job(job_id: str):
+    """
+    스타일링 상품 재고 확인 작업 실행 (진행 상황은 캐시의 작업 상태로 전달)
+    """
+    run_styling_job(job_id)
@@ -1,3 +1,1418 @@
-from django.test import TestCase
+import json
+import socket
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from io import StringIO
+from string import Template
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User, UserProfile
+from easystyle_backend.celery import app as celery_app
+from .analytics_service import (
+    ProductAffinityAggregator, ViewSketchRollup, get_unique_viewer_estimates, record_product_view
+)
+from .cart_service import revalidate_cart
+from .fake_store import DEFAULT_HTML_SELECTORS, DEFAULT_HTML_TEMPLATE, FakeStoreConfig, FakeStoreServer
+from .guest_cart import GUEST_CART_COOKIE
+from .html_extraction import CompiledExtractor
+from .hyperloglog import HyperLogLog
+from .inventory_jobs import StylingJobRunner, create_styling_job, get_job
+from .inventory_rollup_service import ARCHIVE_TABLE_PREFIX, InventoryCheckRollup, archive_table_name
+from .inventory_service import InventoryCheckBatch, InventoryChecker, InventoryScheduler
+from .store_http import RateLimitTimeout, StoreCircuitBreaker, TokenBucketLimiter, _release_lock
+from .tasks import store_queue_name, store_queue_names
+from .models import ProductCategory, Brand, Store, Product, Cart, CartItem, ProductAnalytics, ProductViewSketch
+from .models import StyleRecommendation, UserWishlist
+from .models import InventoryChangeEvent, InventoryCheckDailySummary, InventoryCheckLog, InventoryCheckStoreRollup
+from .models import InventoryStatus, StoreApiConfig
+
+
+class CartConcurrencyTest(TransactionTestCase):
+    """
+    동시 장바구니 추가 시 수량 유실/중복 생성/500 오류가 없는지 확인
+    """
+
+    THREADS = 8
+    # 사이즈마다 스레드 수만큼 동시에 담아 최대 수량(10) 안에서 유실 여부를 확인
+    SIZES = ['S', 'M', 'L', 'XL']
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='shopper', password='password')
+        self.product = Product.objects.create(
+            name='Linen Shirt',
+            brand=Brand.objects.create(name='Brand'),
+            category=ProductCategory.objects.create(name='상의', name_en='Tops'),
+            store=Store.objects.create(name='Store', website='https://store.example.com'),
+            original_price=39000,
+            main_image='https://store.example.com/shirt.jpg',
+            product_url='https://store.example.com/shirt',
+        )
+
+    def test_concurrent_add_item_has_no_lost_updates(self):
+        barrier = threading.Barrier(self.THREADS)
+        status_codes = []
+        lock = threading.Lock()
+
+        def worker():
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                barrier.wait()
+                for size in self.SIZES:
+                    response = client.post('/api/products/cart/add_item/', {
+                        'product_uuid': str(self.product.uuid),
+                        'size': size,
+                        'quantity': 1,
+                    }, format='json')
+                    with lock:
+                        status_codes.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(status_codes, [201] * (self.THREADS * len(self.SIZES)))
+        self.assertEqual(Cart.objects.filter(user=self.user).count(), 1)
+
+        items = CartItem.objects.filter(cart__user=self.user)
+        self.assertEqual(dict(items.values_list('size', 'quantity')), {size: self.THREADS for size in self.SIZES})
+
+
+class CartOperationsTest(TransactionTestCase):
+    """
+    장바구니 합계, 일괄 변경, 비로그인 장바구니 병합 등 장바구니 서비스 동작 확인
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='shopper', password='password')
+        brand = Brand.objects.create(name='Brand')
+        category = ProductCategory.objects.create(name='상의', name_en='Tops')
+        store = Store.objects.create(name='Store', website='https://store.example.com')
+        self.products = [
+            Product.objects.create(
+                name=name,
+                brand=brand,
+                category=category,
+                store=store,
+                original_price=price,
+                main_image=f'https://store.example.com/{index}.jpg',
+                product_url=f'https://store.example.com/{index}',
+            )
+            for index, (name, price) in enumerate([('Linen Shirt', 39000), ('Wide Slacks', 49000)])
+        ]
+        self.client = APIClient()
+
+    def _quantities(self):
+        return dict(CartItem.objects.filter(cart__user=self.user).values_list('product_id', 'quantity'))
+
+    def test_add_operations_are_clamped_to_max_quantity(self):
+        self.client.force_authenticate(self.user)
+        uuid = str(self.products[0].uuid)
+        response = self.client.post('/api/products/cart/batch/', {'operations': [
+            {'op': 'add', 'product_uuid': uuid, 'quantity': 8},
+            {'op': 'add', 'product_uuid': uuid, 'quantity': 5},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._quantities(), {self.products[0].id: 10})
+
+    def test_single_adds_are_clamped_to_max_quantity(self):
+        self.client.force_authenticate(self.user)
+        for quantity in [8, 5]:
+            response = self.client.post('/api/products/cart/add_item/', {
+                'product_uuid': str(self.products[0].uuid),
+                'quantity': quantity,
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(self._quantities(), {self.products[0].id: 10})
+
+    def test_batch_add_retries_after_concurrent_insert(self):
+        self.client.force_authenticate(self.user)
+        bulk_create = CartItem.objects.bulk_create
+        calls = []
+
+        def racing_bulk_create(objs, *args, **kwargs):
+            # 첫 시도에서는 단건 추가가 같은 아이템을 먼저 INSERT한 것처럼 실패
+            calls.append(len(objs))
+            if len(calls) == 1:
+                raise IntegrityError('UNIQUE constraint failed: products_cartitem.cart_id')
+            return bulk_create(objs, *args, **kwargs)
+
+        with patch.object(CartItem.objects, 'bulk_create', side_effect=racing_bulk_create):
+            response = self.client.post('/api/products/cart/batch/', {'operations': [
+                {'op': 'add', 'product_uuid': str(product.uuid), 'quantity': 2} for product in self.products
+            ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(calls, [2, 2])
+        self.assertEqual(self._quantities(), {product.id: 2 for product in self.products})
+
+    def test_cart_totals_use_sale_price_in_fixed_queries(self):
+        self.client.force_authenticate(self.user)
+        Product.objects.filter(pk=self.products[1].pk).update(sale_price=29000)
+        cart = Cart.objects.create(user=self.user)
+        cart.items.create(product=self.products[0], quantity=2)
+        UserWishlist.objects.create(user=self.user, product=self.products[0])
+
+        # 아이템/위시리스트 수와 관계없이 장바구니, 합계, 아이템, 위시리스트 쿼리만 실행
+        with self.assertNumQueries(4):
+            data = self.client.get('/api/products/cart/').json()
+        self.assertEqual((data['total_items'], float(data['total_price'])), (2, 78000))
+
+        cart.items.create(product=self.products[1], size='30', quantity=3)
+        with self.assertNumQueries(4):
+            data = self.client.get('/api/products/cart/').json()
+        self.assertEqual((data['total_items'], float(data['total_price'])), (5, 78000 + 87000))
+        self.assertEqual([(item['product']['name'], float(item['subtotal'])) for item in data['items']],
+                         [('Wide Slacks', 87000), ('Linen Shirt', 78000)])
+
+        # 집계 없이 조회한 모델에서도 같은 합계
+        cart = Cart.objects.get(pk=cart.pk)
+        self.assertEqual((cart.total_items, cart.total_price), (5, Decimal('165000')))
+
+    def test_add_style_set_adds_available_products_with_shared_set_id(self):
+        self.client.force_authenticate(self.user)
+        InventoryStatus.objects.create(product=self.products[1], stock_status='out_of_stock',
+                                       availability_status='available')
+        response = self.client.post('/api/products/cart/add_style_set/', {'items': [
+            {'product_uuid': str(self.products[0].uuid), 'size': 'M'},
+            {'product_uuid': str(self.products[1].uuid), 'size': '30'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        style_set = response.json()['style_set']
+        self.assertEqual(style_set['added_count'], 1)
+        self.assertEqual(style_set['unavailable'], [
+            {'product_uuid': str(self.products[1].uuid), 'size': '30', 'reason': 'out_of_stock'},
+        ])
+        item = CartItem.objects.get(cart__user=self.user)
+        self.assertEqual((item.product_id, item.size, item.style_set_id),
+                         (self.products[0].id, 'M', style_set['style_set_id']))
+
+        # 추천 ID로 추가하면 추천 사이즈와 rec-<id> 세트 ID 사용
+        InventoryStatus.objects.filter(product=self.products[1]).update(stock_status='in_stock')
+        Product.objects.filter(pk=self.products[1].pk).update(recommended_size='32')
+        recommendation = StyleRecommendation.objects.create(
+            user=self.user, style_prompt='summer casual', generated_image='style_recommendations/look.png',
+            ai_description='linen look', confidence_score=0.9,
+        )
+        recommendation.products.set(self.products)
+        response = self.client.post('/api/products/cart/add_style_set/', {'recommendation_id': recommendation.id},
+                                    format='json')
+        self.assertEqual(response.json()['style_set']['added_count'], 2)
+        self.assertEqual(
+            set(CartItem.objects.filter(style_set_id=f'rec-{recommendation.id}').values_list('product_id', 'size')),
+            {(self.products[0].id, ''), (self.products[1].id, '32')},
+        )
+
+    def test_guest_cart_is_kept_in_cookie_and_merged_on_login(self):
+        first, second = self.products
+        for product, size, quantity in [(first, 'M', 1), (first, 'M', 2), (second, '30', 1)]:
+            response = self.client.post('/api/products/guest-cart/add_item/', {
+                'product_uuid': str(product.uuid), 'size': size, 'quantity': quantity,
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+
+        data = self.client.get('/api/products/guest-cart/').json()
+        self.assertTrue(data['is_guest'])
+        self.assertEqual(data['total_items'], 4)
+        self.assertEqual(float(data['total_price']), 39000 * 3 + 49000)
+        # 로그인 전에는 DB에 장바구니를 만들지 않음
+        self.assertFalse(Cart.objects.exists())
+
+        Cart.objects.create(user=self.user).items.create(product=self.products[1], size='30', quantity=1)
+        response = self.client.post('/api/auth/login/', {'username': 'shopper', 'password': 'password'},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies[GUEST_CART_COOKIE].value, '')
+        self.assertEqual(self._quantities(), {self.products[0].id: 3, self.products[1].id: 2})
+
+    def test_guest_cart_merge_is_clamped_to_max_quantity(self):
+        Cart.objects.create(user=self.user).items.create(product=self.products[0], quantity=7)
+        self.client.post('/api/products/guest-cart/add_item/', {
+            'product_uuid': str(self.products[0].uuid), 'quantity': 6,
+        }, format='json')
+
+        response = self.client.post('/api/auth/login/', {'username': 'shopper', 'password': 'password'},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._quantities(), {self.products[0].id: 10})
+
+
+class ProductViewAnalyticsTest(TransactionTestCase):
+    """
+    상세 조회수는 DB에서 증가하고, 일간 고유 방문자 스케치가 롤업 명령으로 누적 스케치에 병합되는지 확인
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(
+            name='Denim Jacket',
+            brand=Brand.objects.create(name='Brand'),
+            category=ProductCategory.objects.create(name='아우터', name_en='Outer'),
+            store=Store.objects.create(name='Store', website='https://store.example.com'),
+            original_price=89000,
+            main_image='https://store.example.com/jacket.jpg',
+            product_url='https://store.example.com/jacket',
+        )
+
+    def test_detail_views_count_and_sketch(self):
+        client = APIClient()
+        for _ in range(3):
+            self.assertEqual(client.get(f'/api/products/{self.product.uuid}/').status_code, 200)
+
+        analytics = ProductAnalytics.objects.get(product=self.product)
+        self.assertEqual(analytics.view_count, 3)
+        # 같은 방문자의 반복 조회는 고유 방문자 1명
+        self.assertEqual(get_unique_viewer_estimates(analytics),
+                         {'unique_viewers': 1, 'unique_viewers_today': 1})
+
+    def test_hyperloglog_estimate_and_merge(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for index in range(5000):
+            first.add(f'u:{index}')
+            second.add(f'u:{index + 2500}')
+
+        self.assertFalse(first.add('u:0'))
+        self.assertAlmostEqual(first.estimate(), 5000, delta=5000 * 0.05)
+        self.assertAlmostEqual(first.merge(second).estimate(), 7500, delta=7500 * 0.05)
+        self.assertEqual(HyperLogLog(first.to_bytes()).estimate(), first.estimate())
+        with self.assertRaises(ValueError):
+            HyperLogLog(b'\x00' * 16)
+
+    def test_rollup_command_merges_past_sketches(self):
+        today = timezone.localdate()
+        for days_ago, viewers in [(40, range(0, 300)), (2, range(200, 600)), (0, range(1000, 1100))]:
+            for viewer in viewers:
+                record_product_view(self.product, f'u:{viewer}', day=today - timedelta(days=days_ago))
+
+        call_command('rollup_product_views', '--retention-days', '30', stdout=StringIO())
+
+        analytics = ProductAnalytics.objects.get(product=self.product)
+        self.assertAlmostEqual(analytics.unique_viewer_count, 600, delta=600 * 0.05)
+        # 오늘 스케치는 롤업하지 않고, 보존 기간이 지난 스케치는 병합 후 삭제
+        self.assertEqual(
+            list(ProductViewSketch.objects.order_by('day').values_list('day', 'rolled_up')),
+            [(today - timedelta(days=2), True), (today, False)],
+        )
+        estimates = get_unique_viewer_estimates(analytics)
+        self.assertAlmostEqual(estimates['unique_viewers'], 700, delta=700 * 0.05)
+        self.assertAlmostEqual(estimates['unique_viewers_today'], 100, delta=5)
+
+        # 다시 실행해도 이미 병합한 스케치는 다시 병합하지 않음
+        self.assertEqual(ViewSketchRollup().run()['sketches_merged'], 0)
+
+
+class ProductAffinityAnalyticsTest(TransactionTestCase):
+    """
+    위시리스트/장바구니/추천 상호작용이 상품별 연령대/스타일 비율로 집계되는지 확인
+    """
+
+    def setUp(self):
+        brand = Brand.objects.create(name='Brand')
+        category = ProductCategory.objects.create(name='상의', name_en='Tops')
+        store = Store.objects.create(name='Store', website='https://store.example.com')
+        self.products = [
+            Product.objects.create(
+                name=name,
+                brand=brand,
+                category=category,
+                store=store,
+                original_price=39000,
+                main_image=f'https://store.example.com/{index}.jpg',
+                product_url=f'https://store.example.com/{index}',
+            )
+            for index, name in enumerate(['Linen Shirt', 'Wide Slacks', 'Canvas Sneakers'])
+        ]
+
+    def _user(self, username, age=None, style_categories=None):
+        today = timezone.localdate()
+        user = User.objects.create_user(
+            username=username, password='password',
+            date_of_birth=date(today.year - age, 1, 1) if age is not None else None,
+        )
+        if style_categories is not None:
+            UserProfile.objects.create(user=user, style_categories=style_categories)
+        return user
+
+    def test_affinity_command_computes_age_and_style_shares(self):
+        shirt, slacks, _ = self.products
+        young = self._user('young', age=25, style_categories=['casual', 'minimal'])
+        older = self._user('older', age=45, style_categories=['street'])
+        anonymous = self._user('anonymous')
+
+        UserWishlist.objects.create(user=young, product=shirt)
+        Cart.objects.create(user=young).items.create(product=shirt, quantity=1)
+        UserWishlist.objects.create(user=older, product=shirt)
+        UserWishlist.objects.create(user=anonymous, product=shirt)
+        # 상호작용이 없어진 상품의 이전 집계는 비움
+        ProductAnalytics.objects.create(product=slacks, age_group_popularity={'30s': 1.0},
+                                        style_category_fit={'formal': 1.0})
+
+        call_command('compute_product_affinity', '--chunk-size', '2', stdout=StringIO())
+
+        analytics = ProductAnalytics.objects.get(product=shirt)
+        # 장바구니는 가중치 2, 위시리스트는 1 / 나이·프로필이 없는 사용자는 제외
+        self.assertEqual(analytics.age_group_popularity, {'20s': 0.75, '40s': 0.25})
+        self.assertEqual(analytics.style_category_fit, {'casual': 0.75, 'minimal': 0.75, 'street': 0.25})
+        slacks_analytics = ProductAnalytics.objects.get(product=slacks)
+        self.assertEqual((slacks_analytics.age_group_popularity, slacks_analytics.style_category_fit), ({}, {}))
+        self.assertEqual(ProductAnalytics.objects.count(), 2)
+
+        # 다시 실행해도 바뀐 행이 없으면 갱신하지 않음
+        self.assertEqual(ProductAffinityAggregator(chunk_size=2).run()['analytics_updated'], 0)
+
+    def _recommend(self, user, products):
+        recommendation = StyleRecommendation.objects.create(
+            user=user, style_prompt='summer casual', generated_image='style_recommendations/look.png',
+            ai_description='linen look', confidence_score=0.9,
+        )
+        recommendation.products.set(products)
+        return recommendation
+
+    def test_cooccurrence_mining_is_incremental_and_served_by_goes_well_with(self):
+        shirt, slacks, sneakers = self.products
+        user = self._user('shopper')
+        self._recommend(user, [shirt, slacks, sneakers])
+        later = self._recommend(user, [shirt, slacks])
+        cart = Cart.objects.create(user=user)
+        for product in [shirt, sneakers]:
+            cart.items.create(product=product, style_set_id='set-1')
+        cart.items.create(product=slacks)
+
+        call_command('mine_product_cooccurrence', '--top-k', '2', stdout=StringIO())
+
+        def partners(product):
+            return [(entry['product_uuid'], entry['count'])
+                    for entry in ProductAnalytics.objects.get(product=product).popular_combinations]
+
+        self.assertEqual(partners(shirt), [(str(slacks.uuid), 2), (str(sneakers.uuid), 2)])
+        self.assertEqual(partners(slacks), [(str(shirt.uuid), 2), (str(sneakers.uuid), 1)])
+
+        # 다음 실행에서는 새로 생긴 추천/세트 아이템만 누적
+        self._recommend(user, [shirt, sneakers])
+        cart.items.create(product=slacks, size='32', style_set_id='set-1')
+        call_command('mine_product_cooccurrence', '--top-k', '2', stdout=StringIO())
+        # 같은 횟수면 상품 ID 순
+        self.assertEqual(partners(shirt), [(str(slacks.uuid), 3), (str(sneakers.uuid), 3)])
+        self.assertEqual(partners(sneakers), [(str(shirt.uuid), 3), (str(slacks.uuid), 2)])
+
+        # 이미 집계한 추천에 나중에 추가된 상품도 기존 상품들과 짝지어 누적
+        later.products.add(sneakers)
+        call_command('mine_product_cooccurrence', '--top-k', '2', stdout=StringIO())
+        self.assertEqual(partners(sneakers), [(str(shirt.uuid), 4), (str(slacks.uuid), 3)])
+        self.assertEqual(partners(shirt), [(str(sneakers.uuid), 4), (str(slacks.uuid), 3)])
+
+        Product.objects.filter(pk=slacks.pk).update(is_available=False)
+        response = APIClient().get(f'/api/products/{shirt.uuid}/goes-well-with/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row['uuid'], row['cooccurrence_count']) for row in response.json()['results']],
+                         [(str(sneakers.uuid), 4)])
+
+
+class FakeBatchStoreHandler(BaseHTTPRequestHandler):
+    """
+    일괄 재고 조회 API를 흉내 내는 로컬 스토어 서버
+    """
+
+    requested_ids = []
+    unknown_skus = {'missing'}
+    fail_requests = 0
+
+    def do_GET(self):
+        skus = parse_qs(urlparse(self.path).query)['skus'][0].split('|')
+        self.requested_ids.append(skus)
+
+        if FakeBatchStoreHandler.fail_requests:
+            FakeBatchStoreHandler.fail_requests -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = json.dumps({'data': {'items': [
+            {'sku': sku, 'qty': index, 'sale_price': 10000 + index, 'options': {'M': index}}
+            for index, sku in enumerate(skus)
+            if sku not in self.unknown_skus
+        ]}}).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class InventoryBatchApiTest(TransactionTestCase):
+    """
+    일괄 조회 API 스토어는 external_id 묶음별로 한 번씩 요청하고 결과를 상품별로 나눠 저장하는지 확인
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeBatchStoreHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        FakeBatchStoreHandler.requested_ids = []
+        FakeBatchStoreHandler.fail_requests = 0
+
+        store = Store.objects.create(name='Partner', website='https://partner.example.com')
+        StoreApiConfig.objects.create(
+            store=store,
+            api_type='rest_api',
+            request_delay_seconds=0,
+            batch_check_url=f'http://127.0.0.1:{self.server.server_address[1]}/stock?skus={{product_ids}}',
+            batch_max_size=3,
+            batch_response_mapping={
+                'items_path': 'data.items',
+                'id_field': 'sku',
+                'stock_field': 'qty',
+                'price_field': 'sale_price',
+                'sizes_field': 'options',
+                'id_separator': '|',
+            },
+        )
+
+        brand = Brand.objects.create(name='Brand')
+        category = ProductCategory.objects.create(name='하의', name_en='Bottoms')
+        for external_id in ['sku-1', 'sku-2', 'sku-3', 'sku-4', 'sku-5', 'sku-6', 'missing']:
+            Product.objects.create(
+                name=f'Pants {external_id}',
+                brand=brand,
+                category=category,
+                store=store,
+                external_id=external_id,
+                original_price=20000,
+                main_image='https://partner.example.com/pants.jpg',
+                product_url=f'https://partner.example.com/{external_id}',
+            )
+        self.products = list(Product.objects.filter(store=store).select_related('store__api_config').order_by('id'))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_batch_requests_fan_out_to_products(self):
+        results = InventoryChecker().check_multiple_products(self.products, 'scheduled')
+
+        self.assertEqual(FakeBatchStoreHandler.requested_ids, [
+            ['sku-1', 'sku-2', 'sku-3'], ['sku-4', 'sku-5', 'sku-6'], ['missing'],
+        ])
+        self.assertEqual([r['success'] for r in results], [True] * 6 + [False])
+        self.assertEqual(results[1]['stock_quantity'], 1)
+        self.assertEqual(results[4]['current_price'], 10001)
+        self.assertFalse(results[0]['is_available'])
+
+        status = InventoryStatus.objects.get(product=self.products[2])
+        self.assertEqual(status.stock_quantity, 2)
+        self.assertEqual(status.size_stock, {'M': 2})
+        self.assertTrue(status.is_purchasable)
+        self.assertEqual(InventoryStatus.objects.get(product=self.products[6]).check_failed_count, 1)
+        # 응답에 없는 상품은 해당 상품만 실패, 스토어 실패로 세지 않음
+        self.assertEqual(StoreApiConfig.objects.get().consecutive_failures, 0)
+
+        # 같은 응답이면 항목 해시가 같아 파싱/상태 변경 없이 확인 시각만 갱신
+        results = InventoryChecker().check_multiple_products(self.products, 'scheduled')
+        self.assertTrue(all(r['not_modified'] for r in results[:6]))
+        self.assertEqual(len(FakeBatchStoreHandler.requested_ids), 6)
+
+    def test_failed_batch_request_counts_once_for_store_health(self):
+        # 상품 7개를 요청 한 번으로 묶고, 그 요청이 503으로 실패
+        StoreApiConfig.objects.update(batch_max_size=10, consecutive_failures=3)
+        FakeBatchStoreHandler.fail_requests = 1
+        products = list(Product.objects.filter(id__in=[p.id for p in self.products])
+                        .select_related('store__api_config').order_by('id'))
+
+        results = InventoryChecker().check_multiple_products(products, 'scheduled')
+
+        self.assertEqual(len(FakeBatchStoreHandler.requested_ids), 1)
+        self.assertFalse(any(r['success'] for r in results))
+        config = StoreApiConfig.objects.get()
+        self.assertEqual(config.consecutive_failures, 4)
+        self.assertTrue(config.is_active)
+
+    def test_repeated_failures_emit_availability_event(self):
+        # 응답에 없는 상품은 매번 실패하고, 3회 연속 실패하면 구매 불가로 바뀐다
+        missing = self.products[6]
+        InventoryStatus.objects.create(product=missing, stock_status='in_stock', availability_status='available',
+                                       is_purchasable=True)
+        checker = InventoryChecker()
+        for _ in range(3):
+            checker.check_multiple_products([missing], 'scheduled')
+
+        status = InventoryStatus.objects.get(product=missing)
+        self.assertEqual(status.check_failed_count, 3)
+        self.assertFalse(status.is_purchasable)
+        self.assertEqual(
+            list(InventoryChangeEvent.objects.values_list('product_id', 'event_type', 'old_value', 'new_value')),
+            [(missing.id, 'availability', 'available', 'unavailable')],
+        )
+
+    def test_first_time_products_are_claimed_not_checked(self):
+        scheduler = InventoryScheduler()
+        self.assertEqual(len(scheduler.collect_due_products()), 7)
+
+        # 미리 만든 재고 상태 행은 선점 시각만 있고 확인한 것으로 보지 않는다
+        statuses = list(InventoryStatus.objects.all())
+        self.assertEqual(len(statuses), 7)
+        for status in statuses:
+            self.assertIsNone(status.last_checked_at)
+            self.assertGreater(status.next_check_at, timezone.now())
+            self.assertFalse(status.is_recently_checked)
+            self.assertTrue(status.needs_urgent_check)
+        self.assertEqual(scheduler.get_due_products(), [])
+
+    def test_store_queues_are_a_fixed_pool(self):
+        with self.settings(EASYSTYLE_SETTINGS={**settings.EASYSTYLE_SETTINGS, 'INVENTORY_STORE_QUEUE_COUNT': 4}):
+            queues = store_queue_names()
+            self.assertEqual(len(queues), 4)
+            # 나중에 추가된 스토어도 워커가 이미 구독 중인 큐 중 하나로 간다
+            self.assertEqual({store_queue_name(store_id) for store_id in range(1, 100)}, set(queues))
+
+    def test_sweep_dispatches_store_tasks_in_eager_mode(self):
+        from .tasks import run_inventory_sweep
+
+        # CELERY 네임스페이스 설정이라 접두사 키로 덮어써야 한다
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=True)
+        try:
+            summary = run_inventory_sweep.delay().get()
+        finally:
+            celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=False)
+
+        self.assertEqual(summary, {'due_count': 7, 'store_count': 1})
+        self.assertEqual(len(FakeBatchStoreHandler.requested_ids), 3)
+        self.assertEqual(InventoryStatus.objects.filter(last_checked_at__isnull=False).count(), 7)
+        self.assertFalse(InventoryStatus.objects.filter(next_check_at__isnull=True).exists())
+
+
+class StoreRateLimiterTest(TransactionTestCase):
+    """
+    호스트별 토큰 버킷이 요청률을 지키고, 자기가 잡은 락만 해제하는지 확인
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bucket_spaces_requests_after_burst(self):
+        limiter = TokenBucketLimiter()
+        waits = [limiter.acquire('shop.example.com', rate=10, capacity=2) for _ in range(3)]
+        self.assertLess(max(waits[:2]), 0.05)
+        self.assertGreater(waits[2], 0.05)
+
+        with self.assertRaises(RateLimitTimeout):
+            limiter.acquire('shop.example.com', rate=0.1, capacity=1, max_wait=0.5)
+
+    def test_lock_is_released_only_by_its_owner(self):
+        limiter = TokenBucketLimiter()
+        lock_key = f'{limiter.key_prefix}:shop.example.com:lock'
+
+        # 다른 프로세스가 락을 잡고 있으면 기다리고, 그 락을 지우지 않음
+        cache.add(lock_key, 'other', timeout=limiter.lock_timeout)
+        self.assertEqual(limiter._try_acquire('shop.example.com', rate=1, capacity=1), limiter.lock_retry_interval)
+        self.assertEqual(cache.get(lock_key), 'other')
+
+        # 만료 후 다른 쪽이 새로 잡은 락은 이전 소유자가 해제하지 못함
+        _release_lock(cache, lock_key, 'expired-owner')
+        self.assertEqual(cache.get(lock_key), 'other')
+        _release_lock(cache, lock_key, 'other')
+        self.assertIsNone(cache.get(lock_key))
+
+    def test_disabled_limiter_does_not_wait(self):
+        with self.settings(EASYSTYLE_SETTINGS={**settings.EASYSTYLE_SETTINGS, 'STORE_RATE_LIMIT_ENABLED': False}):
+            limiter = TokenBucketLimiter()
+            self.assertEqual([limiter.acquire('shop.example.com', rate=0.1) for _ in range(3)], [0.0] * 3)
+
+    def test_deploy_check_warns_without_shared_cache(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                             'LOCATION': 'redis://localhost:6379/1'}}
+        with self.settings(CACHES=locmem):
+            self.assertEqual([m.id for m in run_checks(include_deployment_checks=True, tags=['caches'])],
+                             ['products.W001'])
+            self.assertEqual(run_checks(tags=['caches']), [])
+        with self.settings(CACHES=redis):
+            self.assertEqual(run_checks(include_deployment_checks=True, tags=['caches']), [])
+        with self.settings(CACHES=locmem,
+                           EASYSTYLE_SETTINGS={**settings.EASYSTYLE_SETTINGS, 'STORE_RATE_LIMIT_ENABLED': False}):
+            self.assertEqual(run_checks(include_deployment_checks=True, tags=['caches']), [])
+
+
+class InventoryCircuitBreakerTest(TransactionTestCase):
+    """
+    응답하지 않는 스토어는 연속 실패 후 회로가 열려 요청 없이 마지막 상태를 반환하는지 확인
+    """
+
+    def setUp(self):
+        cache.clear()
+        # 아무도 듣지 않는 포트
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            dead_port = sock.getsockname()[1]
+
+        store = Store.objects.create(name='Dead Store', website='https://dead.example.com')
+        StoreApiConfig.objects.create(
+            store=store,
+            api_type='rest_api',
+            request_delay_seconds=0,
+            timeout_seconds=5,
+            inventory_check_url=f'http://127.0.0.1:{dead_port}/stock/{{product_id}}',
+        )
+
+        brand = Brand.objects.create(name='Brand')
+        category = ProductCategory.objects.create(name='아우터', name_en='Outer')
+        for index in range(8):
+            product = Product.objects.create(
+                name=f'Coat {index}',
+                brand=brand,
+                category=category,
+                store=store,
+                external_id=f'coat-{index}',
+                original_price=99000,
+                main_image='https://dead.example.com/coat.jpg',
+                product_url=f'https://dead.example.com/coat-{index}',
+            )
+            InventoryStatus.objects.create(
+                product=product, stock_status='in_stock', availability_status='available',
+                is_purchasable=True, stock_quantity=3, current_price=89000,
+            )
+        self.store = store
+        self.products = list(Product.objects.filter(store=store).select_related('store__api_config').order_by('id'))
+
+        self.checker = InventoryChecker()
+        self.checker.http.breaker = StoreCircuitBreaker(failure_threshold=3, open_seconds=0.3)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_open_circuit_fails_fast_with_last_known_status(self):
+        results = self.checker.check_store_products(self.products, 'scheduled')
+        results = [results[product.id] for product in self.products]
+
+        self.assertEqual([r['circuit_open'] for r in results], [False] * 3 + [True] * 5)
+        self.assertEqual(self.checker.http.breaker.get_state(self.store.id)['state'], 'open')
+
+        # 열린 회로의 결과는 저장된 마지막 상태이며 실패로 기록하지 않음
+        self.assertTrue(results[-1]['is_available'])
+        self.assertEqual(results[-1]['stock_quantity'], 3)
+        self.assertEqual(results[-1]['current_price'], 89000)
+        self.assertEqual(InventoryStatus.objects.filter(check_failed_count__gt=0).count(), 3)
+        self.assertEqual(StoreApiConfig.objects.get(store=self.store).consecutive_failures, 3)
+
+        # 차단 시간이 지나면 시험 요청 하나만 보내고, 실패하면 다시 열림
+        time.sleep(0.35)
+        self.assertEqual(self.checker.http.breaker.get_state(self.store.id)['state'], 'half_open')
+        results = self.checker.check_store_products(self.products[:3], 'scheduled')
+        self.assertEqual([results[product.id]['circuit_open'] for product in self.products[:3]], [False, True, True])
+        self.assertEqual(self.checker.http.breaker.get_state(self.store.id)['state'], 'open')
+
+
+class SlowStoreHandler(BaseHTTPRequestHandler):
+    """
+    응답이 느린 단일 상품 재고 API
+    """
+
+    request_count = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            SlowStoreHandler.request_count += 1
+        time.sleep(0.3)
+
+        body = json.dumps({'stock': 7, 'price': 45000}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class InventoryCoalescingTest(TransactionTestCase):
+    """
+    같은 상품의 동시 확인은 한 번만 요청하고, 유효 시간 내 결과는 새로 요청하지 않는지 확인
+    """
+
+    THREADS = 6
+
+    def setUp(self):
+        cache.clear()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowStoreHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        SlowStoreHandler.request_count = 0
+
+        store = Store.objects.create(name='Slow Store', website='https://slow.example.com')
+        StoreApiConfig.objects.create(
+            store=store,
+            api_type='rest_api',
+            request_delay_seconds=0,
+            inventory_check_url=f'http://127.0.0.1:{self.server.server_address[1]}/stock/{{product_id}}',
+        )
+        self.product = Product.objects.create(
+            name='Knit',
+            brand=Brand.objects.create(name='Brand'),
+            category=ProductCategory.objects.create(name='상의', name_en='Tops'),
+            store=store,
+            external_id='knit-1',
+            original_price=59000,
+            main_image='https://slow.example.com/knit.jpg',
+            product_url='https://slow.example.com/knit-1',
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        cache.clear()
+
+    def test_concurrent_checks_share_one_request(self):
+        checker = InventoryChecker()
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        lock = threading.Lock()
+
+        def worker():
+            product = Product.objects.select_related('store__api_config').get(pk=self.product.pk)
+            try:
+                barrier.wait()
+                result = checker.check_products_coalesced([product], 'user_request')[product.id]
+                with lock:
+                    results.append(result)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(SlowStoreHandler.request_count, 1)
+        self.assertEqual([r['stock_quantity'] for r in results], [7] * self.THREADS)
+        self.assertEqual(len([r for r in results if r.get('coalesced')]), self.THREADS - 1)
+
+        # 유효 시간 안이면 결과 캐시가 비어도 저장된 재고 상태로 응답
+        cache.clear()
+        product = Product.objects.select_related('store__api_config').get(pk=self.product.pk)
+        result = checker.check_products_coalesced([product], 'user_request')[product.id]
+        self.assertTrue(result['success'])
+        self.assertTrue(result['coalesced'])
+        self.assertEqual(result['current_price'], 45000)
+        self.assertEqual(SlowStoreHandler.request_count, 1)
+
+    def test_late_check_publishes_result_and_releases_lock(self):
+        checker = InventoryChecker()
+        product = Product.objects.select_related('store__api_config').get(pk=self.product.pk)
+        result = checker.check_products_coalesced([product], 'user_request', timeout=0.05)[product.id]
+        self.assertFalse(result['success'])
+
+        # 제한 시간이 지나 끝난 확인도 결과를 공유하고 락을 해제
+        coalescer = checker.coalescer
+        deadline = time.monotonic() + 5
+        while cache.get(coalescer._lock_key(product.id)) is not None and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertIsNone(cache.get(coalescer._lock_key(product.id)))
+        self.assertEqual(cache.get(coalescer._result_key(product.id))['stock_quantity'], 7)
+        while not InventoryStatus.objects.filter(product=product).exists() and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        result = checker.check_products_coalesced([product], 'user_request')[product.id]
+        self.assertTrue(result['coalesced'])
+        self.assertEqual(result['stock_quantity'], 7)
+        self.assertEqual(SlowStoreHandler.request_count, 1)
+
+    def test_unsaved_result_is_not_shared(self):
+        checker = InventoryChecker()
+        product = Product.objects.select_related('store__api_config').get(pk=self.product.pk)
+        with patch.object(InventoryCheckBatch, '_save_summaries', side_effect=DatabaseError('database is locked')):
+            result = checker.check_products_coalesced([product], 'user_request')[product.id]
+        self.assertFalse(result['success'])
+
+        # 저장하지 못한 확인은 캐시에도 실패로 남아 다음 요청이 다시 확인
+        coalescer = checker.coalescer
+        self.assertFalse(cache.get(coalescer._result_key(product.id))['success'])
+        self.assertIsNone(cache.get(coalescer._lock_key(product.id)))
+        self.assertFalse(InventoryStatus.objects.filter(product=product).exists())
+
+        result = checker.check_products_coalesced([product], 'user_request')[product.id]
+        self.assertTrue(result['success'])
+        self.assertNotIn('coalesced', result)
+        self.assertEqual(SlowStoreHandler.request_count, 2)
+
+    def test_timeout_cancels_unstarted_stores_and_releases_their_locks(self):
+        other_store = Store.objects.create(name='Other Store', website='https://other.example.com')
+        StoreApiConfig.objects.create(
+            store=other_store,
+            api_type='rest_api',
+            request_delay_seconds=0,
+            inventory_check_url=StoreApiConfig.objects.get(store=self.product.store).inventory_check_url,
+        )
+        other = Product.objects.create(
+            name='Scarf', brand=self.product.brand, category=self.product.category, store=other_store,
+            external_id='scarf-1', original_price=19000,
+            main_image='https://other.example.com/scarf.jpg', product_url='https://other.example.com/scarf-1',
+        )
+        products = list(Product.objects.select_related('store__api_config').filter(pk__in=[self.product.pk, other.pk])
+                        .order_by('pk'))
+
+        # 스토어 하나씩만 동시에 확인하므로 두 번째 스토어는 시작 전에 취소됨
+        checker = InventoryChecker()
+        checker.max_workers = 1
+        results = checker.check_products_coalesced(products, 'user_request', timeout=0.05)
+        self.assertTrue(all(not result['success'] for result in results.values()))
+        self.assertIsNone(cache.get(checker.coalescer._lock_key(other.id)))
+
+        # 진행 중이던 첫 스토어 확인은 반환 후에 끝까지 진행해 저장 (늦은 저장)
+        deadline = time.monotonic() + 5
+        while not InventoryStatus.objects.filter(product=self.product).exists() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(InventoryStatus.objects.get(product=self.product).stock_quantity, 7)
+        self.assertFalse(InventoryStatus.objects.filter(product=other).exists())
+        self.assertEqual(SlowStoreHandler.request_count, 1)
+
+    def test_unavailable_result_after_failures_is_fresh(self):
+        status = InventoryStatus.objects.create(product=self.product, check_failed_count=2)
+        status.mark_as_unavailable('품절')
+        self.assertEqual(status.check_failed_count, 0)
+        self.assertTrue(InventoryStatus.objects.get(pk=status.pk).has_fresh_result)
+
+    def test_failed_save_returns_failure_results(self):
+        product = Product.objects.select_related('store__api_config').get(pk=self.product.pk)
+        with patch.object(InventoryCheckBatch, '_save_summaries', side_effect=DatabaseError('database is locked')):
+            result = InventoryChecker().check_products_by_store([product], 'scheduled')[product.id]
+
+        self.assertFalse(result['success'])
+        self.assertIn('저장 실패', result['error_message'])
+        self.assertFalse(InventoryStatus.objects.filter(product=product).exists())
+        # 롤백된 행의 pk가 메모리 객체에 남지 않음
+        self.assertIsNone(product.inventory_status.pk)
+
+    def test_new_status_conflict_updates_existing_row(self):
+        checker = InventoryChecker()
+        product = Product.objects.select_related('store__api_config').get(pk=self.product.pk)
+        batch = InventoryCheckBatch('manual')
+        batch.prepare([product])
+
+        # 확인하는 동안 다른 쪽(스케줄러)이 먼저 행을 만듦
+        placeholder = InventoryStatus.objects.create(product=product, stock_status='unknown')
+        checker._check_product(product, batch)
+        batch.flush()
+
+        self.assertEqual(batch.statuses[product.id].pk, placeholder.pk)
+        self.assertIsNotNone(batch.scores[product.id].pk)
+        placeholder.refresh_from_db()
+        self.assertEqual(placeholder.stock_quantity, 7)
+        self.assertIsNotNone(placeholder.last_checked_at)
+
+    def test_styling_job_streams_partial_results(self):
+        user = User.objects.create_user(username='stylist', password='password')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=True)
+        try:
+            response = client.post('/api/products/inventory/check-styling/', {
+                'product_uuids': [str(self.product.uuid)],
+                'mode': 'job',
+            }, format='json')
+        finally:
+            celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=False)
+
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['data']['job_id']
+
+        data = client.get(f'/api/products/inventory/jobs/{job_id}/', {'after': 1}).json()['data']
+        self.assertEqual(data['status'], 'completed')
+        self.assertEqual(data['completed'], 1)
+        self.assertEqual([event['type'] for event in data['events']], ['result', 'done'])
+        self.assertEqual(data['events'][0]['data']['stock_quantity'], 7)
+
+        response = client.get(f'/api/products/inventory/jobs/{job_id}/stream/', HTTP_LAST_EVENT_ID='2')
+        body = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertNotIn('event: result', body)
+        self.assertIn('id: 3\nevent: done', body)
+
+        other = User.objects.create_user(username='other', password='password')
+        client.force_authenticate(other)
+        self.assertEqual(client.get(f'/api/products/inventory/jobs/{job_id}/').status_code, 404)
+
+    def test_job_results_from_worker_threads_are_all_counted(self):
+        job = create_styling_job(user_id=1, product_ids=list(range(200)))
+        runner = StylingJobRunner(job)
+
+        def worker(offset):
+            for index in range(offset, 200, 8):
+                runner.on_result({'product_id': index, 'current_price': Decimal('45000'),
+                                  'last_checked': timezone.now()})
+
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        job = get_job(job['job_id'])
+        self.assertEqual(job['completed'], 200)
+        self.assertEqual(sorted(event['data']['product_id'] for event in job['events']), list(range(200)))
+        self.assertEqual(job['events'][0]['data']['current_price'], 45000.0)
+        self.assertIsInstance(job['events'][0]['data']['last_checked'], str)
+
+        # 결과마다 작업 전체를 다시 쓰지 않고, after 이후 이벤트만 읽음
+        self.assertNotIn('events', cache.get(f"inventory:job:{job['job_id']}"))
+        self.assertEqual([event['seq'] for event in get_job(job['job_id'], after=197)['events']], [198, 199, 200])
+
+
+class CartRevalidationTest(TransactionTestCase):
+    """
+    결제 전 장바구니 재검증이 최근 확인 결과는 그대로 쓰고, 오래된 상품만 다시 확인하는지 확인
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowStoreHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        SlowStoreHandler.request_count = 0
+
+        self.user = User.objects.create_user(username='shopper', password='password')
+        brand = Brand.objects.create(name='Brand')
+        category = ProductCategory.objects.create(name='상의', name_en='Tops')
+        slow_store = Store.objects.create(name='Slow Store', website='https://slow.example.com')
+        StoreApiConfig.objects.create(
+            store=slow_store,
+            api_type='rest_api',
+            request_delay_seconds=0,
+            inventory_check_url=f'http://127.0.0.1:{self.server.server_address[1]}/stock/{{product_id}}',
+        )
+        # API 설정이 없어 실시간 확인이 항상 실패하는 스토어
+        offline_store = Store.objects.create(name='Offline Store', website='https://offline.example.com')
+
+        def create_product(name, store, price):
+            return Product.objects.create(
+                name=name, brand=brand, category=category, store=store, external_id=name.lower(),
+                original_price=price, main_image=f'{store.website}/{name}.jpg', product_url=f'{store.website}/{name}',
+            )
+
+        self.fresh = create_product('Shirt', offline_store, 29000)
+        self.live = create_product('Knit', slow_store, 50000)
+        self.offline = create_product('Scarf', offline_store, 19000)
+
+        now = timezone.now()
+        InventoryStatus.objects.create(
+            product=self.fresh, stock_status='in_stock', stock_quantity=5, availability_status='available',
+            is_purchasable=True, current_price=30000, last_checked_at=now,
+        )
+        InventoryStatus.objects.create(
+            product=self.offline, stock_status='low_stock', stock_quantity=1, availability_status='available',
+            is_purchasable=True, current_price=19000, last_checked_at=now - timedelta(days=2),
+        )
+
+        self.cart = Cart.objects.create(user=self.user)
+        self.cart.items.create(product=self.fresh, quantity=2)
+        self.cart.items.create(product=self.live, quantity=1)
+        self.cart.items.create(product=self.offline, quantity=2)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        cache.clear()
+
+    def test_revalidate_classifies_freshness_and_price_changes(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/products/cart/revalidate/')
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        items = {item['product_uuid']: item for item in data['items']}
+        fresh, live, offline = (items[str(product.uuid)] for product in [self.fresh, self.live, self.offline])
+
+        # 최근 확인 결과는 다시 확인하지 않음
+        self.assertEqual(fresh['freshness'], 'fresh')
+        self.assertEqual(fresh['live_price'], 30000.0)
+        self.assertEqual(fresh['price_delta'], 1000.0)
+        self.assertTrue(fresh['price_changed'])
+
+        # 확인되지 않은 상품은 실시간으로 확인
+        self.assertEqual(live['freshness'], 'refreshed')
+        self.assertEqual(live['stock_quantity'], 7)
+        self.assertEqual(live['price_delta'], -5000.0)
+
+        # 확인에 실패하면 마지막 상태를 stale로 반환
+        self.assertEqual(offline['freshness'], 'stale')
+        self.assertEqual(offline['stock_quantity'], 1)
+        self.assertFalse(offline['quantity_available'])
+        self.assertFalse(offline['price_changed'])
+
+        summary = data['summary']
+        self.assertEqual(summary['total_items'], 3)
+        self.assertFalse(summary['all_purchasable'])
+        self.assertEqual(summary['price_changed_count'], 2)
+        self.assertEqual(summary['total_price_delta'], 1000.0 * 2 - 5000.0)
+        self.assertEqual(summary['checked_count'], 1)
+        self.assertEqual(summary['stale_count'], 1)
+        self.assertEqual(SlowStoreHandler.request_count, 1)
+
+    def test_time_budget_returns_last_known_state(self):
+        InventoryStatus.objects.create(
+            product=self.live, stock_status='in_stock', stock_quantity=3, availability_status='available',
+            is_purchasable=True, current_price=50000, last_checked_at=timezone.now() - timedelta(days=2),
+        )
+        started = time.monotonic()
+        result = revalidate_cart(self.cart, time_budget=0.05)
+        self.assertLess(time.monotonic() - started, 0.3)
+
+        live = next(item for item in result['items'] if item['product_uuid'] == str(self.live.uuid))
+        self.assertEqual(live['freshness'], 'stale')
+        self.assertEqual(live['stock_quantity'], 3)
+        self.assertEqual(live['price_delta'], 0.0)
+        self.assertEqual(result['summary']['checked_count'], 0)
+        self.assertEqual(result['summary']['stale_count'], 2)
+
+        # 제한 시간 뒤에 끝난 확인이 저장되면 다음 재검증은 그 결과를 그대로 사용
+        deadline = time.monotonic() + 5
+        while InventoryStatus.objects.get(product=self.live).stock_quantity != 7 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        result = revalidate_cart(self.cart, time_budget=0.05)
+        live = next(item for item in result['items'] if item['product_uuid'] == str(self.live.uuid))
+        self.assertEqual(live['freshness'], 'fresh')
+        self.assertEqual(live['stock_quantity'], 7)
+        self.assertEqual(live['price_delta'], -5000.0)
+        self.assertEqual(SlowStoreHandler.request_count, 1)
+
+
+class ConcurrentStoreCheckTest(TransactionTestCase):
+    """
+    여러 스토어 상품은 스토어별로 동시에 확인하고, 요청 간격은 스토어(호스트) 단위로 지키는지 확인
+    """
+
+    STORES = 3
+    PRODUCTS_PER_STORE = 2
+    REQUEST_DELAY = 1
+
+    def setUp(self):
+        cache.clear()
+        SlowStoreHandler.request_count = 0
+        brand = Brand.objects.create(name='Brand')
+        category = ProductCategory.objects.create(name='상의', name_en='Tops')
+
+        self.servers = []
+        for store_index in range(self.STORES):
+            server = ThreadingHTTPServer(('127.0.0.1', 0), SlowStoreHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.servers.append(server)
+
+            store = Store.objects.create(name=f'Store {store_index}', website=f'https://{store_index}.example.com')
+            StoreApiConfig.objects.create(
+                store=store,
+                api_type='rest_api',
+                request_delay_seconds=self.REQUEST_DELAY,
+                inventory_check_url=f'http://127.0.0.1:{server.server_address[1]}/stock/{{product_id}}',
+            )
+            for index in range(self.PRODUCTS_PER_STORE):
+                Product.objects.create(
+                    name=f'Knit {store_index}-{index}',
+                    brand=brand,
+                    category=category,
+                    store=store,
+                    external_id=f'knit-{store_index}-{index}',
+                    original_price=59000,
+                    main_image=f'https://{store_index}.example.com/knit-{index}.jpg',
+                    product_url=f'https://{store_index}.example.com/knit-{index}',
+                )
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        cache.clear()
+
+    def test_stores_are_checked_in_parallel_and_results_keep_input_order(self):
+        # 스토어가 번갈아 나오는 입력 순서
+        by_store = list(Product.objects.select_related('store__api_config').order_by('external_id'))
+        products = [product for index in range(self.PRODUCTS_PER_STORE)
+                    for product in by_store[index::self.PRODUCTS_PER_STORE]]
+
+        started = time.monotonic()
+        results = InventoryChecker().check_multiple_products(products)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual([result['product_id'] for result in results], [product.id for product in products])
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(SlowStoreHandler.request_count, self.STORES * self.PRODUCTS_PER_STORE)
+        # 한 스토어의 두 번째 요청은 간격(1초)을 기다리지만, 스토어끼리는 서로 기다리지 않음 (순차면 약 3.9초)
+        self.assertGreaterEqual(elapsed, self.REQUEST_DELAY + 0.3)
+        self.assertLess(elapsed, 2 * (self.REQUEST_DELAY + 0.3))
+
+    def test_failed_store_group_returns_failure_results(self):
+        products = list(Product.objects.select_related('store__api_config').order_by('external_id'))
+        broken_store_id = products[0].store_id
+        check_store_products = InventoryChecker.check_store_products
+
+        def failing_store(checker, store_products, *args, **kwargs):
+            if store_products[0].store_id == broken_store_id:
+                raise DatabaseError('database is locked')
+            return check_store_products(checker, store_products, *args, **kwargs)
+
+        with patch.object(InventoryChecker, 'check_store_products', failing_store):
+            results = InventoryChecker().check_multiple_products(products)
+
+        self.assertEqual([result['product_id'] for result in results], [product.id for product in products])
+        self.assertEqual([result['success'] for result in results],
+                         [product.store_id != broken_store_id for product in products])
+        self.assertEqual(results[0]['error_message'], '재고 확인을 마치지 못함')
+
+
+class FakeStoreScrapingTest(TransactionTestCase):
+    """
+    가짜 스토어의 HTML 페이지를 스크래핑하고, 바뀌지 않은 페이지는 304로 재확인하는지 확인
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.server = FakeStoreServer(FakeStoreConfig(latency_ms=0, latency_jitter_ms=0, change_rate=0)).start()
+        base_url = f'http://127.0.0.1:{self.server.port}'
+
+        store = Store.objects.create(name='Fake Shop', website=base_url)
+        StoreApiConfig.objects.create(store=store, api_type='scraping', request_delay_seconds=0, **DEFAULT_HTML_SELECTORS)
+        brand = Brand.objects.create(name='Brand')
+        category = ProductCategory.objects.create(name='신발', name_en='Shoes')
+        for external_id in ['shoe-1', 'shoe-2']:
+            Product.objects.create(
+                name=external_id, brand=brand, category=category, store=store, external_id=external_id,
+                original_price=79000, main_image=f'{base_url}/{external_id}.jpg',
+                product_url=f'{base_url}/products/{external_id}',
+            )
+        self.products = list(Product.objects.select_related('store__api_config').order_by('id'))
+
+    def tearDown(self):
+        self.server.stop()
+        cache.clear()
+        # 롤업이 만든 월별 보관 테이블은 테스트 DB 초기화 대상이 아니므로 직접 삭제
+        with connection.cursor() as cursor:
+            for table in connection.introspection.table_names():
+                if table.startswith(ARCHIVE_TABLE_PREFIX):
+                    cursor.execute(f'DROP TABLE {connection.ops.quote_name(table)}')
+
+    def test_scraping_and_conditional_revalidation(self):
+        checker = InventoryChecker()
+        results = checker.check_multiple_products(self.products, 'scheduled')
+        self.assertTrue(all(r['success'] for r in results))
+
+        for product, result in zip(self.products, results):
+            item = self.server.catalog.get(product.external_id)
+            self.assertEqual(result['current_price'], item['price'])
+            self.assertEqual(result['is_available'], item['stock'] > 0)
+
+        results = checker.check_multiple_products(self.products, 'scheduled')
+        self.assertTrue(all(r['not_modified'] for r in results))
+        self.assertEqual(self.server.get_stats()[f'127.0.0.1:{self.server.port}']['not_modified'], 2)
+
+    def test_streaming_download_is_bounded(self):
+        # 품절 키워드와 재고 정보가 앞쪽에 있으면 나머지 큰 본문은 받지 않음
+        self.server.config.page_padding_kb = 512
+        self.server.catalog.get(self.products[0].external_id)
+        self.server.catalog._items[self.products[0].external_id]['stock'] = 0
+        result = InventoryChecker().check_product_availability(self.products[0], 'manual')
+        self.assertFalse(result['is_available'])
+        self.assertTrue(result['stopped_early'])
+        self.assertLess(result['downloaded_bytes'], 16 * 1024)
+
+        # 판매 중인 페이지는 뒤쪽에 품절 표시가 있을 수 있으므로 끝까지 읽음
+        self.assertGreater(self.server.catalog.get(self.products[1].external_id)['stock'], 0)
+        result = InventoryChecker().check_product_availability(self.products[1], 'manual')
+        self.assertTrue(result['success'])
+        self.assertFalse(result['stopped_early'])
+        self.assertGreater(result['downloaded_bytes'], 512 * 1000)
+
+        # 재고 정보가 최대 크기 뒤에 있으면 최대 크기까지만 읽고 실패 처리
+        self.server.config.html_template = Template(DEFAULT_HTML_TEMPLATE.replace(
+            '<div class="product-detail">', '$padding<div class="product-detail">'
+        ))
+        StoreApiConfig.objects.update(max_page_kb=64)
+        product = Product.objects.select_related('store__api_config').get(pk=self.products[1].pk)
+        result = InventoryChecker().check_product_availability(product, 'manual')
+        self.assertFalse(result['success'])
+        self.assertEqual(result['downloaded_bytes'], 64 * 1024)
+        self.assertIn('최대 크기', result['error_message'])
+
+    def test_unchanged_checks_are_counted_not_logged(self):
+        checker = InventoryChecker()
+        for _ in range(3):
+            # 검증자를 지워 매번 본문을 파싱하게 함 (변경 없는 성공)
+            InventoryStatus.objects.update(http_etag='', http_last_modified='', content_hash='')
+            checker.check_multiple_products(self.products, 'scheduled')
+        checker.check_multiple_products(self.products, 'scheduled')
+
+        # 첫 확인(기준)만 전체 로그로 남고 나머지는 일별 집계 카운터로만 누적
+        self.assertEqual(InventoryCheckLog.objects.count(), 2)
+        summary = InventoryCheckDailySummary.objects.get(product=self.products[0])
+        self.assertEqual((summary.check_count, summary.success_count, summary.unchanged_count,
+                          summary.not_modified_count), (4, 4, 3, 1))
+        self.assertEqual(sum(summary.response_time_histogram), 4)
+
+        # 가격이 바뀐 확인은 전체 로그로 기록되고 점수 계산용 변경 이력에 잡힘
+        item = self.server.catalog._items[self.products[0].external_id]
+        item.update(price=item['price'] + 1000, modified_at=time.time() + 1)
+        checker.check_multiple_products(self.products, 'scheduled')
+        log = InventoryCheckLog.objects.filter(product=self.products[0]).order_by('-id').first()
+        self.assertEqual(log.price_after - log.price_before, 1000)
+        self.assertNotIn('product_uuid', log.api_response_data)
+        self.assertEqual(InventoryCheckLog.objects.count(), 3)
+
+    def test_sold_out_page_still_updates_price(self):
+        checker = InventoryChecker()
+        checker.check_multiple_products(self.products, 'scheduled')
+
+        item = self.server.catalog._items[self.products[0].external_id]
+        item.update(stock=0, price=item['price'] + 1000, modified_at=time.time() + 1)
+        result = checker.check_multiple_products(self.products[:1], 'scheduled')[0]
+
+        self.assertFalse(result['is_available'])
+        self.assertIn('일시품절', result['error_message'])
+        self.assertEqual(result['current_price'], item['price'])
+        self.assertEqual(InventoryStatus.objects.get(product=self.products[0]).current_price, item['price'])
+
+    def test_rollup_archives_old_logs_and_feeds_statistics(self):
+        checker = InventoryChecker()
+        checker.check_multiple_products(self.products, 'scheduled')
+        checker.check_multiple_products(self.products, 'scheduled')
+
+        # 보존 기간이 지난 로그 하나는 월별 보관 테이블로 이동
+        old_log = InventoryCheckLog.objects.order_by('id').first()
+        old_checked_at = timezone.now() - timedelta(days=45)
+        InventoryCheckLog.objects.filter(pk=old_log.pk).update(checked_at=old_checked_at)
+
+        stats = InventoryCheckRollup(log_retention_days=30).run()
+        self.assertEqual(stats['rollups_updated'], 1)
+        self.assertEqual(stats['logs_archived'], 1)
+        self.assertFalse(InventoryCheckLog.objects.filter(pk=old_log.pk).exists())
+        table = archive_table_name(timezone.localdate(old_checked_at).replace(day=1))
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM {connection.ops.quote_name(table)}')
+            self.assertEqual(cursor.fetchall(), [(old_log.pk,)])
+
+        rollup = InventoryCheckStoreRollup.objects.get()
+        self.assertEqual((rollup.product_count, rollup.check_count, rollup.success_count), (2, 4, 4))
+        self.assertGreater(rollup.p95_response_time_ms, 0)
+
+        activity = APIClient().get('/api/products/inventory/statistics/').json()['data']['recent_activity']
+        self.assertEqual(activity['total_checks_24h'], 4)
+        self.assertEqual(activity['success_rate_24h'], 100.0)
+        self.assertEqual(activity['from_date'], str(timezone.localdate() - timedelta(days=1)))
+
+        # 롤업 이후의 확인과 아직 롤업되지 않은 어제 집계도 바로 반영
+        checker.check_multiple_products(self.products[:1], 'scheduled')
+        InventoryCheckDailySummary.objects.create(
+            product=self.products[1], date=timezone.localdate() - timedelta(days=1), check_count=3, success_count=1,
+            failure_count=2, total_response_time_ms=300, response_time_histogram=[0, 3],
+        )
+        activity = APIClient().get('/api/products/inventory/statistics/').json()['data']['recent_activity']
+        self.assertEqual((activity['total_checks_24h'], activity['failed_checks_24h']), (8, 2))
+        self.assertEqual(activity['success_rate_24h'], 75.0)
+
+    def test_change_events_feed_with_cursor(self):
+        checker = InventoryChecker()
+        checker.check_multiple_products(self.products, 'scheduled')
+
+        # 첫 상품은 가격 인상, 두 번째 상품은 품절
+        first = self.server.catalog._items[self.products[0].external_id]
+        first.update(price=first['price'] + 1000, modified_at=time.time() + 1)
+        second = self.server.catalog._items[self.products[1].external_id]
+        second.update(stock=0, modified_at=time.time() + 1)
+        checker.check_multiple_products(self.products, 'scheduled')
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='ops', password='password', is_staff=True))
+        # 커밋 지연 구간 안의 이벤트는 아직 읽히지 않는다
+        self.assertEqual(client.get('/api/products/inventory/changes/?since=0').json()['data']['events'], [])
+
+        InventoryChangeEvent.objects.update(created_at=timezone.now() - timedelta(minutes=1))
+        data = client.get('/api/products/inventory/changes/?since=0').json()['data']
+        self.assertEqual(
+            [(e['product_id'], e['type'], e['new']) for e in data['events']],
+            [(self.products[0].id, 'price', f"{first['price']:.2f}"),
+             (self.products[1].id, 'availability', 'unavailable')],
+        )
+        self.assertFalse(data['has_more'])
+
+        # 커서 이후에는 새 이벤트만
+        data = client.get(f"/api/products/inventory/changes/?since={data['next_since']}").json()['data']
+        self.assertEqual(data['events'], [])
+        price_events = client.get('/api/products/inventory/changes/?type=price&limit=1').json()['data']['events']
+        self.assertEqual(price_events[0]['old'], f"{first['price'] - 1000:.2f}")
+
+
+class HtmlExtractionTest(TransactionTestCase):
+    """
+    품절 키워드는 화면에 보이는 텍스트에서만 찾는지 확인 (script/style/template 내용과 주석 제외)
+    """
+
+    PAGES_DIR = Path(__file__).resolve().parent / 'fixtures' / 'store_pages'
+
+    def test_keywords_in_scripts_styles_and_comments_are_ignored(self):
+        extractor = CompiledExtractor(price_selector='.price', unavailable_keywords=['Sold out'])
+        page = (
+            '<html><head><script>var i18n={soldOut:"Sold out"}</script>'
+            '<style>.badge::after{content:"Sold out"}</style></head>'
+            '<body><!-- Sold out --><template><b>Sold out</b></template>'
+            '<span class="price">10,000원</span></body></html>'
+        )
+        self.assertIsNone(extractor.extract(page)['keyword'])
+        self.assertIsNone(extractor.extract_stream([page.encode('utf-8')])['keyword'])
+
+        # 보이는 텍스트는 태그로 나뉘어 있어도 찾음
+        self.assertEqual(extractor.extract('<p>Sold <b>OUT</b></p>')['keyword'], 'sold out')
+
+    def test_keyword_does_not_stop_selector_parsing(self):
+        extractor = CompiledExtractor(price_selector='.price', inventory_selector='.stock',
+                                      unavailable_keywords=['일시품절'])
+        page = '<p class="notice">일시품절</p>' + '<p>상품 설명</p>' * 1000 + '<b class="price">12,000원</b>'
+        chunks = [page[i:i + 1024].encode('utf-8') for i in range(0, len(page), 1024)]
+
+        extraction = extractor.extract_stream(chunks)
+        self.assertEqual(extraction['keyword'], '일시품절')
+        self.assertEqual(extraction['elements']['price']['text'], '12,000원')
+
+    def test_keyword_after_selectors_is_still_found_when_streaming(self):
+        extractor = CompiledExtractor(price_selector='.price', inventory_selector='.btn-buy',
+                                      unavailable_keywords=['품절'])
+        page = ('<b class="price">12,000원</b><button class="btn-buy">구매하기</button>'
+                + '<div>상품 설명</div>' * 2000 + '<p class="notice">품절</p>')
+        chunks = [page[i:i + 1024].encode('utf-8') for i in range(0, len(page), 1024)]
+
+        extraction = extractor.extract_stream(chunks)
+        self.assertEqual(extraction['keyword'], '품절')
+        self.assertEqual(extraction['elements']['price']['text'], '12,000원')
+        self.assertEqual(extractor.extract(page)['keyword'], '품절')
+
+    def test_sample_page_with_i18n_scripts_is_in_stock(self):
+        manifest = json.loads((self.PAGES_DIR / 'pages.json').read_text(encoding='utf-8'))
+        extractor = CompiledExtractor(**manifest['in_stock_with_scripts.html'])
+        content = (self.PAGES_DIR / 'in_stock_with_scripts.html').read_bytes()
+
+        extraction = extractor.extract_stream([content[i:i + 512] for i in range(0, len(content), 512)])
+        self.assertIsNone(extraction['keyword'])
+        self.assertEqual(extraction['elements']['price']['text'], '49,000원')
+        self.assertEqual(extraction['elements']['inventory']['text'], '남은 수량 7개')
@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from . import views
 from . import upload_views
 from . import inventory_views
+from . import guest_cart_views
 
 # ViewSet을 위한 Router 설정
 router = DefaultRouter()
@@ -20,6 +21,7 @@ urlpatterns = [
     # 제품 관련
     path('', views.ProductListView.as_view(), name='product-list'),
     path('<uuid:uuid>/', views.ProductDetailView.as_view(), name='product-detail'),
+    path('<uuid:uuid>/goes-well-with/', views.goes_well_with, name='goes-well-with'),
     path('search/', views.search_products, name='search-products'),
     
     # 위시리스트
@@ -30,6 +32,13 @@ urlpatterns = [
     # 스타일 추천
     path('recommendations/', views.StyleRecommendationListView.as_view(), name='recommendations'),
 
+    # 비로그인 장바구니 (쿠키 기반, 로그인 시 병합)
+    path('guest-cart/', guest_cart_views.get_guest_cart, name='guest-cart'),
+    path('guest-cart/add_item/', guest_cart_views.add_guest_cart_item, name='guest-cart-add-item'),
+    path('guest-cart/update_item/', guest_cart_views.update_guest_cart_item, name='guest-cart-update-item'),
+    path('guest-cart/remove_item/', guest_cart_views.remove_guest_cart_item, name='guest-cart-remove-item'),
+    path('guest-cart/clear/', guest_cart_views.clear_guest_cart, name='guest-cart-clear'),
+
     # 파일 업로드
     path('upload/style-image/', upload_views.upload_style_image, name='upload-style-image'),
     path('upload/profile-picture/', upload_views.upload_profile_picture, name='upload-profile-picture'),
@@ -39,9 +48,13 @@ urlpatterns = [
     # 재고 관리 및 구매 가능성 확인
     path('inventory/check-multiple/', inventory_views.check_multiple_products_inventory, name='check-multiple-inventory'),
     path('inventory/check-styling/', inventory_views.check_styling_products_inventory, name='check-styling-inventory'),
+    path('inventory/jobs/<str:job_id>/', inventory_views.get_inventory_job, name='inventory-job'),
+    path('inventory/jobs/<str:job_id>/stream/', inventory_views.stream_inventory_job, name='inventory-job-stream'),
     path('inventory/status/<uuid:product_uuid>/', inventory_views.get_product_inventory_status, name='inventory-status'),
     path('inventory/score/<uuid:product_uuid>/', inventory_views.get_purchaseability_score, name='purchaseability-score'),
     path('inventory/statistics/', inventory_views.get_inventory_statistics, name='inventory-statistics'),
+    path('inventory/http-metrics/', inventory_views.get_inventory_http_metrics, name='inventory-http-metrics'),
+    path('inventory/changes/', inventory_views.get_inventory_changes, name='inventory-changes'),
     path('inventory/alternatives/<uuid:product_uuid>/', inventory_views.get_alternative_products, name='find-alternatives'),
 
     # Router로 관리되는 ViewSet URLs 포함
@@ -2,18 +2,24 @@ from rest_framework import generics, status, permissions, filters, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, F
 from .models import (
     ProductCategory, Brand, Store, Product,
     UserWishlist, StyleRecommendation, ProductAnalytics,
     Cart, CartItem
 )
+from .analytics_service import record_product_view, viewer_key_for_request
 from .serializers import (
     ProductCategorySerializer, BrandSerializer, StoreSerializer,
     ProductListSerializer, ProductDetailSerializer, UserWishlistSerializer,
     StyleRecommendationSerializer, ProductSearchSerializer,
     ProductRecommendationSerializer, CartSerializer, CartItemSerializer,
-    AddToCartSerializer, UpdateCartItemSerializer
+    AddToCartSerializer, UpdateCartItemSerializer, CartBatchSerializer,
+    AddStyleSetSerializer
+)
+from .cart_service import (
+    apply_cart_operations, add_style_set_to_cart, get_recommendation_entries,
+    revalidate_cart, CartOperationError
 )
 
 
@@ -153,10 +159,12 @@ class ProductDetailView(generics.RetrieveAPIView):
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         
-        # 조회수 증가
+        # 조회수 증가 (동시 조회에도 누락되지 않도록 DB에서 증가)
         analytics, created = ProductAnalytics.objects.get_or_create(product=instance)
-        analytics.view_count += 1
-        analytics.save()
+        ProductAnalytics.objects.filter(pk=analytics.pk).update(view_count=F('view_count') + 1)
+
+        # 고유 방문자 스케치 반영
+        record_product_view(instance, viewer_key_for_request(request))
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
@@ -376,6 +384,42 @@ def product_statistics(request):
     return Response(stats)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def goes_well_with(request, uuid):
+    """
+    함께 스타일링된 상품 추천 API (사전 계산된 상위 k개 조회)
+    """
+    try:
+        product = Product.objects.select_related('analytics').get(uuid=uuid)
+    except Product.DoesNotExist:
+        return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    analytics = getattr(product, 'analytics', None)
+    combinations = analytics.popular_combinations if analytics else []
+
+    partners = {
+        str(partner.uuid): partner
+        for partner in Product.objects.filter(
+            uuid__in=[entry['product_uuid'] for entry in combinations],
+            is_available=True
+        ).select_related('brand', 'category', 'store')
+    }
+
+    results = []
+    for entry in combinations:
+        partner = partners.get(entry['product_uuid'])
+        if partner:
+            data = ProductListSerializer(partner, context={'request': request}).data
+            data['cooccurrence_count'] = entry['count']
+            results.append(data)
+
+    return Response({
+        'product_uuid': str(product.uuid),
+        'results': results
+    })
+
+
 class CartViewSet(viewsets.ModelViewSet):
     """
     장바구니 ViewSet
@@ -384,21 +428,21 @@ class CartViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Cart.objects.filter(user=self.request.user).prefetch_related(
-            'items__product__brand',
-            'items__product__category'
-        )
+        return Cart.objects.filter(user=self.request.user).with_totals().with_items(self.request.user)
+
+    def get_cart(self):
+        """현재 사용자의 장바구니를 합계/아이템과 함께 조회 (없으면 생성)"""
+        Cart.objects.get_or_create(user=self.request.user)
+        return self.get_queryset().get()
 
     def create(self, request, *args, **kwargs):
         """장바구니는 사용자당 하나만 존재하므로 create 대신 get_or_create 사용"""
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        serializer = self.get_serializer(cart)
+        serializer = self.get_serializer(self.get_cart())
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def list(self, request, *args, **kwargs):
         """현재 사용자의 장바구니 조회"""
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        serializer = self.get_serializer(cart)
+        serializer = self.get_serializer(self.get_cart())
         return Response(serializer.data)
 
     @action(detail=False, methods=['post'])
@@ -417,8 +461,7 @@ class CartViewSet(viewsets.ModelViewSet):
                 cart_item_serializer.save()
 
                 # 업데이트된 장바구니 반환
-                cart_serializer = CartSerializer(cart)
-                return Response(cart_serializer.data, status=status.HTTP_201_CREATED)
+                return Response(self.get_serializer(self.get_cart()).data, status=status.HTTP_201_CREATED)
             else:
                 return Response(cart_item_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         else:
@@ -437,8 +480,7 @@ class CartViewSet(viewsets.ModelViewSet):
             cart_item.delete()
 
             # 업데이트된 장바구니 반환
-            cart_serializer = CartSerializer(cart)
-            return Response(cart_serializer.data, status=status.HTTP_200_OK)
+            return Response(self.get_serializer(self.get_cart()).data, status=status.HTTP_200_OK)
         except (Cart.DoesNotExist, CartItem.DoesNotExist):
             return Response({'error': 'Item not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -458,8 +500,7 @@ class CartViewSet(viewsets.ModelViewSet):
                 cart_item.save()
 
                 # 업데이트된 장바구니 반환
-                cart_serializer = CartSerializer(cart)
-                return Response(cart_serializer.data, status=status.HTTP_200_OK)
+                return Response(self.get_serializer(self.get_cart()).data, status=status.HTTP_200_OK)
             except (Cart.DoesNotExist, CartItem.DoesNotExist):
                 return Response({'error': 'Item not found'}, status=status.HTTP_404_NOT_FOUND)
         else:
@@ -473,7 +514,59 @@ class CartViewSet(viewsets.ModelViewSet):
             cart.items.all().delete()
 
             # 빈 장바구니 반환
-            cart_serializer = CartSerializer(cart)
-            return Response(cart_serializer.data, status=status.HTTP_200_OK)
+            return Response(self.get_serializer(self.get_cart()).data, status=status.HTTP_200_OK)
         except Cart.DoesNotExist:
             return Response({'error': 'Cart not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """여러 장바구니 변경(add/update/remove)을 한 번에 적용"""
+        serializer = CartBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        cart, created = Cart.objects.get_or_create(user=request.user)
+        try:
+            apply_cart_operations(cart, serializer.validated_data['operations'])
+        except CartOperationError as e:
+            return Response({
+                'error': e.message,
+                'operation_index': e.operation_index
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(self.get_serializer(self.get_cart()).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def add_style_set(self, request):
+        """스타일 추천(또는 상품 목록) 전체를 하나의 스타일 세트로 장바구니에 추가"""
+        serializer = AddStyleSetSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        style_set_id = data.get('style_set_id', '')
+        if data.get('recommendation_id'):
+            try:
+                recommendation = StyleRecommendation.objects.get(id=data['recommendation_id'], user=request.user)
+            except StyleRecommendation.DoesNotExist:
+                return Response({'error': 'Recommendation not found'}, status=status.HTTP_404_NOT_FOUND)
+            entries = get_recommendation_entries(recommendation, data.get('sizes'))
+            style_set_id = style_set_id or f'rec-{recommendation.id}'
+        else:
+            entries = [(str(item['product_uuid']), item.get('size', '')) for item in data['items']]
+
+        cart, created = Cart.objects.get_or_create(user=request.user)
+        try:
+            result = add_style_set_to_cart(cart, entries, style_set_id)
+        except CartOperationError as e:
+            return Response({'error': e.message}, status=status.HTTP_400_BAD_REQUEST)
+
+        response_data = dict(self.get_serializer(self.get_cart()).data)
+        response_data['style_set'] = result
+        return Response(response_data, status=status.HTTP_201_CREATED if result['added_count'] else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def revalidate(self, request):
+        """결제 전 장바구니 아이템의 재고와 실시간 가격 재검증"""
+        cart, created = Cart.objects.get_or_create(user=request.user)
+        return Response(revalidate_cart(cart), status=status.HTTP_200_OK)